@@ -1,2 +1,8 @@
 from .scraper import Scraper
-from . import parser, exceptions
\ No newline at end of file
+from .async_scraper import AsyncScraper
+from .limiter import RateLimiter
+from .retry import RetryPolicy
+from .cache import DownloadCache, BlobStore, ResponseCache, HandoutInfoCache
+from .pool import ScraperPool
+from .index import HandoutIndex
+from . import parser, exceptions, sync
\ No newline at end of file
@@ -0,0 +1,327 @@
+import asyncio
+import datetime
+import threading
+
+import requests as rq
+
+from .exceptions import (
+    WrongIdPasswordException,
+    UnexpextedContentException,
+)
+from .limiter import RateLimiter
+from .retry import RetryPolicy
+from .utils import (
+    type_checked,
+    convert_to_date,
+)
+from .scraper import (
+    PAGE_CHARSET,
+    LOGIN_URL,
+    MENU_URL,
+    TIMETABLE_URL,
+    PROXIES,
+    ignore_insecure_warning,
+    _mount_adapter,
+    _prepare_request_kwargs,
+    _timetable_form,
+    _parse_response,
+    _validate_download,
+)
+
+
+class AsyncScraper(object):
+    '''
+    Scraperと同じ機能をasyncioのコルーチンとして提供する。
+    通信はrequests.Sessionをスレッド上で実行し、インターバルはRateLimiterを介してイベントループ上で待機する。
+
+    Attributes
+    ----------
+    session : requests.Session
+        Sessionクラス。
+    verify : bool
+        TLS/SSLを有効化する場合はTrue。
+    enable_proxy : bool
+        プロキシサーバーを経由しアクセスする設定。
+    proxies : dict
+        プロキシアドレス。requests.Session.get()の引数proxiesに準ずる。
+    interval : float
+        ウェブサーバーへの過剰な不可を防ぐためのインターバル(秒)。
+        同時に実行されたコルーチン同士の間でも、リクエストの間隔はinterval以上空けられる。
+        limiterのintervalを参照し、設定した値はlimiterに反映される。
+    connect_timeout : float
+        接続にかける時間のリミット(秒)
+    read_timeout : float
+        接続後、読み込みにかける時間のリミット(秒)
+    limiter : RateLimiter
+        リクエストの間隔を制御するRateLimiter。
+    retry : RetryPolicy or None
+        リクエストに失敗した場合の再試行の方針。
+    retry_count : int
+        これまでに再試行したリクエストの回数。
+    '''
+    def __init__(self, session: rq.Session | None = None, verify: bool = True,
+                 enable_proxy: bool = False, proxies: dict | None = None,
+                 interval: float | int = 2.0, connect_timeout: float | int = 5.0,
+                 read_timeout: float | int = 5.0, limiter: RateLimiter | None = None,
+                 pool_connections: int | None = None, pool_maxsize: int | None = None,
+                 pool_block: bool | None = None, retry: RetryPolicy | None = None):
+        '''
+        Parameters
+        ----------
+        session : requests.Session, optional
+            Sessionクラス。
+        verify : bool, default True
+            TLS/SSLを有効化する場合はTrue。
+        enable_proxy : bool, default False
+            プロキシサーバーを経由しアクセスする設定。
+        proxies : dict, optional
+            プロキシアドレス。requests.Session.get()の引数proxiesに準ずる。
+        interval : float or int, default 2.0
+            ウェブサーバーへの過剰な不可を防ぐためのインターバル(秒)。
+            アクセスを繰り返す場合は必ずインターバルを設定してください。
+        connect_timeout : float or int, default 5.0
+            接続にかける時間のリミット(秒)
+        read_timeout : float or int, default 5.0
+            接続後、読み込みにかける時間のリミット(秒)
+        limiter : RateLimiter, optional
+            リクエストの間隔を制御するRateLimiter。複数のインスタンスで共有できる。
+            指定しない場合は、intervalの間隔でリクエストを送信するRateLimiterを作成する。
+        pool_connections : int, optional
+            接続を保持するホストの数。requests.adapters.HTTPAdapterの同名の引数に準ずる。
+        pool_maxsize : int, optional
+            ホストごとに保持する接続の最大数。並列にリクエストする場合はスレッド数以上を指定する。
+        pool_block : bool, optional
+            Trueの場合、保持している接続が全て使用中であれば空くまで待機する。
+        retry : RetryPolicy, optional
+            リクエストに失敗した場合の再試行の方針。指定しない場合は再試行しない。
+
+        Notes
+        -----
+        - sessionを指定しない場合、もしくはpool_*のいずれかを指定した場合は、
+          SITE_URLに接続プールの設定を反映したHTTPAdapterを登録する。
+          指定しなかった項目はrequestsの初期値に従う。
+        '''
+        self.session = rq.Session() if session is None else type_checked(session, rq.Session)
+        if (session is None) or \
+           any(arg is not None for arg in (pool_connections, pool_maxsize, pool_block)):
+            _mount_adapter(self.session, pool_connections, pool_maxsize, pool_block)
+
+        self.verify = type_checked(verify, bool)
+        if self.verify == False:
+            ignore_insecure_warning()
+
+        self.enable_proxy = type_checked(enable_proxy, bool)
+        self.proxies = PROXIES if proxies is None else type_checked(proxies, dict)
+
+        if limiter is None:
+            self.limiter = RateLimiter(interval=interval)
+        else:
+            self.limiter = type_checked(limiter, RateLimiter)
+
+        self.connect_timeout = float(type_checked(connect_timeout, (float, int)))
+        self.read_timeout = float(type_checked(read_timeout, (float, int)))
+
+        self.retry = type_checked(retry, RetryPolicy, allow_none=True)
+        self.retry_count = 0
+        self._retry_count_lock = threading.Lock()
+
+    @property
+    def interval(self) -> float:
+        '''
+        limiterのリクエストの間隔(秒)。
+        設定した値はlimiterに反映されるため、limiterを共有している全てのインスタンスに適用される。
+        '''
+        return self.limiter.interval
+
+    @interval.setter
+    def interval(self, interval: float | int) -> None:
+        self.limiter.interval = interval
+
+    async def request(self, **kwargs) -> rq.Response:
+        '''
+        サーバーへのリクエストを行う。
+        引数の扱いはScraper.request()と同じ。
+
+        Return
+        ------
+        requests.Response
+        '''
+        kwargs, encoding = _prepare_request_kwargs(kwargs, self.verify,
+                                                   self.enable_proxy, self.proxies,
+                                                   (self.connect_timeout, self.read_timeout))
+
+        attempt = 1
+        while True:
+            await self.limiter.acquire_async()
+            try:
+                response_data = await asyncio.to_thread(self.session.request, **kwargs)
+            except Exception as e:
+                if (self.retry is None) or (not self.retry.retry_on_exception(e, attempt)):
+                    raise
+                delay = self.retry.delay(attempt)
+            else:
+                if (self.retry is None) or \
+                   (not self.retry.retry_on_response(response_data, attempt)):
+                    break
+                delay = self.retry.delay(attempt, response_data)
+                response_data.close()
+
+            with self._retry_count_lock:
+                self.retry_count += 1
+            await asyncio.sleep(delay)
+            attempt += 1
+
+        if encoding is not None:
+            response_data.encoding = encoding
+        return response_data
+
+    async def login(self, id: str, password: str) -> None:
+        '''
+        ログイン処理を行う。
+
+        Parameters
+        ----------
+        id : str
+            学籍番号。ハイフンを含む。
+        password : str
+            サイトログイン用のパスワード
+
+        Raises
+        ------
+        WrongIdPasswordError :
+            学籍番号やパスワードが誤っているためログインに失敗した。
+        UnexpextedContentException :
+            想定されていない形式のページを受け取った。
+        '''
+        id = type_checked(id, str)
+        password = type_checked(password, str)
+
+        login_data = {
+            'strUserId': id,
+            'strPassWord': password,
+            'strFromAddress': ""
+            }
+        response = await self.request(method='POST', url=LOGIN_URL, data=login_data,
+                                      encoding=PAGE_CHARSET)
+        try:
+            succeeded = _parse_response(response).login_status
+
+        except UnexpextedContentException:
+            raise UnexpextedContentException('想定されていない形式のページを受け取りました。' +\
+                                             f'method:post URL:{LOGIN_URL} ' +\
+                                             f'status_code:{response.status_code}')
+
+        if not succeeded:
+            raise WrongIdPasswordException('学籍番号もしくはパスワードが違います。')
+
+    async def login_status(self) -> bool:
+        '''
+        ログイン状態を確認する。
+
+        Return
+        ------
+        bool
+            ログイン済みの場合はTrue、未ログインの場合はFalse。
+        '''
+        response = await self.request(method='GET', url=MENU_URL, encoding=PAGE_CHARSET)
+
+        return _parse_response(response).login_status
+
+    async def get_faculty_and_grade(self) -> tuple[str, str]:
+        '''
+        ログインユーザーの学部と学年を取得する。
+
+        Return
+        ------
+        tuple[str, str]
+            ('faculty/学部', 'grade/学年')の形式で返す。
+        '''
+        response = await self.request(method='GET', url=TIMETABLE_URL, encoding=PAGE_CHARSET)
+
+        return _parse_response(response).faculty_and_grade
+
+    async def get_dlpage_urls(self, date: datetime.date | list[int | str] | tuple[int | str] | str,
+                              faculty: str | None = None, grade: str | None = None
+                              ) -> tuple[str]:
+        '''
+        教材ダウンロードページへのURLを取得する。
+        引数と返り値はScraper.get_dlpage_urls()と同じ。
+        '''
+        date = convert_to_date(date)
+        form = _timetable_form(date, faculty, grade)
+
+        response = await self.request(method='POST', url=TIMETABLE_URL,
+                                      data=form, encoding=PAGE_CHARSET)
+
+        return _parse_response(response).dlpage_urls
+
+    async def get_timetable(self, date: datetime.date | list[int | str] | tuple[int | str] | str,
+                            faculty: str | None = None, grade: str | None = None
+                            ) -> tuple[dict]:
+        '''
+        時間割ページに掲載された授業の情報を取得する。
+        引数と返り値はScraper.get_timetable()と同じ。
+        '''
+        date = convert_to_date(date)
+        form = _timetable_form(date, faculty, grade)
+
+        response = await self.request(method='POST', url=TIMETABLE_URL,
+                                      data=form, encoding=PAGE_CHARSET)
+
+        return tuple({**entry, 'date': date}
+                     for entry in _parse_response(response).timetable_entries)
+
+    async def get_handoutinfo_from_dlpage(self, dlpage_url: str) -> dict:
+        '''
+        教材のダウンロードページにアクセスし、情報を取得する。
+        引数と返り値はScraper.get_handoutinfo_from_dlpage()と同じ。
+        '''
+        dlpage_url = type_checked(dlpage_url, str)
+
+        response = await self.request(method='GET', url=dlpage_url,
+                                      encoding=PAGE_CHARSET)
+
+        return dict(_parse_response(response).handout_info)
+
+    async def get_handout_infos(self, date: datetime.date | list[int | str] | tuple[int | str],
+                                faculty: str | None = None, grade: str | None = None
+                                ) -> tuple[dict]:
+        '''
+        指定した日付に紐づけられている教材の情報を取得する。
+        引数と返り値はScraper.get_handout_infos()と同じ。
+        各ダウンロードページへのリクエストは並行して発行され、インターバルに従い順に送信される。
+        '''
+        date = convert_to_date(date)
+
+        dlpage_urls = await self.get_dlpage_urls(date=date, faculty=faculty, grade=grade)
+
+        return tuple(await asyncio.gather(*(
+            self.get_handoutinfo_from_dlpage(dlpage_url=dlpage_url)
+            for dlpage_url in dlpage_urls
+        )))
+
+    async def download(self, url: str) -> bytes:
+        '''
+        教材をダウンロードする。
+
+        Parameters
+        ----------
+        url : str
+            教材のダウンロードURL
+
+        Returns
+        -------
+        bytes
+            教材データ。
+
+        Raises
+        ------
+        DownloadFailedException :
+            教材の代わりにエラーのステータスコードやページを受け取った。
+        LoginRequiredException :
+            教材の代わりにログインページを受け取った。
+        '''
+        url = type_checked(url, str)
+        response = await self.request(method='GET', url=url)
+        _validate_download(response)
+        return response.content
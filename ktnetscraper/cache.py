@@ -0,0 +1,686 @@
+import atexit
+import datetime
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+import weakref
+
+from .utils import type_checked, read_json, write_json
+from . import parser
+
+
+TZ_JST = datetime.timezone(offset=datetime.timedelta(hours=9), name='JST')
+
+# 索引の変更をファイルへ書き込むまでの変更回数の既定値
+FLUSH_EVERY = 100
+
+
+class _JsonIndex(object):
+    '''
+    JSONファイルに保存する索引。
+    変更の度にファイル全体を書き直さないよう、flush_every回の変更ごとにまとめて書き込む。
+    書き込まれていない変更は、flush()の呼び出し時、withブロックの終了時、
+    オブジェクトの破棄時、もしくはインタープリタの終了時に書き込まれる。
+    '''
+    _version = 0
+    _written_version = 0
+
+    def __init__(self, index_path: str, flush_every: int):
+        self.flush_every = type_checked(flush_every, int)
+        if self.flush_every < 1:
+            raise ValueError(f'flush_everyには1以上の値を指定してください。({flush_every})')
+
+        self._index_path = index_path
+        self._index = read_json(self._index_path, {})
+        self._lock = threading.Lock()
+        # ファイルへの書き込みは_lockの外で行い、他のスレッドによる索引の参照を妨げない
+        self._write_lock = threading.Lock()
+        self._changes = 0
+        atexit.register(_flush_at_exit, weakref.ref(self))
+
+    def _changed(self) -> bool:
+        '''
+        索引の変更を記録し、ファイルへ書き込む回数に達した場合はTrueを返す。
+        呼び出し側で_lockを取得しておくこと。
+        '''
+        self._version += 1
+        self._changes += 1
+        return self._changes >= self.flush_every
+
+    def flush(self) -> None:
+        '''
+        書き込まれていない索引の変更をファイルへ書き込む。
+        '''
+        with self._lock:
+            if self._version == self._written_version:
+                return
+            index = dict(self._index)
+            version = self._version
+            self._changes = 0
+
+        with self._write_lock:
+            # 後の変更を含む索引が先に書き込まれていた場合は書き込まない
+            if version <= self._written_version:
+                return
+            write_json(self._index_path, index)
+            self._written_version = version
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.flush()
+
+    def __del__(self):
+        # __init__が完了していない場合も含め、変更が無ければ何もしない
+        if self._version != self._written_version:
+            self.flush()
+
+
+def _flush_at_exit(ref: weakref.ref) -> None:
+    index = ref()
+    if index is not None:
+        index.flush()
+
+
+class DownloadCache(_JsonIndex):
+    '''
+    ダウンロードした教材と、その検証用の情報(ETag, Last-Modified, 大きさ)を保存する。
+    教材はダウンロードURLのハッシュ値をファイル名として、directoryに保存される。
+    索引はflush_every回の変更ごと、もしくはflush()やwithブロックの終了時にまとめて書き込む。
+
+    Attributes
+    ----------
+    directory : str
+        教材と索引を保存するディレクトリ。
+    flush_every : int
+        索引の変更をファイルへ書き込むまでの変更回数。
+    '''
+    INDEX_FILE_NAME = 'index.json'
+
+    def __init__(self, directory: str | os.PathLike, flush_every: int = FLUSH_EVERY):
+        '''
+        Parameters
+        ----------
+        directory : str or os.PathLike
+            教材と索引を保存するディレクトリ。存在しない場合は作成する。
+        flush_every : int, default FLUSH_EVERY
+            索引の変更をファイルへ書き込むまでの変更回数。1の場合は変更の度に書き込む。
+        '''
+        self.directory = os.fspath(type_checked(directory, (str, os.PathLike)))
+        os.makedirs(self.directory, exist_ok=True)
+
+        super().__init__(os.path.join(self.directory, self.INDEX_FILE_NAME), flush_every)
+
+    def path(self, url: str) -> str:
+        '''
+        URLに対応する教材の保存先を返す。
+
+        Parameters
+        ----------
+        url : str
+            教材のダウンロードURL
+
+        Returns
+        -------
+        str
+            教材の保存先のパス。
+        '''
+        url = type_checked(url, str)
+        return os.path.join(self.directory, hashlib.sha256(url.encode('utf-8')).hexdigest())
+
+    def get(self, url: str) -> dict | None:
+        '''
+        URLに対応する検証用の情報を返す。
+        情報が無いか、教材のファイルが存在しない場合はNoneを返す。
+
+        Returns
+        -------
+        dict or None
+            <key> : <type of value>\n
+            "etag" : str or None
+                ETagヘッダーの値
+            "last_modified" : str or None
+                Last-Modifiedヘッダーの値
+            "size" : int
+                教材の大きさ(バイト)
+            "sha256" : str
+                教材のSHA-256のハッシュ値(16進数)
+        '''
+        url = type_checked(url, str)
+        with self._lock:
+            entry = self._index.get(url)
+        if (entry is None) or (not os.path.exists(self.path(url))):
+            return None
+        return dict(entry)
+
+    def store(self, url: str, etag: str | None, last_modified: str | None,
+              size: int, sha256: str) -> None:
+        '''
+        URLに対応する検証用の情報を保存する。
+        教材のファイルはpath()の位置に保存済みである必要がある。
+        '''
+        url = type_checked(url, str)
+        with self._lock:
+            self._index[url] = {
+                'etag': etag,
+                'last_modified': last_modified,
+                'size': size,
+                'sha256': sha256,
+            }
+            flush = self._changed()
+        if flush:
+            self.flush()
+
+    def remove(self, url: str) -> None:
+        '''
+        URLに対応する教材と検証用の情報を削除する。
+        '''
+        url = type_checked(url, str)
+        with self._lock:
+            flush = (self._index.pop(url, None) is not None) and self._changed()
+        if flush:
+            self.flush()
+        if os.path.exists(self.path(url)):
+            os.remove(self.path(url))
+
+
+class BlobStore(_JsonIndex):
+    '''
+    ダウンロードした教材を、内容のSHA-256のハッシュ値をファイル名として保存する。
+    同じ内容の教材は異なるURLで公開されていても1つのファイルとして保存される。
+    URLとハッシュ値の対応は索引に保存し、link()で任意の位置に教材へのハードリンクを作成できる。
+    索引の書き込みはDownloadCacheと同様にまとめて行う。
+
+    Attributes
+    ----------
+    directory : str
+        教材と索引を保存するディレクトリ。
+    flush_every : int
+        索引の変更をファイルへ書き込むまでの変更回数。
+    '''
+    INDEX_FILE_NAME = 'index.json'
+    BLOB_DIR_NAME = 'blobs'
+    TEMP_DIR_NAME = 'tmp'
+
+    def __init__(self, directory: str | os.PathLike, flush_every: int = FLUSH_EVERY):
+        '''
+        Parameters
+        ----------
+        directory : str or os.PathLike
+            教材と索引を保存するディレクトリ。存在しない場合は作成する。
+        flush_every : int, default FLUSH_EVERY
+            索引の変更をファイルへ書き込むまでの変更回数。1の場合は変更の度に書き込む。
+        '''
+        self.directory = os.fspath(type_checked(directory, (str, os.PathLike)))
+        self._blob_dir = os.path.join(self.directory, self.BLOB_DIR_NAME)
+        self._temp_dir = os.path.join(self.directory, self.TEMP_DIR_NAME)
+        os.makedirs(self._blob_dir, exist_ok=True)
+        os.makedirs(self._temp_dir, exist_ok=True)
+
+        super().__init__(os.path.join(self.directory, self.INDEX_FILE_NAME), flush_every)
+
+    def blob_path(self, sha256: str) -> str:
+        '''
+        ハッシュ値に対応する教材の保存先を返す。
+        '''
+        sha256 = type_checked(sha256, str)
+        return os.path.join(self._blob_dir, sha256[:2], sha256)
+
+    def temp_path(self) -> str:
+        '''
+        ダウンロード中のデータを書き込む一時ファイルのパスを返す。
+        教材と同じファイルシステム上にあるため、add()で移動する際にデータを複製しない。
+        '''
+        return os.path.join(self._temp_dir, uuid.uuid4().hex)
+
+    def get(self, url: str) -> dict | None:
+        '''
+        URLに対応する検証用の情報を返す。
+        情報が無いか、教材のファイルが存在しない場合はNoneを返す。
+
+        Returns
+        -------
+        dict or None
+            DownloadCache.get()の返り値と同じ形式。
+        '''
+        url = type_checked(url, str)
+        with self._lock:
+            entry = self._index.get(url)
+        if (entry is None) or (not os.path.exists(self.blob_path(entry['sha256']))):
+            return None
+        return dict(entry)
+
+    def path(self, url: str) -> str | None:
+        '''
+        URLに対応する教材のパスを返す。保存されていない場合はNoneを返す。
+        '''
+        entry = self.get(url)
+        return None if entry is None else self.blob_path(entry['sha256'])
+
+    def add(self, url: str, temp_path: str | os.PathLike, size: int, sha256: str,
+            etag: str | None = None, last_modified: str | None = None) -> str:
+        '''
+        一時ファイルに書き込んだ教材を保存し、URLと対応付ける。
+        同じハッシュ値の教材が保存済みの場合は、一時ファイルを削除して保存済みの教材を利用する。
+
+        Parameters
+        ----------
+        url : str
+            教材のダウンロードURL
+        temp_path : str or os.PathLike
+            教材を書き込んだ一時ファイル。temp_path()で取得したパスを利用する。
+        size : int
+            教材の大きさ(バイト)
+        sha256 : str
+            教材のSHA-256のハッシュ値(16進数)
+        etag : str, optional
+            ETagヘッダーの値
+        last_modified : str, optional
+            Last-Modifiedヘッダーの値
+
+        Returns
+        -------
+        str
+            保存された教材のパス。
+        '''
+        url = type_checked(url, str)
+        path = self.blob_path(sha256)
+        with self._lock:
+            if os.path.exists(path):
+                os.remove(temp_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(temp_path, path)
+
+            self._index[url] = {
+                'etag': etag,
+                'last_modified': last_modified,
+                'size': size,
+                'sha256': sha256,
+            }
+            flush = self._changed()
+        if flush:
+            self.flush()
+        return path
+
+    def link(self, url: str, path: str | os.PathLike) -> str:
+        '''
+        URLに対応する教材へのハードリンクをpathに作成する。
+        日付やユニットごとのディレクトリに教材を配置する場合も、データは複製されない。
+        pathが既に存在する場合は置き換える。
+        ハードリンクを作成できない場合(異なるファイルシステムなど)は複製する。
+
+        Returns
+        -------
+        str
+            作成したパス。
+
+        Raises
+        ------
+        KeyError :
+            URLに対応する教材が保存されていない。
+        '''
+        blob_path = self.path(url)
+        if blob_path is None:
+            raise KeyError(f'教材が保存されていません。({url})')
+
+        path = os.fspath(type_checked(path, (str, os.PathLike)))
+        directory = os.path.dirname(path)
+        if directory != '':
+            os.makedirs(directory, exist_ok=True)
+
+        # 一時的な名前で作成してから置き換え、既存のファイルを途中の状態にしない
+        tmp_path = f'{path}.tmp'
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+        try:
+            os.link(blob_path, tmp_path)
+        except OSError:
+            shutil.copyfile(blob_path, tmp_path)
+        os.replace(tmp_path, path)
+        return path
+
+    def remove(self, url: str) -> None:
+        '''
+        URLと教材の対応を削除する。教材のファイルはgc()で削除される。
+        '''
+        url = type_checked(url, str)
+        with self._lock:
+            flush = (self._index.pop(url, None) is not None) and self._changed()
+        if flush:
+            self.flush()
+
+    def gc(self) -> int:
+        '''
+        どのURLとも対応していない教材と、残っている一時ファイルを削除する。
+        link()で作成したハードリンクは削除されない。
+        ダウンロード中の一時ファイルも削除するため、ダウンロードと並行して実行しないこと。
+
+        Returns
+        -------
+        int
+            削除した教材の数。
+        '''
+        with self._lock:
+            referenced = {entry['sha256'] for entry in self._index.values()}
+
+            removed = 0
+            for prefix in os.listdir(self._blob_dir):
+                prefix_dir = os.path.join(self._blob_dir, prefix)
+                for sha256 in os.listdir(prefix_dir):
+                    if sha256 not in referenced:
+                        os.remove(os.path.join(prefix_dir, sha256))
+                        removed += 1
+                if len(os.listdir(prefix_dir)) == 0:
+                    os.rmdir(prefix_dir)
+
+            for file_name in os.listdir(self._temp_dir):
+                os.remove(os.path.join(self._temp_dir, file_name))
+        return removed
+
+
+class ResponseCache(object):
+    '''
+    ページのソースを有効期限とともに保存する。
+    時間割ページの場合、過去の日付のページは変更されることがほとんど無いため、
+    当日以降のページより長い有効期限を設定できる。
+
+    Attributes
+    ----------
+    directory : str
+        ページを保存するディレクトリ。
+    past_ttl : float or None
+        過去の日付のページの有効期間(秒)。Noneの場合は無期限。
+    present_ttl : float or None
+        当日以降の日付のページの有効期間(秒)。Noneの場合は無期限。
+    '''
+    def __init__(self, directory: str | os.PathLike,
+                 past_ttl: float | int | None = None,
+                 present_ttl: float | int | None = 10 * 60):
+        '''
+        Parameters
+        ----------
+        directory : str or os.PathLike
+            ページを保存するディレクトリ。存在しない場合は作成する。
+        past_ttl : float or int, optional
+            過去の日付のページの有効期間(秒)。指定しない場合は無期限。
+        present_ttl : float or int, default 600
+            当日以降の日付のページの有効期間(秒)。Noneの場合は無期限。
+            0を指定した場合は保存しない。
+        '''
+        self.directory = os.fspath(type_checked(directory, (str, os.PathLike)))
+        os.makedirs(self.directory, exist_ok=True)
+
+        self.past_ttl = type_checked(past_ttl, (float, int), allow_none=True)
+        self.present_ttl = type_checked(present_ttl, (float, int), allow_none=True)
+
+    @staticmethod
+    def make_key(url: str, method: str, data: dict | None = None,
+                 cohort: str | None = None) -> str:
+        '''
+        リクエストの内容からキーを作成する。
+
+        Parameters
+        ----------
+        url : str
+            URL
+        method : str
+            リクエストメソッド
+        data : dict, optional
+            送信するデータ
+        cohort : str, optional
+            ページの内容を決めるアカウントの区分。(例:'M,1')
+
+        Returns
+        -------
+        str
+        '''
+        source = json.dumps([url, method.upper(), data, cohort],
+                            ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+    def ttl_for_date(self, date: datetime.date) -> float | int | None:
+        '''
+        日付に対応する時間割ページの有効期間(秒)を返す。
+        日付は日本時間で判定する。
+        '''
+        date = type_checked(date, datetime.date)
+        today = datetime.datetime.now(TZ_JST).date()
+        return self.past_ttl if date < today else self.present_ttl
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{type_checked(key, str)}.json')
+
+    def get(self, key: str) -> str | None:
+        '''
+        キーに対応するページのソースを返す。
+        保存されていないか、有効期限が切れている場合はNoneを返す。
+        '''
+        entry = read_json(self._path(key))
+        if entry is None:
+            return None
+        if (entry['expires_at'] is not None) and (entry['expires_at'] <= time.time()):
+            return None
+        return entry['text']
+
+    def set(self, key: str, text: str, ttl: float | int | None = None,
+            tags: list[str] | tuple[str] = ()) -> None:
+        '''
+        ページのソースを保存する。
+
+        Parameters
+        ----------
+        key : str
+            make_key()で作成したキー。
+        text : str
+            ページのソース。
+        ttl : float or int, optional
+            有効期間(秒)。指定しない場合は無期限。0以下の場合は保存しない。
+        tags : list[str] or tuple[str], optional
+            invalidate_tag()でまとめて削除するためのタグ。
+        '''
+        text = type_checked(text, str)
+        ttl = type_checked(ttl, (float, int), allow_none=True)
+        if (ttl is not None) and (ttl <= 0):
+            return
+
+        write_json(self._path(key), {
+            'text': text,
+            'expires_at': None if ttl is None else time.time() + ttl,
+            'tags': list(tags),
+        })
+
+    def invalidate(self, key: str) -> None:
+        '''
+        キーに対応するページを削除する。
+        '''
+        path = self._path(key)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def invalidate_tag(self, tag: str) -> None:
+        '''
+        タグが付けられた全てのページを削除する。
+        時間割ページには日付('YYYY/MM/DD')がタグとして付けられる。
+        '''
+        tag = type_checked(tag, str)
+        for file_name in os.listdir(self.directory):
+            if not file_name.endswith('.json'):
+                continue
+            path = os.path.join(self.directory, file_name)
+            entry = read_json(path)
+            if (entry is not None) and (tag in entry['tags']):
+                os.remove(path)
+
+    def clear(self) -> None:
+        '''
+        全てのページを削除する。
+        '''
+        for file_name in os.listdir(self.directory):
+            if file_name.endswith('.json'):
+                os.remove(os.path.join(self.directory, file_name))
+
+
+class HandoutInfoCache(_JsonIndex):
+    '''
+    解析した教材情報を、教材を識別する(kn, kg, kz)をキーとして保存する。
+    同じ教材は複数の日付の時間割ページに掲載されるため、
+    保存した教材情報を利用することでダウンロードページへのリクエストを省略できる。
+    ファイルへの書き込みはDownloadCacheと同様にまとめて行う。
+
+    Attributes
+    ----------
+    path : str
+        教材情報を保存するJSONファイル。
+    max_age : float or None
+        教材情報を再取得するまでの時間(秒)。Noneの場合は再取得しない。
+    flush_every : int
+        教材情報の変更をファイルへ書き込むまでの変更回数。
+    '''
+    def __init__(self, path: str | os.PathLike, max_age: float | int | None = None,
+                 flush_every: int = FLUSH_EVERY):
+        '''
+        Parameters
+        ----------
+        path : str or os.PathLike
+            教材情報を保存するJSONファイル。存在する場合は読み込む。
+        max_age : float or int, optional
+            教材情報を再取得するまでの時間(秒)。指定しない場合は再取得しない。
+        flush_every : int, default FLUSH_EVERY
+            教材情報の変更をファイルへ書き込むまでの変更回数。1の場合は変更の度に書き込む。
+        '''
+        self.path = os.fspath(type_checked(path, (str, os.PathLike)))
+        self.max_age = type_checked(max_age, (float, int), allow_none=True)
+
+        super().__init__(self.path, flush_every)
+
+    @staticmethod
+    def _key(dlpage_url: str) -> str | None:
+        key = parser.get_handout_key(dlpage_url)
+        return None if key is None else ','.join(key)
+
+    def _is_expired(self, entry: dict) -> bool:
+        return (self.max_age is not None) and (entry['fetched_at'] + self.max_age <= time.time())
+
+    def get(self, dlpage_url: str) -> dict | None:
+        '''
+        ダウンロードページのURLに対応する教材情報を返す。
+        保存されていない場合、保存時とURLが異なる場合、max_ageを過ぎている場合はNoneを返す。
+
+        Returns
+        -------
+        dict or None
+            Scraper.get_handoutinfo_from_dlpage()の返り値と同じ形式。
+        '''
+        key = self._key(type_checked(dlpage_url, str))
+        if key is None:
+            return None
+        with self._lock:
+            entry = self._index.get(key)
+        if (entry is None) or (entry['dlpage_url'] != dlpage_url) or self._is_expired(entry):
+            return None
+        return {name: _decode_value(value) for name, value in entry['info'].items()}
+
+    def set(self, dlpage_url: str, info: dict) -> None:
+        '''
+        ダウンロードページのURLに対応する教材情報を保存する。
+        URLから(kn, kg, kz)を取得できない場合は保存しない。
+        '''
+        key = self._key(type_checked(dlpage_url, str))
+        info = type_checked(info, dict)
+        if key is None:
+            return
+        entry = {
+            'dlpage_url': dlpage_url,
+            'fetched_at': time.time(),
+            'info': {name: _encode_value(value) for name, value in info.items()},
+        }
+        with self._lock:
+            self._index[key] = entry
+            flush = self._changed()
+        if flush:
+            self.flush()
+
+    def remove(self, dlpage_url: str) -> None:
+        '''
+        ダウンロードページのURLに対応する教材情報を削除する。
+        '''
+        key = self._key(type_checked(dlpage_url, str))
+        with self._lock:
+            flush = (self._index.pop(key, None) is not None) and self._changed()
+        if flush:
+            self.flush()
+
+    def prune(self, dlpage_urls: list[str] | tuple[str] | None = None) -> int:
+        '''
+        max_ageを過ぎた教材情報を削除する。
+        dlpage_urlsを指定した場合は、それらのURLに(kn, kg, kz)が含まれない教材情報も削除する。
+        削除した場合は、flush_everyによらずファイルへ書き込む。
+
+        Parameters
+        ----------
+        dlpage_urls : list[str] or tuple[str], optional
+            現在サイトに掲載されている教材のダウンロードページのURL。
+
+        Returns
+        -------
+        int
+            削除した教材情報の数。
+        '''
+        keys = None
+        if dlpage_urls is not None:
+            keys = {self._key(url) for url in type_checked(dlpage_urls, (list, tuple))}
+
+        with self._lock:
+            pruned = [
+                key for key, entry in self._index.items()
+                if ((keys is not None) and (key not in keys)) or self._is_expired(entry)
+            ]
+            for key in pruned:
+                del self._index[key]
+            if len(pruned) > 0:
+                self._changed()
+        if len(pruned) > 0:
+            self.flush()
+        return len(pruned)
+
+    def clear(self) -> None:
+        '''
+        全ての教材情報を削除する。
+        '''
+        with self._lock:
+            self._index = {}
+            self._changed()
+        self.flush()
+
+
+def _encode_value(value):
+    '''
+    教材情報の値をJSONで保存できる形式に変換する。
+    '''
+    if isinstance(value, datetime.datetime):
+        return {'datetime': value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {'date': value.isoformat()}
+    if isinstance(value, tuple):
+        return list(value)
+    return value
+
+
+def _decode_value(value):
+    '''
+    _encode_value()で変換した値を元に戻す。
+    '''
+    if isinstance(value, dict):
+        if 'datetime' in value:
+            return datetime.datetime.fromisoformat(value['datetime'])
+        if 'date' in value:
+            return datetime.date.fromisoformat(value['date'])
+    if isinstance(value, list):
+        return tuple(value)
+    return value
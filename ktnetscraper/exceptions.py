@@ -12,4 +12,16 @@ class UnexpextedContentException(Exception):
 
 class IncompleteArgumentException(Exception):
     '''必要な引数が提供されていない。'''
-    pass
\ No newline at end of file
+    pass
+
+class IncompleteDownloadException(Exception):
+    '''ダウンロードしたデータの大きさがサーバーの示す大きさと一致しない。'''
+    pass
+
+class NoEligibleScraperException(Exception):
+    '''指定した学部・学年を閲覧可能なアカウントが登録されていない。'''
+    pass
+
+class DownloadFailedException(Exception):
+    '''教材の代わりにエラーのステータスコードやページを受け取った。'''
+    pass
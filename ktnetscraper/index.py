@@ -0,0 +1,290 @@
+from typing import Iterable
+import datetime
+import os
+import sqlite3
+import threading
+
+from .cache import TZ_JST
+from .utils import type_checked, convert_to_date
+
+
+# 教材情報の項目のうち、handoutsテーブルにそのまま保存するもの
+TEXT_COLUMNS = ('unit', 'unit_num', 'period', 'lesson_type', 'thema',
+                'course', 'name', 'comments', 'file_name')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS handouts (
+    url TEXT PRIMARY KEY,
+    unit TEXT,
+    unit_num TEXT,
+    period TEXT,
+    lesson_type TEXT,
+    thema TEXT,
+    course TEXT,
+    release_start_at TEXT,
+    release_end_at TEXT,
+    name TEXT,
+    comments TEXT,
+    file_name TEXT
+);
+CREATE TABLE IF NOT EXISTS teachers (
+    url TEXT NOT NULL REFERENCES handouts(url) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    teacher TEXT NOT NULL,
+    PRIMARY KEY (url, position)
+);
+CREATE TABLE IF NOT EXISTS dates (
+    url TEXT NOT NULL REFERENCES handouts(url) ON DELETE CASCADE,
+    date TEXT NOT NULL,
+    PRIMARY KEY (url, date)
+);
+CREATE INDEX IF NOT EXISTS dates_date ON dates(date);
+CREATE INDEX IF NOT EXISTS handouts_unit ON handouts(unit);
+CREATE INDEX IF NOT EXISTS handouts_course ON handouts(course);
+CREATE INDEX IF NOT EXISTS handouts_release_start_at ON handouts(release_start_at);
+CREATE INDEX IF NOT EXISTS handouts_release_end_at ON handouts(release_end_at);
+CREATE INDEX IF NOT EXISTS teachers_teacher ON teachers(teacher);
+'''
+
+# 教材情報を日付ごとに検索する際の結合
+SELECT_FROM = 'handouts JOIN dates ON dates.url = handouts.url'
+
+
+class HandoutIndex(object):
+    '''
+    教材情報をSQLiteのデータベースに保存し、検索する。
+    教材はダウンロードURLで識別され、同じURLの教材情報は上書きされる。
+    同じ教材は複数の日付の時間割ページに掲載されるため、日付は教材ごとに全て保存する。
+    日時は日本時間のISO 8601形式の文字列として保存されるため、文字列の比較で範囲を検索できる。
+
+    Attributes
+    ----------
+    path : str
+        データベースのファイル。':memory:'の場合はメモリ上に作成する。
+    '''
+    def __init__(self, path: str | os.PathLike = ':memory:'):
+        '''
+        Parameters
+        ----------
+        path : str or os.PathLike, default ':memory:'
+            データベースのファイル。存在しない場合は作成する。
+        '''
+        self.path = os.fspath(type_checked(path, (str, os.PathLike)))
+
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute('PRAGMA foreign_keys = ON')
+        self._connection.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        '''
+        データベースとの接続を閉じる。
+        '''
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM handouts').fetchone()[0]
+
+    def upsert(self, infos: Iterable[dict | tuple[datetime.date, dict]],
+               date: datetime.date | list[int | str] | tuple[int | str] | str | None = None
+               ) -> int:
+        '''
+        教材情報をまとめて保存する。全ての教材情報を1つのトランザクションで保存し、
+        途中で失敗した場合は何も保存しない。
+
+        Parameters
+        ----------
+        infos : Iterable[dict or tuple[datetime.date, dict]]
+            Scraper.get_handout_infos()の返り値の要素、もしくは
+            Scraper.iter_handout_infos()が返す(<時間割ページの日付>, <handout_info>)。
+            dictのみの場合は、"date"があればその値を、無ければ引数dateを日付として保存する。
+        date : datetime.date, list[int|str], tuple[int|str] or str, optional
+            dictのみで渡した教材情報の日付。Scraper.get_handout_infos()に指定した日付。
+
+        Returns
+        -------
+        int
+            保存した教材情報の数。ダウンロードURLが無い教材情報は保存しない。
+            同じURLの教材情報は1つと数え、それぞれの日付は全て保存する。
+
+        Raises
+        ------
+        ValueError :
+            日付の分からない教材情報が含まれている。
+        '''
+        # 同じURLが複数含まれる場合(複数の日付に掲載された教材など)は、最後のものを保存する
+        rows = {}
+        date_rows = set()
+        for item in infos:
+            if isinstance(item, tuple):
+                item_date, info = item
+            else:
+                info = type_checked(item, dict)
+                item_date = info.get('date', date)
+            if info.get('url') is None:
+                continue
+            if item_date is None:
+                raise ValueError(f'日付が指定されていない教材情報です。(url:{info["url"]})')
+
+            date_rows.add((info['url'], convert_to_date(item_date).isoformat()))
+            handout_row = (
+                info['url'],
+                *(info.get(column) for column in TEXT_COLUMNS),
+                _to_text(info.get('release_start_at')),
+                _to_text(info.get('release_end_at')),
+            )
+            teacher_rows = [
+                (info['url'], position, teacher)
+                for position, teacher in enumerate(info.get('teachers') or ())
+            ]
+            rows.pop(info['url'], None)
+            rows[info['url']] = (handout_row, teacher_rows)
+
+        handout_rows = [handout_row for handout_row, _ in rows.values()]
+        teacher_rows = [row for _, teacher_rows in rows.values() for row in teacher_rows]
+
+        columns = ('url', *TEXT_COLUMNS, 'release_start_at', 'release_end_at')
+        updates = ', '.join(f'{column} = excluded.{column}' for column in columns[1:])
+        with self._lock, self._connection:
+            self._connection.executemany(
+                f'INSERT INTO handouts ({", ".join(columns)}) '
+                f'VALUES ({", ".join(["?"] * len(columns))}) '
+                f'ON CONFLICT(url) DO UPDATE SET {updates}',
+                handout_rows,
+            )
+            self._connection.executemany(
+                'DELETE FROM teachers WHERE url = ?',
+                ((row[0],) for row in handout_rows),
+            )
+            self._connection.executemany(
+                'INSERT INTO teachers (url, position, teacher) VALUES (?, ?, ?)',
+                teacher_rows,
+            )
+            self._connection.executemany(
+                'INSERT OR IGNORE INTO dates (url, date) VALUES (?, ?)',
+                sorted(date_rows),
+            )
+        return len(handout_rows)
+
+    def get(self, url: str) -> dict | None:
+        '''
+        ダウンロードURLに対応する教材情報を返す。保存されていない場合はNoneを返す。
+        複数の日付に掲載された教材の場合、"date"には最も早い日付を格納する。
+        '''
+        url = type_checked(url, str)
+        results = self._select('handouts.url = ?', (url,))
+        return results[0] if len(results) > 0 else None
+
+    def dates(self, url: str) -> tuple[datetime.date]:
+        '''
+        ダウンロードURLに対応する教材が掲載された時間割ページの日付を、日付順に返す。
+        '''
+        url = type_checked(url, str)
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT date FROM dates WHERE url = ? ORDER BY date', (url,)).fetchall()
+        return tuple(datetime.date.fromisoformat(row['date']) for row in rows)
+
+    def find(self, unit: str | None = None, course: str | None = None,
+             teacher: str | None = None,
+             date_from: datetime.date | list[int | str] | tuple[int | str] | str | None = None,
+             date_to: datetime.date | list[int | str] | tuple[int | str] | str | None = None,
+             released_from: datetime.datetime | None = None,
+             released_to: datetime.datetime | None = None) -> tuple[dict]:
+        '''
+        条件に一致する教材情報を返す。指定した条件は全て満たすものを返す。
+
+        Parameters
+        ----------
+        unit : str, optional
+            ユニット名
+        course : str, optional
+            講座名
+        teacher : str, optional
+            担当教員のいずれかの名前
+        date_from : datetime.date, list[int|str], tuple[int|str] or str, optional
+            時間割ページの日付の下限(この日付を含む)
+        date_to : datetime.date, list[int|str], tuple[int|str] or str, optional
+            時間割ページの日付の上限(この日付を含む)
+        released_from : datetime.datetime, optional
+            公開開始日時の下限(この日時を含む)。タイムゾーンを指定しない場合は日本時間とみなす。
+        released_to : datetime.datetime, optional
+            公開開始日時の上限(この日時を含む)。タイムゾーンを指定しない場合は日本時間とみなす。
+
+        Returns
+        -------
+        tuple[dict]
+            教材情報。日付、時限、ダウンロードURLの順に並べる。
+            教材情報の形式はScraper.get_handout_infos()の返り値と同じで、"date"に日付を格納する。
+            複数の日付に掲載された教材は、条件に一致する日付ごとに返す。
+        '''
+        conditions = []
+        parameters = []
+        for column, value in (('unit', unit), ('course', course)):
+            if value is not None:
+                conditions.append(f'handouts.{column} = ?')
+                parameters.append(type_checked(value, str))
+        if teacher is not None:
+            conditions.append('handouts.url IN (SELECT url FROM teachers WHERE teacher = ?)')
+            parameters.append(type_checked(teacher, str))
+        for operator, value in (('>=', date_from), ('<=', date_to)):
+            if value is not None:
+                conditions.append(f'dates.date {operator} ?')
+                parameters.append(convert_to_date(value).isoformat())
+        for operator, value in (('>=', released_from), ('<=', released_to)):
+            if value is not None:
+                conditions.append(f'handouts.release_start_at {operator} ?')
+                parameters.append(_to_text(type_checked(value, datetime.datetime)))
+
+        where = ' AND '.join(conditions) if len(conditions) > 0 else '1'
+        return self._select(where, tuple(parameters))
+
+    def _select(self, where: str, parameters: tuple) -> tuple[dict]:
+        with self._lock:
+            rows = self._connection.execute(
+                f'SELECT handouts.*, dates.date AS date FROM {SELECT_FROM} WHERE {where} '
+                'ORDER BY dates.date, handouts.period, handouts.url',
+                parameters,
+            ).fetchall()
+            teachers = {}
+            for url, teacher in self._connection.execute(
+                    'SELECT url, teacher FROM teachers WHERE url IN '
+                    f'(SELECT handouts.url FROM {SELECT_FROM} WHERE {where}) '
+                    'ORDER BY url, position',
+                    parameters):
+                teachers.setdefault(url, []).append(teacher)
+        return tuple(_row_to_info(row, tuple(teachers.get(row['url'], ()))) for row in rows)
+
+
+def _to_text(value: datetime.datetime | None) -> str | None:
+    '''
+    日時を日本時間のISO 8601形式の文字列に変換する。
+    '''
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=TZ_JST)
+    return value.astimezone(TZ_JST).isoformat()
+
+
+def _row_to_info(row: sqlite3.Row, teachers: tuple[str]) -> dict:
+    '''
+    handoutsテーブルの行を教材情報の形式に変換する。
+    '''
+    info = {column: row[column] for column in TEXT_COLUMNS}
+    info['url'] = row['url']
+    info['date'] = None if row['date'] is None else datetime.date.fromisoformat(row['date'])
+    info['teachers'] = teachers if len(teachers) > 0 else None
+    for column in ('release_start_at', 'release_end_at'):
+        value = row[column]
+        info[column] = None if value is None else datetime.datetime.fromisoformat(value)
+    return info
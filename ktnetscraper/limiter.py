@@ -0,0 +1,104 @@
+import asyncio
+import threading
+import time
+
+from .utils import type_checked
+
+
+class RateLimiter(object):
+    '''
+    リクエストの間隔を制御するトークンバケット。
+    前回のリクエスト開始からの経過時間を記録し、不足している時間だけ待機する。
+    スレッドセーフであり、複数のScraperやAsyncScraperで共有できる。
+
+    Attributes
+    ----------
+    interval : float
+        トークンが1つ補充されるまでの時間(秒)。リクエストの平均間隔になる。
+    burst : int
+        連続して待機せずに送信できるリクエストの数。
+        1の場合、リクエストの開始時刻の間隔が常にinterval以上になる。
+    '''
+    def __init__(self, interval: float | int = 2.0, burst: int = 1):
+        '''
+        Parameters
+        ----------
+        interval : float or int, default 2.0
+            トークンが1つ補充されるまでの時間(秒)。
+        burst : int, default 1
+            連続して待機せずに送信できるリクエストの数。1以上を指定する。
+        '''
+        self.interval = interval
+
+        self.burst = type_checked(burst, int)
+        if self.burst < 1:
+            raise ValueError(f'burstには1以上の値を指定してください。({burst})')
+
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def interval(self) -> float:
+        return self._interval
+
+    @interval.setter
+    def interval(self, interval: float | int) -> None:
+        value = float(type_checked(interval, (float, int)))
+        if value < 0:
+            raise ValueError(f'intervalには0以上の値を指定してください。({interval})')
+        self._interval = value
+
+    def reserve(self) -> float:
+        '''
+        トークンを1つ予約し、送信までに待機すべき時間を返す。
+        予約は即座に確定するため、返された時間だけ待機した後にリクエストを送信すること。
+
+        Returns
+        -------
+        float
+            待機すべき時間(秒)。
+        '''
+        if self.interval == 0:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated_at
+            self._tokens = min(float(self.burst), self._tokens + elapsed / self.interval)
+            self._updated_at = now
+
+            # トークンが負の場合は、先に予約したリクエストの分だけ待機時間が延びる。
+            self._tokens -= 1.0
+            if self._tokens >= 0:
+                return 0.0
+            else:
+                return -self._tokens * self.interval
+
+    def acquire(self) -> float:
+        '''
+        リクエストを送信できるまでスレッドを待機させる。
+
+        Returns
+        -------
+        float
+            待機した時間(秒)。
+        '''
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def acquire_async(self) -> float:
+        '''
+        リクエストを送信できるまでコルーチンを待機させる。
+
+        Returns
+        -------
+        float
+            待機した時間(秒)。
+        '''
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
@@ -0,0 +1,182 @@
+try:
+    import lxml.html
+except ImportError as e:
+    raise ImportError('lxmlエンジンを利用するには、lxmlをインストールしてください。') from e
+
+from . import parser
+from .parser import (
+    ParserEngine,
+    ParsedPage,
+    DLPAGE_URL_HEAD,
+    DL_URL_HEAD,
+    HANDOUT_INFO_KEYS,
+    HANDOUT_SIMPLE_CONTENTS_KEYS,
+    TIMETABLE_ITEM_KEYS,
+    UNIT_NUM_PATTERN,
+    TEACHER_SEPARATOR_PATTERN,
+)
+from .utils import convert_str_to_datetime
+
+
+class LxmlDocument(object):
+    '''
+    lxmlで解析したページ。
+
+    Attributes
+    ----------
+    root : lxml.html.HtmlElement
+        ページのhtml要素
+    segments : list[tuple[str, list[lxml.html.HtmlElement]]]
+        本文のdiv要素の直下を<br />で区切ったもの。
+        (区間のテキスト, 区間に含まれる要素)のlistで、テキストには要素内のテキストも含む。
+    '''
+    def __init__(self, text: str):
+        # encodingを宣言したstrはlxmlで解析できないため、XML宣言を除く
+        if text.startswith('<?xml'):
+            text = text[text.find('?>') + 2:]
+        self.root = lxml.html.document_fromstring(text)
+
+        body = self.root.body
+        container = body.find('div')
+        if container is None:
+            container = body
+
+        texts, elements = [container.text or ''], []
+        self.segments = []
+        for child in container:
+            if child.tag == 'br':
+                self.segments.append((''.join(texts), elements))
+                texts, elements = [], []
+            elif isinstance(child.tag, str):
+                texts.append(child.text_content())
+                elements.append(child)
+            texts.append(child.tail or '')
+        self.segments.append((''.join(texts), elements))
+
+
+class LxmlEngine(ParserEngine):
+    '''
+    lxmlでページをDOMとして解析するエンジン。
+    各項目は'●'で始まる<br />区切りの区間と、その次の区間から取得する。
+    RegexEngineと異なり、値に含まれる文字参照(&amp;など)は復号する。
+    '''
+    name = 'lxml'
+
+    def parse(self, page: ParsedPage) -> LxmlDocument:
+        return LxmlDocument(page.text)
+
+    def faculty_and_grade(self, page: ParsedPage) -> tuple[str, str]:
+        return parser._parse_faculty_and_grade(page.document.root.text_content())
+
+    def dlpage_urls(self, page: ParsedPage) -> tuple[str]:
+        return tuple(DLPAGE_URL_HEAD + url
+                     for url in map(_dlpage_path, page.document.root.iter('a'))
+                     if url is not None)
+
+    def timetable_entries(self, page: ParsedPage) -> tuple[dict]:
+        segments = page.document.segments
+        entries = []
+        for i, (text, elements) in enumerate(segments):
+            header = next((header for header in map(_class_header, elements)
+                           if header is not None), None)
+            if header is not None:
+                entry = {"period": header or None}
+                entry.update({key: None for key in TIMETABLE_ITEM_KEYS.values()})
+                entry["handouts"] = []
+                entries.append(entry)
+            if len(entries) == 0:
+                continue
+            entry = entries[-1]
+
+            if text.startswith('●') and (i+1 < len(segments)):
+                key = TIMETABLE_ITEM_KEYS.get(text[1:].strip())
+                element = segments[i+1][0].strip()
+                if (key is not None) and (element != ''):
+                    if key == "teachers":
+                        entry[key] = tuple(
+                            teacher.strip()
+                            for teacher in TEACHER_SEPARATOR_PATTERN.split(element)
+                        )
+                    else:
+                        entry[key] = element
+
+            for link in (link for element in elements for link in element.iter('a')):
+                url = _dlpage_path(link)
+                if url is not None:
+                    entry["handouts"].append(
+                        {"name": link.text_content().strip(), "url": DLPAGE_URL_HEAD + url})
+
+        for entry in entries:
+            entry["handouts"] = tuple(entry["handouts"])
+        return tuple(entries)
+
+    def handout_info(self, page: ParsedPage) -> dict:
+        segments = page.document.segments
+        info_dict = {key: None for key in HANDOUT_INFO_KEYS}
+        for i, (text, elements) in enumerate(segments):
+            if not text.startswith('●'):
+                continue
+            values = [segment[0] for segment in segments[i+1:i+4]]
+            if len(values) > 0:
+                title = text[1:].strip()
+                element = values[0].strip()
+            else:
+                title = element = text[1:]
+
+            if title in HANDOUT_SIMPLE_CONTENTS_KEYS:
+                info_dict[HANDOUT_SIMPLE_CONTENTS_KEYS[title]] = element
+
+            # RegexEngineと同様に、ファイル名を含む"本文"を先に判定する
+            elif "本文" in title:
+                for link in (link for element in elements for link in element.iter('a')):
+                    href = link.get('href') or ''
+                    url_start = href.find('/Download')
+                    if url_start != -1:
+                        info_dict["url"] = DL_URL_HEAD + href[url_start:]
+                        info_dict["file_name"] = link.text_content()
+                        break
+
+            elif "ユニ" in title:
+                # ユニット名、回数、日付と時限の3区間
+                info_dict["unit"] = values[0].strip()
+                info_dict["unit_num"] = UNIT_NUM_PATTERN.sub('', values[1])
+                info_dict["period"] = values[2][-2:-1]
+
+            elif "担当" in title:
+                info_dict["teachers"] = tuple(
+                    teacher.strip()
+                    for teacher in TEACHER_SEPARATOR_PATTERN.split(element)
+                )
+
+            elif "公開開始日" == title:
+                info_dict["release_start_at"] = convert_str_to_datetime(element)
+
+            elif "公開終了日" == title:
+                info_dict["release_end_at"] = convert_str_to_datetime(element)
+
+        return info_dict
+
+
+def _dlpage_path(link: lxml.html.HtmlElement) -> str | None:
+    '''
+    ダウンロードページへのリンクの場合、href="./View_Kyozai..."の'.'以降を返す。
+    '''
+    href = link.get('href') or ''
+    if href[1:].startswith('/View_Kyozai'):
+        return href[1:]
+    return None
+
+
+def _class_header(element: lxml.html.HtmlElement) -> str | None:
+    '''
+    <b><font color="red">■1限目</font></b>の場合、時限を返す。
+    '''
+    if (element.tag != 'b') or (len(element) == 0):
+        return None
+    font = element[0]
+    if (font.tag != 'font') or (font.get('color') != 'red'):
+        return None
+    text = font.text_content()
+    if text.startswith('■') and text.endswith('限目'):
+        return text[1:-2].strip()
+    return None
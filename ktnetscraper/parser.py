@@ -1,5 +1,9 @@
 from typing import Literal
+import bisect
+import functools
+import importlib
 import re
+import urllib.parse
 
 from . import exceptions
 from .utils import type_checked, convert_str_to_datetime
@@ -15,16 +19,344 @@ TIMETABLE = 'timetable'
 HANDOUT = 'handout'
 UNKNOWN = 'unknown'
 
+# ページの解析に利用する
+POINT_PATTERN = re.compile('●')
+BR_PATTERN = re.compile('<br />')
+BR_LENGTH = len('<br />')
+UNIT_NUM_PATTERN = re.compile(r'[第回\s]')
+TEACHER_SEPARATOR_PATTERN = re.compile('[,，、､]+')
+DLPAGE_URL_PATTERN = re.compile('<a href=".(/View_Kyozai.*?)">')
+CLASS_HEADER_PATTERN = re.compile('<b><font color="red">■(.*?)限目</font></b>')
+CLASS_ITEM_PATTERN = re.compile('●(.*?)<br />(.*?)<br />')
+HANDOUT_LINK_PATTERN = re.compile('<a href=".(/View_Kyozai.*?)">(.*?)</a>')
+
+# 教材情報の項目と、ページの見出しのうちそのまま値とするもの
+HANDOUT_INFO_KEYS = ("unit", "unit_num", "period", "lesson_type", "thema",
+                     "course", "teachers", "release_start_at", "release_end_at",
+                     "name", "comments", "file_name", "url")
+HANDOUT_SIMPLE_CONTENTS_KEYS = {
+    "区分": "lesson_type",
+    "講義・実習内容": "thema",
+    "講座": "course",
+    "教材・資料名": "name",
+    "教材・資料の説明": "comments",
+}
+# 時間割ページの授業の見出しと、対応する項目
+TIMETABLE_ITEM_KEYS = {
+    "ユニット名": "unit",
+    "講義内容": "thema",
+    "講義室": "room",
+    "担当教員": "teachers",
+}
+
+# ページの種類を表す'■'と、その次の文字
+PAGE_TYPE_SQUARE = '■'
+PAGE_TYPE_INITIALS = {'ロ': LOGIN, 'メ': MENU, '時': TIMETABLE, '教': HANDOUT}
+
+
+class ParserEngine(object):
+    '''
+    ページから情報を取り出す処理(エンジン)の基底クラス。
+    ParsedPageは各情報を初めて参照した際に、エンジンの対応するメソッドを呼び出す。
+    ページの種類の判定はエンジンによらず共通で、各メソッドは正しい種類のページのみを受け取る。
+    独自のエンジンはこのクラスを継承し、register_engine()で登録する。
+
+    Attributes
+    ----------
+    name : str
+        エンジンの名前。get_engine()やParsedPageの引数engineで指定する。
+    '''
+    name = None
+
+    def parse(self, page: 'ParsedPage') -> object:
+        '''
+        ページを解析し、各メソッドで共通して利用する結果を返す。ParsedPage.documentに保持される。
+        '''
+        return None
+
+    def faculty_and_grade(self, page: 'ParsedPage') -> tuple[str, str]:
+        raise NotImplementedError
+
+    def dlpage_urls(self, page: 'ParsedPage') -> tuple[str]:
+        raise NotImplementedError
+
+    def timetable_entries(self, page: 'ParsedPage') -> tuple[dict]:
+        raise NotImplementedError
+
+    def handout_info(self, page: 'ParsedPage') -> dict:
+        raise NotImplementedError
+
+
+class RegexEngine(ParserEngine):
+    '''
+    正規表現と文字列の位置の比較でページを解析するエンジン。デフォルトで利用する。
+    '''
+    name = 'regex'
+
+    def faculty_and_grade(self, page: 'ParsedPage') -> tuple[str, str]:
+        return _parse_faculty_and_grade(page.text)
+
+    def dlpage_urls(self, page: 'ParsedPage') -> tuple[str]:
+        # <a href=".|ココから→|/View_Kyozai.php?
+        # kn=2023M5200780&kg=49&kz=5|←ここまで|">
+        return tuple(DLPAGE_URL_HEAD + url for url in DLPAGE_URL_PATTERN.findall(page.text))
+
+    def timetable_entries(self, page: 'ParsedPage') -> tuple[dict]:
+        return _parse_timetable_entries(page.text)
+
+    def handout_info(self, page: 'ParsedPage') -> dict:
+        return _parse_handout_info(page)
+
+
+# 登録済みのエンジン
+_engines = {RegexEngine.name: RegexEngine()}
+# 追加のライブラリが必要なため、初めて利用する際に読み込むエンジン
+# <名前>: (<モジュール>, <クラス>)
+_lazy_engines = {'lxml': ('.lxml_engine', 'LxmlEngine')}
+_default_engine_name = RegexEngine.name
+
+
+def register_engine(engine: ParserEngine) -> None:
+    '''
+    エンジンを登録する。同じ名前のエンジンは置き換える。
+
+    Parameters
+    ----------
+    engine : ParserEngine
+        登録するエンジン。engine.nameで識別する。
+    '''
+    engine = type_checked(engine, ParserEngine)
+    _engines[type_checked(engine.name, str)] = engine
 
 
-def detect_page_type(text: str) -> Literal['login', 'menu', 'timetable',
-                                           'handout', 'unknown']:
+def get_engine(engine: str | ParserEngine | None = None) -> ParserEngine:
+    '''
+    エンジンを返す。
+
+    Parameters
+    ----------
+    engine : str or ParserEngine, optional
+        エンジンの名前。ParserEngineの場合はそのまま返す。
+        指定しない場合は、set_default_engine()で設定したエンジンを返す。
+
+    Raises
+    ------
+    ValueError :
+        登録されていない名前を指定した。
+    ImportError :
+        エンジンに必要なライブラリがインストールされていない。
+    '''
+    if isinstance(engine, ParserEngine):
+        return engine
+    name = _default_engine_name if engine is None else type_checked(engine, str)
+    if name not in _engines:
+        if name not in _lazy_engines:
+            raise ValueError(f'登録されていないエンジンです。(engine:{name})')
+        module_name, class_name = _lazy_engines[name]
+        module = importlib.import_module(module_name, __package__)
+        _engines[name] = getattr(module, class_name)()
+    return _engines[name]
+
+
+def set_default_engine(engine: str) -> None:
+    '''
+    engineを指定せずにページを解析する際のエンジンを設定する。
+    Scraperが取得したページの解析にも適用される。
+
+    Raises
+    ------
+    ValueError :
+        登録されていない名前を指定した。
+    ImportError :
+        エンジンに必要なライブラリがインストールされていない。
+    '''
+    global _default_engine_name
+    _default_engine_name = get_engine(type_checked(engine, str)).name
+
+
+def available_engines() -> tuple[str]:
+    '''
+    利用できるエンジンの名前を返す。必要なライブラリがインストールされていないエンジンは含まない。
+    '''
+    names = []
+    for name in (*_engines, *_lazy_engines):
+        if name in names:
+            continue
+        try:
+            get_engine(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return tuple(names)
+
+
+class ParsedPage(object):
+    '''
+    ページのソースの改行の除去とページの種類の判定を1度だけ行い、解析結果を保持する。
+    時間割ページからダウンロードページのURLと学部・学年を取得する場合のように、
+    同じページに複数の解析を行う際に利用する。
+    parserモジュールの各関数は、ソースの代わりにParsedPageを受け取ることができる。
+
+    Attributes
+    ----------
+    text : str
+        改行を除いたページのソース。
+    page_type : str
+        ページの種類。detect_page_type()の返り値に準ずる。
+    engine : ParserEngine
+        ページの解析に利用するエンジン。
+    '''
+    def __init__(self, text: str, engine: str | ParserEngine | None = None):
+        '''
+        Parameters
+        ----------
+        text : str
+            ページのソース
+        engine : str or ParserEngine, optional
+            ページの解析に利用するエンジン。指定方法はget_engine()と同じ。
+        '''
+        self.text = type_checked(text, str).replace('\n', '')
+        self.page_type = _detect_page_type(self.text)
+        self.engine = get_engine(engine)
+        self._content = None
+        self._encoding = None
+
+    @classmethod
+    def from_content(cls, content: bytes, encoding: str,
+                     engine: str | ParserEngine | None = None) -> 'ParsedPage':
+        '''
+        復号前のページのソースからParsedPageを作成する。
+        ページの種類はバイト列のまま判定し、textは初めて参照した際に復号する。
+        ログインページや想定外のページのように、種類の判定のみで済むページは復号しない。
+
+        Parameters
+        ----------
+        content : bytes
+            ページのソース。requests.Response.contentに準ずる。
+        encoding : str
+            ページの文字コード
+        engine : str or ParserEngine, optional
+            ページの解析に利用するエンジン。指定方法はget_engine()と同じ。
+        '''
+        page = cls.__new__(cls)
+        page._content = type_checked(content, bytes)
+        page._encoding = type_checked(encoding, str)
+        page.page_type = detect_page_type_from_content(content, encoding)
+        page.engine = get_engine(engine)
+        return page
+
+    @functools.cached_property
+    def text(self) -> str:
+        '''
+        改行を除いたページのソース。from_content()で作成した場合のみ、ここで復号する。
+        '''
+        # requests.Response.textと同様に、復号できないバイトは置き換える
+        return str(self._content, self._encoding, errors='replace').replace('\n', '')
+
+    def validate(self, correct_page_type: str) -> str:
+        '''
+        ページの種類を検証する。validate_page_type()と同じ。
+        '''
+        if self.page_type == LOGIN:
+            raise exceptions.LoginRequiredException('ログインしていません。')
+        elif self.page_type != correct_page_type:
+            message = f'想定されていない形式のページを受け取りました。(page type:{self.page_type})'
+            raise exceptions.UnexpextedContentException(message)
+        return self.page_type
+
+    @functools.cached_property
+    def login_status(self) -> bool:
+        '''
+        ログインに成功しているか。login_status()と同じ。
+        '''
+        match self.page_type:
+            case 'menu' | 'timetable' | 'handout':
+                return True
+            case 'login':
+                return False
+            case _ :
+                message = 'ログイン処理後に取得したページソースを指定してください。' + \
+                          f'(page type:{self.page_type})'
+                raise exceptions.UnexpextedContentException(message)
+
+    @functools.cached_property
+    def faculty_and_grade(self) -> tuple[str, str]:
+        '''
+        時間割ページに表示されている学部と学年。get_faculty_and_grade()と同じ。
+        '''
+        self.validate(TIMETABLE)
+        return self.engine.faculty_and_grade(self)
+
+    @functools.cached_property
+    def dlpage_urls(self) -> tuple[str]:
+        '''
+        時間割ページに掲載されたダウンロードページのURL。get_dlpage_url()と同じ。
+        '''
+        self.validate(TIMETABLE)
+        # 教材の無い時間割ページは復号せずに判定する
+        if (self._content is not None) and \
+           (_content_markers(self._encoding)['dlpage'] not in self._content):
+            return ()
+        return self.engine.dlpage_urls(self)
+
+    @functools.cached_property
+    def timetable_entries(self) -> tuple[dict]:
+        '''
+        時間割ページに掲載された授業の情報。get_timetable_entries()と同じ。
+        '''
+        self.validate(TIMETABLE)
+        return self.engine.timetable_entries(self)
+
+    @functools.cached_property
+    def handout_info(self) -> dict:
+        '''
+        教材ページの教材情報。get_handout_info()と同じ。
+        '''
+        self.validate(HANDOUT)
+        return self.engine.handout_info(self)
+
+    @functools.cached_property
+    def document(self) -> object:
+        '''
+        エンジンによる解析結果。ParserEngine.parse()の返り値。
+        '''
+        return self.engine.parse(self)
+
+    @functools.cached_property
+    def point_positions(self) -> list[int]:
+        '''
+        '●'の位置。
+        '''
+        return [point.start() for point in POINT_PATTERN.finditer(self.text)]
+
+    @functools.cached_property
+    def br_positions(self) -> list[int]:
+        '''
+        最初の'●'以降の'<br />'の位置。
+        '''
+        if len(self.point_positions) == 0:
+            return []
+        return [br.start() for br in BR_PATTERN.finditer(self.text, self.point_positions[0])]
+
+
+def _as_page(text: str | ParsedPage, engine: str | ParserEngine | None = None) -> ParsedPage:
+    '''
+    ParsedPageの場合はそのまま返し、それ以外の場合はengineを利用するParsedPageを作成する。
+    '''
+    if isinstance(text, ParsedPage):
+        return text
+    return ParsedPage(text, engine)
+
+
+
+def detect_page_type(text: str | ParsedPage) -> Literal['login', 'menu', 'timetable',
+                                                        'handout', 'unknown']:
     '''
     どのページか判定する。
     
     Parameters
     ----------
-    text : str
+    text : str or ParsedPage
         ページソース
     
     Returns
@@ -36,36 +368,58 @@ def detect_page_type(text: str) -> Literal['login', 'menu', 'timetable',
         教材情報 -> 'handout'
         上記以外 -> 'unknown'
     '''
-    text = type_checked(text, str).replace('\n', '')
-    try:
-        square_position = text.index('■')
-    except ValueError as ve:
-        if f'{ve}' == 'substring not found':
-            return UNKNOWN
-        else:
-            raise ve
-    
-    initial_title = text[square_position + 1]
-    match initial_title:
-        case 'ロ':
-            return LOGIN
-        case 'メ':
-            return MENU
-        case '時':
-            return TIMETABLE
-        case '教':
-            return HANDOUT
-        case _ :
-            return UNKNOWN
+    return _as_page(text).page_type
 
 
-def validate_page_type(text: str, correct_page_type: str) -> None:
+def detect_page_type_from_content(content: bytes, encoding: str
+                                  ) -> Literal['login', 'menu', 'timetable',
+                                               'handout', 'unknown']:
+    '''
+    復号前のページのソースから、どのページか判定する。
+    '■'とその次の文字をencodingで符号化したバイト列を探し、ページ全体の復号を省略する。
+    '■'が文字の境界に無い可能性がある場合は、ページ全体を復号して判定する。
+
+    Parameters
+    ----------
+    content : bytes
+        ページのソース。requests.Response.contentに準ずる。
+    encoding : str
+        ページの文字コード
+
+    Returns
+    -------
+    str
+        detect_page_type()と同じ。
+    '''
+    content = type_checked(content, bytes)
+    markers = _content_markers(type_checked(encoding, str))
+
+    square_position = content.find(markers['square'])
+    if square_position == -1:
+        return UNKNOWN
+    try:
+        # '■'より前が復号できない場合は、2バイト文字の2バイト目から一致している可能性がある
+        content[:square_position].decode(encoding)
+    except UnicodeDecodeError:
+        return _detect_page_type(str(content, encoding, errors='replace').replace('\n', ''))
+
+    # detect_page_type()と同様に改行は読み飛ばす
+    position = square_position + len(markers['square'])
+    while content.startswith(markers['newline'], position):
+        position += len(markers['newline'])
+    for initial, page_type in markers['initials']:
+        if content.startswith(initial, position):
+            return page_type
+    return UNKNOWN
+
+
+def validate_page_type(text: str | ParsedPage, correct_page_type: str) -> str:
     '''
     ページのタイプを検証する。
     
     Parameters
     ----------
-    text : str
+    text : str or ParsedPage
         ページのソース
     page_type : str
         正しいページのタイプ
@@ -77,26 +431,16 @@ def validate_page_type(text: str, correct_page_type: str) -> None:
     UnexpextedContentException :
         想定されていない形式のページ。
     '''
-    text = type_checked(text, str)
-    page_type = detect_page_type(text)
-    if page_type == LOGIN:
-        raise exceptions.LoginRequiredException('ログインしていません。')
-    elif page_type != correct_page_type:
-        message = f'想定されていない形式のページを受け取りました。(page type:{page_type})'
-        raise exceptions.UnexpextedContentException(message)
-    else:
-        pass
-
-    return page_type
+    return _as_page(text).validate(correct_page_type)
 
 
-def login_status(text: str) -> bool:
+def login_status(text: str | ParsedPage) -> bool:
     '''
     ログインに成功しているか判定する。
 
     Parameters
     ----------
-    text : str
+    text : str or ParsedPage
         メニューページのソース
     
     Returns
@@ -109,27 +453,20 @@ def login_status(text: str) -> bool:
     UnexpextedContentException :
         想定されていない形式のページを受け取った。
     '''
-    text = type_checked(text, str).replace('\n', '')
-    page_type = detect_page_type(text)
-    match page_type:
-        case 'menu' | 'timetable' | 'handout':
-            return True
-        case 'login':
-            return False
-        case _ :
-            message = f'ログイン処理後に取得したページソースを指定してください。' + \
-                       '(page type:{page_type})'
-            raise exceptions.UnexpextedContentException(message)
+    return _as_page(text).login_status
 
 
-def get_faculty_and_grade(text: str) -> tuple[str, str]:
+def get_faculty_and_grade(text: str | ParsedPage,
+                          engine: str | ParserEngine | None = None) -> tuple[str, str]:
     '''
     ログインユーザーの学部と学年を取得する。
 
     Parameters
     ----------
-    text : str
+    text : str or ParsedPage
         時間割ページのソース
+    engine : str or ParserEngine, optional
+        解析に利用するエンジン。textがstrの場合のみ利用する。指定方法はget_engine()と同じ。
 
     Return
     ------
@@ -144,36 +481,20 @@ def get_faculty_and_grade(text: str) -> tuple[str, str]:
     UnexpextedContentException :
         想定されていない形式のページを受け取った。
     '''
-    text = type_checked(text, str).replace('\n', '')
-    validate_page_type(text, TIMETABLE)
-    
-    faculty_grade = re.search(r'(..)学部\d年', text)
-    # 学部
-    if faculty_grade.group()[1]=='医':
-        faculty = 'M'
-    elif faculty_grade.group()[0:2]=='看護':
-        faculty ='N'
-    else:
-        # 学院
-        faculty_grade = re.search(r'(...)大学院（\d）\d年')
-        if faculty_grade.group()[0:3] == '看護学':
-            faculty = 'K'
-        else:
-            faculty = 'D'
-    
-    grade = faculty_grade.group()[-2]
-    
-    return (faculty, grade)
+    return _as_page(text, engine).faculty_and_grade
 
 
-def get_dlpage_url(text: str) -> tuple[str]:
+def get_dlpage_url(text: str | ParsedPage,
+                   engine: str | ParserEngine | None = None) -> tuple[str]:
     '''
     教材ダウンロードページへのURLを取得する。
     
     Parameters
     ----------
-    text : str
+    text : str or ParsedPage
         時間割ページのソース
+    engine : str or ParserEngine, optional
+        解析に利用するエンジン。textがstrの場合のみ利用する。指定方法はget_engine()と同じ。
     
     Returns
     -------
@@ -187,23 +508,85 @@ def get_dlpage_url(text: str) -> tuple[str]:
     UnexpextedContentException :
         想定されていない形式のページを受け取った。
     '''
-    text = type_checked(text, str).replace('\n', '')
-    validate_page_type(text, TIMETABLE)
+    return _as_page(text, engine).dlpage_urls
+
+
+def get_timetable_entries(text: str | ParsedPage,
+                          engine: str | ParserEngine | None = None) -> tuple[dict]:
+    '''
+    時間割ページに掲載された授業の情報を、教材へのリンクとともに取得する。
+    教材ダウンロードページへアクセスせずに分かる情報のみを返す。
+    
+    Parameters
+    ----------
+    text : str or ParsedPage
+        時間割ページのソース
+    engine : str or ParserEngine, optional
+        解析に利用するエンジン。textがstrの場合のみ利用する。指定方法はget_engine()と同じ。
+    
+    Returns
+    -------
+    tuple[dict]
+        授業ごとの情報をdictに格納し、ページに掲載された順に並べる。\n
+        サイトに情報が掲載されていない項目は値がNoneとなる。\n
+        <key> : <type of value>\n
+        "period" : str
+            講義が行われる時限
+        "unit" : str
+            ユニット名
+        "thema" : str
+            講義内容
+        "room" : str
+            講義室
+        "teachers" : tuple[str]
+            教員名
+        "handouts" : tuple[dict]
+            教材の"name"(教材の名前)と"url"(ダウンロードページのURL)。
+            教材が無い場合は空のtuple。
+
+    Raises
+    ------
+    LoginRequiredException :
+        未ログイン状態でサイトにアクセスした。
+    UnexpextedContentException :
+        想定されていない形式のページを受け取った。
+    '''
+    return tuple(dict(entry) for entry in _as_page(text, engine).timetable_entries)
+
+
+def get_handout_key(dlpage_url: str) -> tuple[str, str, str] | None:
+    '''
+    教材ダウンロードページのURLから、教材を識別する(kn, kg, kz)を取得する。
+    
+    Parameters
+    ----------
+    dlpage_url : str
+        教材ダウンロードページのURL
+        (例:'https://kt.kanazawa-med.ac.jp/timetable/View_Kyozai.php?kn=2023M5200780&kg=49&kz=5')
 
-    # <a href=".|ココから→|/View_Kyozai.php?
-    # kn=2023M5200780&kg=49&kz=5|←ここまで|">
-    url_pattern = re.compile('<a href=".(/View_Kyozai.*?)">')
-    return tuple(DLPAGE_URL_HEAD + url for url in re.findall(url_pattern, text))
+    Returns
+    -------
+    tuple[str, str, str] or None
+        (kn, kg, kz)。いずれかが含まれていない場合はNone。
+    '''
+    query = urllib.parse.parse_qs(urllib.parse.urlsplit(type_checked(dlpage_url, str)).query)
+    try:
+        return tuple(query[name][0] for name in ('kn', 'kg', 'kz'))
+    except KeyError:
+        return None
 
 
-def get_handout_info(text: str) -> dict:
+def get_handout_info(text: str | ParsedPage,
+                     engine: str | ParserEngine | None = None) -> dict:
     '''
     教材のダウンロードページにアクセスし、情報を取得する。
     
     Parameters
     ----------
-    text : str
+    text : str or ParsedPage
         教材ページのソース
+    engine : str or ParserEngine, optional
+        解析に利用するエンジン。textがstrの場合のみ利用する。指定方法はget_engine()と同じ。
 
     Returns
     -------
@@ -247,53 +630,159 @@ def get_handout_info(text: str) -> dict:
     UnexpextedContentException :
         想定されていない形式のページを受け取った。
     '''
-    text = type_checked(text, str).replace('\n', '')
-    validate_page_type(text, HANDOUT)
-
-    # '●'を目印に項目名を探す。
-    points = re.finditer("●", text)
-    point_position = [point.start() for point in points]
-
-    info_keys = ("unit", "unit_num", "period", "lesson_type", "thema",
-                 "course", "teachers", "release_start_at", "release_end_at",
-                 "name", "comments", "file_name", "url")
-    info_dict = {key: None for key in info_keys}
-    simple_contents_keys = {
-        "区分": "lesson_type",
-        "講義・実習内容": "thema",
-        "講座": "course",
-        "教材・資料名": "name",
-        "教材・資料の説明": "comments",
+    return dict(_as_page(text, engine).handout_info)
+
+
+@functools.lru_cache
+def _content_markers(encoding: str) -> dict:
+    '''
+    バイト列のままページを判定するための目印を、encodingで符号化して返す。
+    '''
+    return {
+        'square': PAGE_TYPE_SQUARE.encode(encoding),
+        'newline': '\n'.encode(encoding),
+        'initials': tuple((initial.encode(encoding), page_type)
+                          for initial, page_type in PAGE_TYPE_INITIALS.items()),
+        'dlpage': '/View_Kyozai'.encode(encoding),
     }
-    simple_contents_titles = ("区分", "講座", "講義・実習内容",
-                              "教材・資料名", "教材・資料の説明")
 
-    for i in (range(len(point_position))):
-        if len(point_position)-2 <= i:
+
+def _detect_page_type(text: str) -> str:
+    '''
+    改行を除いたページのソースから、ページの種類を判定する。
+    '''
+    try:
+        square_position = text.index('■')
+    except ValueError as ve:
+        if f'{ve}' == 'substring not found':
+            return UNKNOWN
+        else:
+            raise ve
+    
+    initial_title = text[square_position + 1]
+    match initial_title:
+        case 'ロ':
+            return LOGIN
+        case 'メ':
+            return MENU
+        case '時':
+            return TIMETABLE
+        case '教':
+            return HANDOUT
+        case _ :
+            return UNKNOWN
+
+
+def _parse_faculty_and_grade(text: str) -> tuple[str, str]:
+    '''
+    改行を除いた時間割ページのソースから、学部と学年を取得する。
+    '''
+    faculty_grade = re.search(r'(..)学部\d年', text)
+    # 学部
+    if (faculty_grade is not None) and (faculty_grade.group()[1]=='医'):
+        faculty = 'M'
+    elif (faculty_grade is not None) and (faculty_grade.group()[0:2]=='看護'):
+        faculty ='N'
+    else:
+        # 学院
+        faculty_grade = re.search(r'(...)大学院（\d）\d年', text)
+        if faculty_grade is None:
+            message = '学部と学年を取得できませんでした。'
+            raise exceptions.UnexpextedContentException(message)
+        elif faculty_grade.group()[0:3] == '看護学':
+            faculty = 'K'
+        else:
+            faculty = 'D'
+    
+    grade = faculty_grade.group()[-2]
+    
+    return (faculty, grade)
+
+
+def _parse_timetable_entries(text: str) -> tuple[dict]:
+    '''
+    改行を除いた時間割ページのソースから、授業ごとの情報を取得する。
+    '''
+    item_keys = TIMETABLE_ITEM_KEYS
+
+    headers = list(CLASS_HEADER_PATTERN.finditer(text))
+    entries = []
+    for i, header in enumerate(headers):
+        # 授業の範囲は、次の授業の'■'まで
+        end = headers[i+1].start() if i+1 < len(headers) else len(text)
+        entry = {"period": header.group(1).strip() or None}
+        entry.update({key: None for key in item_keys.values()})
+
+        for item in CLASS_ITEM_PATTERN.finditer(text, header.end(), end):
+            key = item_keys.get(item.group(1).strip())
+            element = item.group(2).strip()
+            if (key is None) or (element == ''):
+                continue
+            if key == "teachers":
+                entry[key] = tuple(
+                    teacher.strip()
+                    for teacher in TEACHER_SEPARATOR_PATTERN.split(element)
+                )
+            else:
+                entry[key] = element
+
+        entry["handouts"] = tuple(
+            {"name": link.group(2).strip(), "url": DLPAGE_URL_HEAD + link.group(1)}
+            for link in HANDOUT_LINK_PATTERN.finditer(text, header.end(), end)
+        )
+        entries.append(entry)
+
+    return tuple(entries)
+
+
+def _parse_handout_info(page: ParsedPage) -> dict:
+    '''
+    教材ページから教材情報を取得する。
+    '''
+    text = page.text
+    # 各項目の範囲は'●'と'<br />'の位置の比較のみで求め、部分文字列の切り出しと再走査を行わない。
+    point_position = page.point_positions
+    br_position = page.br_positions
+
+    info_dict = {key: None for key in HANDOUT_INFO_KEYS}
+    simple_contents_keys = HANDOUT_SIMPLE_CONTENTS_KEYS
+
+    len_point_pos = len(point_position)
+    text_length = len(text)
+    for i in range(len_point_pos):
+        # 項目の範囲はtext[start:end]
+        start = point_position[i] + 1
+        if len_point_pos-2 <= i:
             # 一番後ろ、もしくは後ろから二番目の"●"の場合
-            set = text[point_position[i]+1:]
+            end = text_length
         else:
-            set = text[point_position[i]+1:point_position[i+1]]
+            end = point_position[i+1]
 
-        br_position = [br.start() for br in re.finditer("<br />", set)]
+        br_first = bisect.bisect_left(br_position, start)
+        br_last = bisect.bisect_right(br_position, end - BR_LENGTH)
 
         # ●教材・資料名<br />　●R４高齢者の内分泌疾患4年<br />●教材・資料の説明
         # ↑のように要素内に'●'が使用されていると正常に読み込めない
         # 以下、その対策
-        len_br_pos = len(br_position)
+        len_br_pos = br_last - br_first
         if len_br_pos in (0, 1):
-            if len(point_position)-1 != i:
-                set = text[point_position[i]+1:point_position[i+2]]
+            if len_point_pos-1 != i:
+                end = point_position[i+2]
+
+            br_last = bisect.bisect_right(br_position, end - BR_LENGTH)
 
-            br_position = [br.start() for br in re.finditer("<br />", set)]
+        # 範囲内の'<br />'のうち、利用するのは先頭の4つまで
+        brs = br_position[br_first:min(br_last, br_first + 4)]
 
-        br_larger_0 = len_br_pos > 0
-        title = set[:br_position[0]].strip() if br_larger_0 else set
-        element = set[br_position[0]+6:br_position[1]].strip() if br_larger_0 else set
+        if len_br_pos > 0:
+            title = text[start:brs[0]].strip()
+            element = text[brs[0]+BR_LENGTH:brs[1]].strip()
+        else:
+            title = element = text[start:end]
 
 
         # 要素に対し、特別な処理が必要ないもの
-        if title in simple_contents_titles:
+        if title in simple_contents_keys:
             info_dict[simple_contents_keys[title]] = element
         
         # "本文"はtitleにファイル名も含まれているため、本文を条件分岐の後半に設置すると、
@@ -315,15 +804,15 @@ def get_handout_info(text: str) -> dict:
         
         elif "ユニ" in title:
             # ユニット名、回数、日付、時間を含むものに置き換える
-            info_dict["unit"] = set[br_position[0]+6:br_position[1]].strip()
-            info_dict["unit_num"] = re.sub(r'[第回\s]', '', set[br_position[1]+6:br_position[2]])
-            info_dict["period"] = set[br_position[3]-2:br_position[3]-1]
+            info_dict["unit"] = text[brs[0]+BR_LENGTH:brs[1]].strip()
+            info_dict["unit_num"] = UNIT_NUM_PATTERN.sub('', text[brs[1]+BR_LENGTH:brs[2]])
+            info_dict["period"] = text[brs[3]-2:brs[3]-1]
 
         elif "担当" in title:
             # 担当教員
             info_dict["teachers"] = tuple(
                 teacher.strip()
-                for teacher in re.split('[,，、､]+', element)
+                for teacher in TEACHER_SEPARATOR_PATTERN.split(element)
             )
 
         elif "公開開始日" == title:
@@ -337,4 +826,4 @@ def get_handout_info(text: str) -> dict:
         else:
             pass
 
-    return info_dict
\ No newline at end of file
+    return info_dict
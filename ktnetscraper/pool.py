@@ -0,0 +1,189 @@
+from concurrent.futures import ThreadPoolExecutor
+import datetime
+import threading
+
+from .exceptions import NoEligibleScraperException
+from .limiter import RateLimiter
+from .scraper import Scraper
+from .utils import type_checked, convert_to_date
+
+
+class ScraperPool(object):
+    '''
+    ログイン済みの複数のScraperを束ね、学部・学年ごとの取得処理を閲覧可能なアカウントに割り振る。
+    全てのScraperは同じRateLimiterを共有するため、プール全体のリクエストの間隔が制御される。
+
+    Attributes
+    ----------
+    limiter : RateLimiter
+        プール内の全てのScraperが共有するRateLimiter。
+    scrapers : tuple[Scraper]
+        プールに登録されたScraper。
+    '''
+    def __init__(self, limiter: RateLimiter | None = None):
+        '''
+        Parameters
+        ----------
+        limiter : RateLimiter, optional
+            プール内の全てのScraperが共有するRateLimiter。
+            指定しない場合は、初期設定のRateLimiterを作成する。
+        '''
+        self.limiter = RateLimiter() if limiter is None else type_checked(limiter, RateLimiter)
+
+        # [Scraper, 閲覧可能な(学部, 学年)のset, 処理中の件数, 処理した件数]
+        self._entries = []
+        self._lock = threading.Lock()
+
+    @property
+    def scrapers(self) -> tuple[Scraper]:
+        with self._lock:
+            return tuple(entry[0] for entry in self._entries)
+
+    def add(self, scraper: Scraper,
+            cohorts: list[tuple[str, str]] | tuple[tuple[str, str]] | None = None) -> None:
+        '''
+        ログイン済みのScraperをプールに登録する。
+        ScraperのlimiterはプールのRateLimiterに置き換えられる。
+
+        Parameters
+        ----------
+        scraper : Scraper
+            ログイン済みのScraper。
+        cohorts : list[tuple[str, str]] or tuple[tuple[str, str]], optional
+            このアカウントで閲覧可能な(学部, 学年)。
+            指定しない場合は、Scraper.get_faculty_and_grade()で取得したログインユーザーの学部・学年。
+        '''
+        scraper = type_checked(scraper, Scraper)
+        scraper.limiter = self.limiter
+
+        if cohorts is None:
+            cohorts = (scraper.get_faculty_and_grade(),)
+        cohorts = {(type_checked(faculty, str), type_checked(grade, str))
+                   for faculty, grade in cohorts}
+
+        with self._lock:
+            self._entries.append([scraper, cohorts, 0, 0])
+
+    def login(self, id: str, password: str,
+              cohorts: list[tuple[str, str]] | tuple[tuple[str, str]] | None = None,
+              **kwargs) -> Scraper:
+        '''
+        Scraperを作成してログインし、プールに登録する。
+
+        Parameters
+        ----------
+        id : str
+            学籍番号。ハイフンを含む。
+        password : str
+            サイトログイン用のパスワード
+        cohorts : list[tuple[str, str]] or tuple[tuple[str, str]], optional
+            このアカウントで閲覧可能な(学部, 学年)。add()に準ずる。
+        **kwargs :
+            Scraperの初期化に利用する引数。limiterは指定できない。
+
+        Returns
+        -------
+        Scraper
+            登録したScraper。
+        '''
+        scraper = Scraper(limiter=self.limiter, **kwargs)
+        scraper.login(id, password)
+        self.add(scraper, cohorts)
+        return scraper
+
+    def _acquire(self, faculty: str, grade: str) -> list:
+        '''
+        (学部, 学年)を閲覧可能なアカウントのうち、処理中の件数が最も少ないものを選ぶ。
+        同数の場合は、これまでに処理した件数が少ないものを選ぶ。
+
+        Raises
+        ------
+        NoEligibleScraperException :
+            閲覧可能なアカウントが登録されていない。
+        '''
+        with self._lock:
+            eligible = [entry for entry in self._entries if (faculty, grade) in entry[1]]
+            if len(eligible) == 0:
+                raise NoEligibleScraperException(
+                    f'{faculty},{grade}を閲覧可能なアカウントが登録されていません。')
+            entry = min(eligible, key=lambda entry: (entry[2], entry[3]))
+            entry[2] += 1
+            return entry
+
+    def _release(self, entry: list) -> None:
+        with self._lock:
+            entry[2] -= 1
+            entry[3] += 1
+
+    def get_handout_infos(self, date: datetime.date | list[int | str] | tuple[int | str] | str,
+                          faculty: str, grade: str) -> tuple[dict]:
+        '''
+        指定した学部・学年の時間割ページに紐づけられている教材の情報を、
+        閲覧可能なアカウントで取得する。
+
+        Parameters
+        ----------
+        date : datetime.datetime, datetime.date, list[int|str] or tuple[int|str], str
+            時間割ページの日付。指定方法はScraper.get_handout_infos()のdateに準ずる。
+        faculty : str
+            学部。
+        grade : str
+            学年。
+
+        Returns
+        -------
+        tuple[dict]
+            Scraper.get_handout_infos()の返り値と同じ形式。
+
+        Raises
+        ------
+        NoEligibleScraperException :
+            閲覧可能なアカウントが登録されていない。
+        '''
+        date = convert_to_date(date)
+        faculty = type_checked(faculty, str)
+        grade = type_checked(grade, str)
+
+        entry = self._acquire(faculty, grade)
+        try:
+            return entry[0].get_handout_infos(date, faculty=faculty, grade=grade)
+        finally:
+            self._release(entry)
+
+    def map_handout_infos(self, jobs: list[tuple] | tuple[tuple],
+                          max_workers: int | None = None) -> tuple[tuple[dict]]:
+        '''
+        複数の(日付, 学部, 学年)の教材情報を、プール内のアカウントで並列に取得する。
+
+        Parameters
+        ----------
+        jobs : list[tuple] or tuple[tuple]
+            ((<date>, <faculty>, <grade>), ...)
+        max_workers : int, optional
+            並列に処理する件数。指定しない場合は登録されたアカウントの数。
+
+        Returns
+        -------
+        tuple[tuple[dict]]
+            jobsの順序でget_handout_infos()の返り値を格納する。
+
+        Raises
+        ------
+        NoEligibleScraperException :
+            閲覧可能なアカウントが登録されていない学部・学年が含まれる。
+        '''
+        jobs = tuple(type_checked(jobs, (list, tuple)))
+        max_workers = type_checked(max_workers, int, allow_none=True)
+        if max_workers is None:
+            max_workers = max(1, len(self.scrapers))
+
+        # 処理を始める前に、全ての学部・学年を閲覧可能なアカウントがあるか確認する
+        with self._lock:
+            cohorts = set().union(*(entry[1] for entry in self._entries))
+        for _, faculty, grade in jobs:
+            if (faculty, grade) not in cohorts:
+                raise NoEligibleScraperException(
+                    f'{faculty},{grade}を閲覧可能なアカウントが登録されていません。')
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return tuple(executor.map(lambda job: self.get_handout_infos(*job), jobs))
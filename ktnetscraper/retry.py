@@ -0,0 +1,143 @@
+import email.utils
+import datetime
+import random
+
+import requests as rq
+
+from .utils import type_checked
+
+
+class RetryPolicy(object):
+    '''
+    リクエストに失敗した場合の再試行の方針。
+    再試行までの待機時間は指数関数的に増加し、ジッターを加えることができる。
+
+    Attributes
+    ----------
+    max_attempts : int
+        最初のリクエストを含めた試行回数の上限。
+    backoff_base : float
+        1回目の再試行までの待機時間(秒)。再試行の度に2倍になる。
+    backoff_cap : float
+        再試行までの待機時間の上限(秒)。
+    jitter : bool
+        Trueの場合、待機時間を0から計算した値までの一様乱数とする(full jitter)。
+    retry_exceptions : tuple[type[Exception]]
+        再試行の対象とする例外。
+    retry_status_codes : tuple[int]
+        再試行の対象とするステータスコード。
+    respect_retry_after : bool
+        Trueの場合、Retry-Afterヘッダーで指定された時間以上待機する。
+    max_retry_after : float
+        Retry-Afterで待機する時間の上限(秒)。
+        Retry-Afterの値がこれを超える場合は再試行せず、受け取ったResponseを返す。
+    '''
+    def __init__(self, max_attempts: int = 3, backoff_base: float | int = 1.0,
+                 backoff_cap: float | int = 30.0, jitter: bool = True,
+                 retry_exceptions: tuple[type[Exception]] = (rq.ConnectionError, rq.Timeout),
+                 retry_status_codes: tuple[int] = (429, 500, 502, 503, 504),
+                 respect_retry_after: bool = True,
+                 max_retry_after: float | int | None = None):
+        '''
+        Parameters
+        ----------
+        max_attempts : int, default 3
+            最初のリクエストを含めた試行回数の上限。1以上を指定する。
+        backoff_base : float or int, default 1.0
+            1回目の再試行までの待機時間(秒)。再試行の度に2倍になる。
+        backoff_cap : float or int, default 30.0
+            再試行までの待機時間の上限(秒)。
+        jitter : bool, default True
+            Trueの場合、待機時間を0から計算した値までの一様乱数とする。
+        retry_exceptions : tuple[type[Exception]], default (requests.ConnectionError, requests.Timeout)
+            再試行の対象とする例外。
+        retry_status_codes : tuple[int], default (429, 500, 502, 503, 504)
+            再試行の対象とするステータスコード。
+        respect_retry_after : bool, default True
+            Trueの場合、Retry-Afterヘッダーで指定された時間以上待機する。
+        max_retry_after : float or int, optional
+            Retry-Afterで待機する時間の上限(秒)。指定しない場合はbackoff_capと同じ。
+            Retry-Afterの値がこれを超える場合は再試行せず、受け取ったResponseを返す。
+        '''
+        self.max_attempts = type_checked(max_attempts, int)
+        if self.max_attempts < 1:
+            raise ValueError(f'max_attemptsには1以上の値を指定してください。({max_attempts})')
+
+        self.backoff_base = float(type_checked(backoff_base, (float, int)))
+        self.backoff_cap = float(type_checked(backoff_cap, (float, int)))
+        self.jitter = type_checked(jitter, bool)
+        self.retry_exceptions = tuple(type_checked(retry_exceptions, (tuple, list)))
+        self.retry_status_codes = tuple(type_checked(retry_status_codes, (tuple, list)))
+        self.respect_retry_after = type_checked(respect_retry_after, bool)
+        self.max_retry_after = self.backoff_cap if max_retry_after is None else \
+                               float(type_checked(max_retry_after, (float, int)))
+
+    def backoff(self, attempt: int) -> float:
+        '''
+        attempt回目の試行に失敗した後、再試行までに待機する時間を返す。
+
+        Parameters
+        ----------
+        attempt : int
+            失敗した試行の回数(1から始まる)。
+
+        Returns
+        -------
+        float
+            待機時間(秒)。
+        '''
+        delay = min(self.backoff_cap, self.backoff_base * 2 ** (attempt - 1))
+        return random.uniform(0, delay) if self.jitter else delay
+
+    def retry_on_exception(self, exception: Exception, attempt: int) -> bool:
+        '''
+        attempt回目の試行で例外が発生した場合に、再試行するか判定する。
+        '''
+        return (attempt < self.max_attempts) and isinstance(exception, self.retry_exceptions)
+
+    def retry_on_response(self, response: rq.Response, attempt: int) -> bool:
+        '''
+        attempt回目の試行でresponseを受け取った場合に、再試行するか判定する。
+        Retry-Afterの値がmax_retry_afterを超える場合は、長時間スレッドを止めないよう再試行しない。
+        '''
+        if (attempt >= self.max_attempts) or (response.status_code not in self.retry_status_codes):
+            return False
+        if self.respect_retry_after:
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if (retry_after is not None) and (retry_after > self.max_retry_after):
+                return False
+        return True
+
+    def delay(self, attempt: int, response: rq.Response | None = None) -> float:
+        '''
+        再試行までに待機する時間を返す。
+        respect_retry_afterがTrueの場合、Retry-Afterヘッダーの値とbackoff()の大きい方を返す。
+        '''
+        delay = self.backoff(attempt)
+        if self.respect_retry_after and (response is not None):
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+        return delay
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    '''
+    Retry-Afterヘッダーの値を待機時間(秒)に変換する。
+    値は秒数もしくはHTTP-dateで指定される。解釈できない場合はNoneを返す。
+    '''
+    if value is None:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=datetime.timezone.utc)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return max(0.0, (retry_at - now).total_seconds())
@@ -1,16 +1,32 @@
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import BinaryIO, Callable, Iterator
 import datetime
+import hashlib
+import os
+import re
+import threading
 import time
 
 import requests as rq
+from requests.adapters import HTTPAdapter, DEFAULT_POOLSIZE, DEFAULT_POOLBLOCK
 
 from .exceptions import (
     WrongIdPasswordException,
     UnexpextedContentException,
     IncompleteArgumentException,
+    IncompleteDownloadException,
+    LoginRequiredException,
+    DownloadFailedException,
 )
+from .cache import DownloadCache, BlobStore, ResponseCache, HandoutInfoCache
+from .limiter import RateLimiter
+from .retry import RetryPolicy
 from .utils import (
     type_checked,
     convert_to_date,
+    date_range,
+    read_json,
+    write_json,
 )
 from . import parser
 
@@ -20,6 +36,7 @@ from . import parser
 PAGE_CHARSET = 'cp932'
 
 # 各ページのURL
+SITE_URL = 'https://kt.kanazawa-med.ac.jp'
 INDEX_URL = 'https://kt.kanazawa-med.ac.jp/index.php'
 LOGIN_URL = 'https://kt.kanazawa-med.ac.jp/login/Check_Password.php'
 MENU_URL = 'https://kt.kanazawa-med.ac.jp/login/Menu.php?'
@@ -27,6 +44,15 @@ TIMETABLE_URL = 'https://kt.kanazawa-med.ac.jp/timetable/List_Timetable.php'
 DLPAGE_URL_HEAD = "https://kt.kanazawa-med.ac.jp/timetable"
 DL_URL_HEAD = "https://kt.kanazawa-med.ac.jp/timetable"
 
+# save_sessionで保存したセッションを有効とみなす時間(秒)
+SESSION_MAX_AGE = 30 * 60
+
+# download_toで一度に読み込むデータの大きさ(バイト)
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# get_handout_infos_rangeでページを並列に取得するスレッドの数の初期値
+RANGE_MAX_WORKERS = 4
+
 # プロキシサーバーのアドレスの初期値
 PROXIES = {
     'http' : 'http://proxy2.kanazawa-med.ac.jp:8080',
@@ -50,16 +76,39 @@ class Scraper(object):
         プロキシアドレス。requests.Session.get()の引数proxiesに準ずる。
     interval : float
         ウェブサーバーへの過剰な不可を防ぐためのインターバル(秒)。
-        アクセスを繰り返す場合は必ずインターバルを設定してください。
+        前回のリクエスト開始からの経過時間がinterval未満の場合、不足分だけ待機する。
+        limiterのintervalを参照し、設定した値はlimiterに反映される。
     connect_timeout : float
         接続にかける時間のリミット(秒)
     read_timeout : float
         接続後、読み込みにかける時間のリミット(秒)
+    limiter : RateLimiter
+        リクエストの間隔を制御するRateLimiter。
+    retry : RetryPolicy or None
+        リクエストに失敗した場合の再試行の方針。
+    retry_count : int
+        これまでに再試行したリクエストの回数。
+    credentials : tuple[str, str], Callable[[], tuple[str, str]] or None
+        自動で再ログインする際に利用する(学籍番号, パスワード)、もしくはそれを返す関数。
+    last_page_type : str or None
+        最後に受け取ったページの種類。parser.detect_page_type()の返り値に準ずる。
+    login_state : tuple[bool, float] or None
+        (ログイン済みか, 確認した時刻)。時刻はtime.monotonic()の値。
+        ログイン状態が分かるページを受け取る度に更新される。
+    response_cache : ResponseCache or None
+        時間割ページの保存先。
+    handout_cache : HandoutInfoCache or None
+        教材情報の保存先。
     '''
     def __init__(self, session: rq.Session | None = None, verify: bool = True, 
                  enable_proxy: bool = False, proxies: dict | None = None,
                  interval: float | int = 2.0, connect_timeout: float | int = 5.0,
-                 read_timeout: float | int = 5.0):
+                 read_timeout: float | int = 5.0, limiter: RateLimiter | None = None,
+                 pool_connections: int | None = None, pool_maxsize: int | None = None,
+                 pool_block: bool | None = None, retry: RetryPolicy | None = None,
+                 credentials: tuple[str, str] | Callable[[], tuple[str, str]] | None = None,
+                 response_cache: ResponseCache | None = None,
+                 handout_cache: HandoutInfoCache | None = None):
         '''
         Parameters
         ----------
@@ -78,8 +127,36 @@ class Scraper(object):
             接続にかける時間のリミット(秒)
         read_timeout : float or int, default 5.0
             接続後、読み込みにかける時間のリミット(秒)
+        limiter : RateLimiter, optional
+            リクエストの間隔を制御するRateLimiter。複数のインスタンスで共有できる。
+            指定しない場合は、intervalの間隔でリクエストを送信するRateLimiterを作成する。
+        pool_connections : int, optional
+            接続を保持するホストの数。requests.adapters.HTTPAdapterの同名の引数に準ずる。
+        pool_maxsize : int, optional
+            ホストごとに保持する接続の最大数。並列にリクエストする場合はスレッド数以上を指定する。
+        pool_block : bool, optional
+            Trueの場合、保持している接続が全て使用中であれば空くまで待機する。
+        retry : RetryPolicy, optional
+            リクエストに失敗した場合の再試行の方針。指定しない場合は再試行しない。
+        credentials : tuple[str, str] or Callable[[], tuple[str, str]], optional
+            (学籍番号, パスワード)、もしくはそれを返す関数。
+            指定した場合、ページの取得時にログインページを受け取ると自動で再ログインし、
+            同じリクエストをもう一度行う。
+        response_cache : ResponseCache, optional
+            時間割ページの保存先。指定した場合、有効期限内の時間割ページはリクエストせずに利用する。
+        handout_cache : HandoutInfoCache, optional
+            教材情報の保存先。指定した場合、保存済みの教材のダウンロードページはリクエストしない。
+
+        Notes
+        -----
+        - sessionを指定しない場合、もしくはpool_*のいずれかを指定した場合は、
+          SITE_URLに接続プールの設定を反映したHTTPAdapterを登録する。
+          指定しなかった項目はrequestsの初期値に従う。
         '''
         self.session = rq.Session() if session is None else type_checked(session, rq.Session)
+        if (session is None) or \
+           any(arg is not None for arg in (pool_connections, pool_maxsize, pool_block)):
+            _mount_adapter(self.session, pool_connections, pool_maxsize, pool_block)
 
         self.verify = type_checked(verify, bool)
         if self.verify == False:
@@ -88,16 +165,55 @@ class Scraper(object):
         self.enable_proxy = type_checked(enable_proxy, bool)
         self.proxies = PROXIES if proxies is None else type_checked(proxies, dict)
 
-        self.interval = float(type_checked(interval, (float, int)))
+        if limiter is None:
+            self.limiter = RateLimiter(interval=interval)
+        else:
+            self.limiter = type_checked(limiter, RateLimiter)
         
         self.connect_timeout = float(type_checked(connect_timeout, (float, int)))
         self.read_timeout = float(type_checked(read_timeout, (float, int)))
-    
+
+        self.retry = type_checked(retry, RetryPolicy, allow_none=True)
+        self.retry_count = 0
+        self._retry_count_lock = threading.Lock()
+
+        if (credentials is not None) and (not callable(credentials)):
+            credentials = tuple(type_checked(credentials, (tuple, list)))
+        self.credentials = credentials
+        self._session_path = None
+        self._session_max_age = SESSION_MAX_AGE
+        # 保存済みのセッションを読み込んだ際のlogin()の(学籍番号, パスワード)。
+        # セッションがサーバー側で失効していた場合に、一度だけ再ログインに使う。
+        self._fallback_credentials = None
+        # ログインする度に増加する。複数のスレッドによる重複した再ログインを防ぐ。
+        self._login_generation = 0
+        self._login_lock = threading.Lock()
+
+        self.last_page_type = None
+        self.login_state = None
+        # ログイン中のセッションの(学部, 学年)
+        self._faculty_and_grade = None
+
+        self.response_cache = type_checked(response_cache, ResponseCache, allow_none=True)
+        self.handout_cache = type_checked(handout_cache, HandoutInfoCache, allow_none=True)
+
+    @property
+    def interval(self) -> float:
+        '''
+        limiterのリクエストの間隔(秒)。
+        設定した値はlimiterに反映されるため、limiterを共有している全てのインスタンスに適用される。
+        '''
+        return self.limiter.interval
+
+    @interval.setter
+    def interval(self, interval: float | int) -> None:
+        self.limiter.interval = interval
+
     def request(self, **kwargs) -> rq.Response:
         '''
         サーバーへのリクエストを行う。
-        引数で指定しない限り、プロキシサーバーに関する設定(proxies)とSSL/TLSに関する設定
-        (verify)はインスタンス初期化時の設定に従う。
+        引数で指定しない限り、プロキシサーバーに関する設定(proxies)、SSL/TLSに関する設定
+        (verify)、タイムアウト(timeout)はインスタンス初期化時の設定に従う。
 
         Parameters
         ----------
@@ -113,6 +229,9 @@ class Scraper(object):
         proxies : dict, optional
             利用するプロキシサーバーのアドレスを指定することで、プロキシサーバーを利用できる。
             指定がなければ、インスタンス初期化時の設定が反映される。
+        timeout : float or tuple[float, float], optional
+            タイムアウトの時間(秒)。requests.Session.request()のtimeout引数に直接渡される。
+            指定がなければ、(connect_timeout, read_timeout)が反映される。
         encoding : str, optional
             Responseオブジェクトのencoding属性を指定する。
         
@@ -123,46 +242,65 @@ class Scraper(object):
         Notes
         -----
         - Parametersにあげた引数以外にも、requests.Session,request()と同じ引数を利用可能。
+        - retryが設定されている場合、対象の例外やステータスコードを受け取ると再試行する。
+          試行回数の上限に達した場合は、最後に受け取ったResponseを返すか例外を送出する。
+        - encodingを指定し、streamを指定しない場合はページとして扱い、
+          ページの種類とログイン状態をlast_page_typeとlogin_stateに記録する。
         '''
-        kwargs_keys = kwargs.keys()
-        
-        encoding = None
-        if 'encoding' in kwargs_keys:
-            encoding = kwargs['encoding']
-            kwargs.pop('encoding')
+        kwargs, encoding = _prepare_request_kwargs(kwargs, self.verify,
+                                                   self.enable_proxy, self.proxies,
+                                                   (self.connect_timeout, self.read_timeout))
 
-        if 'method' not in kwargs_keys:
-            kwargs['method'] = 'GET'
-        else:
-            pass
-        
-        # 引数の設定を優先
-        if 'verify' in kwargs_keys:
-            if kwargs['verify'] == False:
-                if self.verify == True:
-                    # 初期化時に警告を無視する操作を行っていないため
-                    ignore_insecure_warning()
+        attempt = 1
+        while True:
+            # 再試行の際もインターバルに従う
+            self.limiter.acquire()
+            try:
+                response_data = self.session.request(**kwargs)
+            except Exception as e:
+                if (self.retry is None) or (not self.retry.retry_on_exception(e, attempt)):
+                    raise
+                delay = self.retry.delay(attempt)
             else:
-                pass
-        else:
-            kwargs['verify'] = self.verify
-
-        # 引数の設定を優先
-        if 'proxies' in kwargs_keys:
-            pass
-        elif self.enable_proxy:
-            kwargs['proxies'] = self.proxies
-        else:
-            pass
+                if (self.retry is None) or \
+                   (not self.retry.retry_on_response(response_data, attempt)):
+                    break
+                delay = self.retry.delay(attempt, response_data)
+                response_data.close()
 
-        time.sleep(self.interval)
-        response_data = self.session.request(**kwargs)
+            self._count_retry()
+            time.sleep(delay)
+            attempt += 1
 
         if encoding is not None:
             response_data.encoding = encoding
+            if not kwargs.get('stream', False):
+                self._record_page_state(response_data.content, encoding)
         return response_data
 
-    def login(self, id: str, password: str) -> None:
+    def _record_page_state(self, content: bytes, encoding: str) -> None:
+        '''
+        受け取ったページの種類と、そこから分かるログイン状態を記録する。
+        ログイン状態が分からないページの場合、login_stateは更新しない。
+        ページの種類は復号せずに判定する。
+        '''
+        page_type = parser.detect_page_type_from_content(content, encoding)
+        self.last_page_type = page_type
+        match page_type:
+            case parser.MENU | parser.TIMETABLE | parser.HANDOUT:
+                self.login_state = (True, time.monotonic())
+            case parser.LOGIN:
+                self.login_state = (False, time.monotonic())
+            case _:
+                pass
+
+    def _count_retry(self) -> None:
+        with self._retry_count_lock:
+            self.retry_count += 1
+
+    def login(self, id: str, password: str,
+              session_path: str | os.PathLike | None = None,
+              session_max_age: float | int = SESSION_MAX_AGE) -> None:
         '''
         ログイン処理を行う。
 
@@ -172,6 +310,15 @@ class Scraper(object):
             学籍番号。ハイフンを含む。
         password : str
             サイトログイン用のパスワード
+        session_path : str or os.PathLike, optional
+            セッションの保存先。指定した場合、同じ学籍番号で保存された有効期限内の
+            セッションがあればそれを読み込み、メニューページで有効か確認したうえで
+            ログインのリクエストを省略する。読み込んだセッションがサーバー側で切れていた場合は
+            idとpasswordでログインする。その後セッションが切れた場合も、一度だけ再ログインする。
+            ログインした場合は、新しいセッションを保存する。
+        session_max_age : float or int, default SESSION_MAX_AGE
+            新しく保存するセッションの有効期間(秒)。
+            session_pathを指定した場合は、自動で再ログインした際もセッションを保存する。
         
         Raises
         ------
@@ -183,6 +330,23 @@ class Scraper(object):
         id = type_checked(id, str)
         password = type_checked(password, str)
 
+        if session_path is not None:
+            self._session_path = session_path
+            self._session_max_age = session_max_age
+            # 読み込んだセッションがサーバー側で切れていないか1度だけ確認し、
+            # 切れていればそのままログインする
+            if self.load_session(session_path, id=id) and self.login_status():
+                self._fallback_credentials = (id, password)
+                return
+
+        with self._login_lock:
+            self._post_login(id, password)
+
+    def _post_login(self, id: str, password: str) -> None:
+        '''
+        ログインのリクエストを行い、login()で指定されていればセッションを保存する。
+        呼び出し側で_login_lockを取得しておくこと。
+        '''
         login_data = {
             'strUserId': id,
             'strPassWord': password,
@@ -191,11 +355,8 @@ class Scraper(object):
         response = self.request(method='POST', url=LOGIN_URL, data=login_data,
                                 encoding=PAGE_CHARSET)
         try:
-            parser.login_status(response.text)
+            succeeded = _parse_response(response).login_status
             
-        except WrongIdPasswordException:
-            raise WrongIdPasswordException('学籍番号もしくはパスワードが違います。')
-        
         except UnexpextedContentException:
             login_data['strPassWord'] = '*' * len(login_data['strPassWord'])
             raise UnexpextedContentException('想定されていない形式のページを受け取りました。' +\
@@ -203,11 +364,147 @@ class Scraper(object):
                                              f'status_code:{response.status_code} ' +\
                                              'data:{login_data}')
 
+        if not succeeded:
+            raise WrongIdPasswordException('学籍番号もしくはパスワードが違います。')
 
-    def login_status(self):
+        self._login_generation += 1
+        self._faculty_and_grade = None
+        self._fallback_credentials = None
+        if self._session_path is not None:
+            self.save_session(self._session_path, id=id, max_age=self._session_max_age)
+
+    def logout(self) -> None:
+        '''
+        ログアウトする。
+        セッションのCookieと、ログイン中に取得した学部・学年の情報を破棄する。
+        ローカルの状態を破棄するのみで、サーバーへのリクエストは行わない。
+        '''
+        with self._login_lock:
+            self.session.cookies.clear()
+            self._login_generation += 1
+            self._fallback_credentials = None
+            self._faculty_and_grade = None
+            self.login_state = (False, time.monotonic())
+
+    def _relogin(self, generation: int) -> None:
+        '''
+        credentialsを利用して再ログインする。
+        credentialsが設定されていない場合は、保存済みのセッションを読み込んだlogin()の
+        学籍番号とパスワードを一度だけ利用する。
+        generationの取得後に他のスレッドが既にログインしていた場合は何もしない。
+        '''
+        with self._login_lock:
+            if self._login_generation != generation:
+                return
+            if self.credentials is not None:
+                credentials = self.credentials() if callable(self.credentials) else self.credentials
+            elif self._fallback_credentials is not None:
+                credentials = self._fallback_credentials
+                self._fallback_credentials = None
+            else:
+                return
+            id, password = credentials
+            self._post_login(type_checked(id, str), type_checked(password, str))
+
+    def _request_page(self, **kwargs) -> parser.ParsedPage:
+        '''
+        ページを取得し、ParsedPageとして返す。ソースは解析する際に初めてPAGE_CHARSETで復号する。
+        credentialsが設定されており、ログインページを受け取った場合は、
+        再ログインした後に同じリクエストをもう一度行う。
+        保存済みのセッションを読み込んでログインした場合も、一度だけ同様に再ログインする。
+        引数はrequest()と同じ。
+        '''
+        generation = self._login_generation
+        page = _parse_response(self.request(encoding=PAGE_CHARSET, **kwargs))
+
+        can_relogin = (self.credentials is not None) or (self._fallback_credentials is not None)
+        if can_relogin and (page.page_type == parser.LOGIN):
+            self._relogin(generation)
+            page = _parse_response(self.request(encoding=PAGE_CHARSET, **kwargs))
+
+        return page
+
+    def save_session(self, path: str | os.PathLike, id: str | None = None,
+                     max_age: float | int = SESSION_MAX_AGE) -> None:
+        '''
+        セッションのCookieを有効期限とともにJSONファイルへ保存する。
+        ファイルは所有者のみ読み書きできるパーミッションで作成する。
+
+        Parameters
+        ----------
+        path : str or os.PathLike
+            保存先のパス。
+        id : str, optional
+            セッションに紐づける学籍番号。
+        max_age : float or int, default SESSION_MAX_AGE
+            保存したセッションの有効期間(秒)。
+        '''
+        id = type_checked(id, str, allow_none=True)
+        max_age = float(type_checked(max_age, (float, int)))
+
+        cookies = [
+            {
+                'name': cookie.name,
+                'value': cookie.value,
+                'domain': cookie.domain,
+                'path': cookie.path,
+                'expires': cookie.expires,
+                'secure': cookie.secure,
+            }
+            for cookie in self.session.cookies
+        ]
+        write_json(path, {
+            'id': id,
+            'expires_at': time.time() + max_age,
+            'cookies': cookies,
+        }, private=True)
+
+    def load_session(self, path: str | os.PathLike, id: str | None = None) -> bool:
+        '''
+        save_session()で保存したセッションのCookieを読み込む。
+        ファイルが存在しない、有効期限が切れている、もしくは学籍番号が異なる場合は読み込まない。
+
+        Parameters
+        ----------
+        path : str or os.PathLike
+            保存先のパス。
+        id : str, optional
+            指定した場合、この学籍番号で保存されたセッションのみ読み込む。
+
+        Returns
+        -------
+        bool
+            セッションを読み込んだ場合はTrue。
+        '''
+        id = type_checked(id, str, allow_none=True)
+
+        data = read_json(path)
+        now = time.time()
+        if (data is None) or (data['expires_at'] <= now):
+            return False
+        if (id is not None) and (data['id'] != id):
+            return False
+
+        self._faculty_and_grade = None
+        for cookie in data['cookies']:
+            if (cookie['expires'] is not None) and (cookie['expires'] <= now):
+                continue
+            self.session.cookies.set(cookie['name'], cookie['value'],
+                                     domain=cookie['domain'], path=cookie['path'],
+                                     expires=cookie['expires'], secure=cookie['secure'])
+        return True
+
+    def login_status(self, max_age: float | int | None = None) -> bool:
         '''
         ログイン状態を確認する。
         
+        Parameters
+        ----------
+        max_age : float or int, optional
+            指定した場合、これまでに受け取ったページからmax_age秒以内にログイン状態を
+            確認できていれば、リクエストを行わずにその状態を返す。
+            指定しない場合は、常にメニューページを取得して確認する。
+
         Return
         ------
         bool
@@ -218,14 +515,23 @@ class Scraper(object):
         UnexpextedContentException :
             想定されていない形式のページを受け取った。
         '''
+        max_age = type_checked(max_age, (float, int), allow_none=True)
+        login_state = self.login_state
+        if (max_age is not None) and (login_state is not None):
+            logged_in, checked_at = login_state
+            if time.monotonic() - checked_at <= max_age:
+                return logged_in
+
         response = self.request(method='GET', url=MENU_URL, encoding=PAGE_CHARSET)
 
-        return parser.login_status(response.text)
+        return _parse_response(response).login_status
 
 
     def get_faculty_and_grade(self) -> tuple[str, str]:
         '''
         ログインユーザーの学部と学年を取得する。
+        取得した値はログインし直すまで保持し、2回目以降はリクエストを行わない。
+        get_dlpage_urls()でfacultyとgradeを指定せずに時間割ページを取得した場合も記録される。
 
         Return
         ------
@@ -240,15 +546,33 @@ class Scraper(object):
         UnexpextedContentException :
             想定されていない形式のページを受け取った。
         '''
-        response = self.request(method='GET', url=TIMETABLE_URL, encoding=PAGE_CHARSET)
-       
-        return parser.get_faculty_and_grade(response.text)
+        faculty_and_grade = self._faculty_and_grade
+        if faculty_and_grade is not None:
+            return faculty_and_grade
+
+        generation = self._login_generation
+        page = self._request_page(method='GET', url=TIMETABLE_URL)
+        faculty_and_grade = page.faculty_and_grade
+        self._remember_faculty_and_grade(generation, faculty_and_grade)
+
+        return faculty_and_grade
+
+    def _remember_faculty_and_grade(self, generation: int,
+                                    faculty_and_grade: tuple[str, str]) -> None:
+        '''
+        (学部, 学年)を記録する。
+        ページの取得中にログインし直した場合は、別のセッションの情報となるため記録しない。
+        '''
+        with self._login_lock:
+            if self._login_generation == generation:
+                self._faculty_and_grade = faculty_and_grade
     
 
     def get_dlpage_urls(self, date: datetime.date | list[int | str] | tuple[int | str] | str,
                           faculty: str | None = None, grade: str | None = None) -> tuple[str]:
         '''
         教材ダウンロードページへのURLを取得する。
+        response_cacheが設定されている場合は、有効期限内の保存した時間割ページを利用する。
         
         Parameters
         ----------
@@ -279,33 +603,99 @@ class Scraper(object):
             想定されていない形式のページを受け取った。
         '''
         date = convert_to_date(date)
+        return self._timetable_page(date, faculty, grade).dlpage_urls
 
-        faculty = type_checked(faculty, str, allow_none=True)
-        grade = type_checked(grade, str, allow_none=True)
-        if (faculty is None) != (grade is None):
-            if faculty is None:
-                message = '学年を指定した場合は、学部も指定してください。'
-            else:
-                message = '学部を指定した場合は、学年も指定してください。'
-            raise IncompleteArgumentException(message)
+    def get_timetable(self, date: datetime.date | list[int | str] | tuple[int | str] | str,
+                      faculty: str | None = None, grade: str | None = None) -> tuple[dict]:
+        '''
+        時間割ページに掲載された授業の情報を、教材ダウンロードページへのURLとともに取得する。
+        ダウンロードページへはアクセスしないため、1日分の情報を1回のリクエストで取得できる。
+        公開期間や教材の説明が必要な場合は、get_handout_infos()を利用してください。
+        response_cacheが設定されている場合は、有効期限内の保存した時間割ページを利用する。
         
-        form = {
-            'intSelectYear':date.strftime('%Y'),
-            'intSelectMonth':date.strftime('%m'),
-            'intSelectDay':date.strftime('%d'),
-        }
-        if faculty is not None:
-            form['strSelectGakubuNen'] = f'{faculty},{grade}'
+        Parameters
+        ----------
+        date : datetime.datetime, datetime.date, list[int|str] or tuple[int|str], str
+            時間割ページの日付。指定方法はget_dlpage_urls()と同じ。
+        faculty : str, optional
+            学部。指定する場合は学年の設定も必要。
+            指定しない場合は、ログインユーザーの学部が適用される。
+        grade : str, optional
+            学年。指定する場合は学部の設定も必要。
+            指定しない場合は、ログインユーザーの学年が適用される。
+
+        Returns
+        -------
+        tuple[dict]
+            授業ごとの情報。parser.get_timetable_entries()の返り値に"date"(datetime.date)を加えたもの。
+
+        Raises
+        ------
+        IncompleteArgumentException :
+            faculty引数もしくはgrade引数のみが指定されており、もう一方が不足している。
+        LoginRequiredException :
+            未ログイン状態でサイトにアクセスした。
+        UnexpextedContentException :
+            想定されていない形式のページを受け取った。
+        '''
+        date = convert_to_date(date)
+        page = self._timetable_page(date, faculty, grade)
+        return tuple({**entry, 'date': date} for entry in page.timetable_entries)
+
+    def _timetable_page(self, date: datetime.date, faculty: str | None,
+                        grade: str | None) -> parser.ParsedPage:
+        '''
+        時間割ページを取得する。response_cacheに保存されていれば、保存したページを利用する。
+        学部・学年を指定していない場合は、ページからログインユーザーの学部・学年を記録する。
+        '''
+        form = _timetable_form(date, faculty, grade)
+
+        # 学部・学年を指定しない場合は、ログインユーザーの学部・学年が分かっていれば保存したページを利用できる
+        cohort = self._timetable_cohort(faculty, grade)
+        if (self.response_cache is not None) and (cohort is not None):
+            text = self.response_cache.get(_timetable_cache_key(date, cohort))
+            if text is not None:
+                return parser.ParsedPage(text)
+
+        generation = self._login_generation
+        # 同じページから複数の情報を取得するため、ParsedPageで改行の除去と種類の判定を1度で済ませる
+        page = self._request_page(method='POST', url=TIMETABLE_URL, data=form)
+        page.validate(parser.TIMETABLE)
+
+        # 学部・学年を指定していない場合は、ログインユーザーの時間割ページである
+        if (faculty is None) and (self._faculty_and_grade is None):
+            try:
+                faculty_and_grade = page.faculty_and_grade
+            except UnexpextedContentException:
+                pass
+            else:
+                self._remember_faculty_and_grade(generation, faculty_and_grade)
+
+        cohort = self._timetable_cohort(faculty, grade)
+        if (self.response_cache is not None) and (cohort is not None):
+            self.response_cache.set(_timetable_cache_key(date, cohort), page.text,
+                                    ttl=self.response_cache.ttl_for_date(date),
+                                    tags=(date.strftime('%Y/%m/%d'),))
 
-        response = self.request(method='POST', url=TIMETABLE_URL,
-                                data=form, encoding=PAGE_CHARSET)
+        return page
 
-        return parser.get_dlpage_url(response.text)
+    def _timetable_cohort(self, faculty: str | None, grade: str | None) -> str | None:
+        '''
+        時間割ページの内容を決める学部・学年を'<学部>,<学年>'の形式で返す。
+        指定されておらず、ログインユーザーの学部・学年も分からない場合はNoneを返す。
+        '''
+        if faculty is not None:
+            return f'{faculty},{grade}'
+        faculty_and_grade = self._faculty_and_grade
+        if faculty_and_grade is not None:
+            return ','.join(faculty_and_grade)
+        return None
 
 
     def get_handoutinfo_from_dlpage(self, dlpage_url: str) -> dict:
         '''
         教材のダウンロードページにアクセスし、情報を取得する。
+        handout_cacheに保存されている場合は、リクエストせずに保存した情報を返す。
         
         Parameters
         ----------
@@ -355,16 +745,29 @@ class Scraper(object):
             想定されていない形式のページを受け取った。
         '''
         dlpage_url = type_checked(dlpage_url, str)
+
+        if self.handout_cache is not None:
+            info = self.handout_cache.get(dlpage_url)
+            if info is not None:
+                return info
         
-        response = self.request(method='GET', url=dlpage_url,
-                                encoding=PAGE_CHARSET)
-        
-        return parser.get_handout_info(response.text)
+        page = self._request_page(method='GET', url=dlpage_url)
+        info = page.handout_info
+
+        if self.handout_cache is not None:
+            self.handout_cache.set(dlpage_url, info)
+        return info
+
+    def _flush_handout_cache(self) -> None:
+        '''
+        handout_cacheに書き込まれていない教材情報があれば、ファイルへ書き込む。
+        '''
+        if self.handout_cache is not None:
+            self.handout_cache.flush()
 
-    
     def get_handout_infos(self, date: datetime.date | list[int | str] | tuple[int | str],
-                          faculty: str | None = None, grade: str | None = None
-                          ) -> tuple[dict]:
+                          faculty: str | None = None, grade: str | None = None,
+                          max_workers: int | None = None) -> tuple[dict]:
         '''
         指定した日付に紐づけられている教材の情報を取得する。
 
@@ -380,11 +783,16 @@ class Scraper(object):
         grade : str, optional
             学年。指定する場合は学部の設定も必要。
             指定しない場合は、ログインユーザーの学年が適用される。
+        max_workers : int, optional
+            ダウンロードページを並列に取得するスレッドの数。
+            指定しない場合は1ページずつ順に取得する。
+            並列に取得する場合も、リクエストの間隔はlimiterの設定に従う。
         
         Returns
         -------
         tuple[dict]
             (<handout_info>, ...)
+            ダウンロードページのURLの順序を保って返す。
 
             handout_info : dict
                 取得した教材情報をdictに格納する。\n
@@ -433,12 +841,179 @@ class Scraper(object):
         faculty = type_checked(faculty, str, allow_none=True)
         grade = type_checked(grade, str, allow_none=True)
 
+        max_workers = type_checked(max_workers, int, allow_none=True)
+        if (max_workers is not None) and (max_workers < 1):
+            raise ValueError(f'max_workersには1以上の値を指定してください。({max_workers})')
+
+        if (max_workers is None) or (max_workers == 1):
+            return tuple(
+                info for _, info in
+                self.iter_handout_infos(date, faculty=faculty, grade=grade)
+            )
+
         dlpage_urls = self.get_dlpage_urls(date=date, faculty=faculty, grade=grade)
 
-        return tuple(
-            self.get_handoutinfo_from_dlpage(dlpage_url=dlpage_url)
-            for dlpage_url in dlpage_urls
-        )
+        # Executor.map()は入力の順序で結果を返す。
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                return tuple(executor.map(self.get_handoutinfo_from_dlpage, dlpage_urls))
+        finally:
+            self._flush_handout_cache()
+
+    def iter_handout_infos(self, start: datetime.date | list[int | str] | tuple[int | str] | str,
+                           end: datetime.date | list[int | str] | tuple[int | str] | str | None = None,
+                           faculty: str | None = None, grade: str | None = None
+                           ) -> Iterator[tuple[datetime.date, dict]]:
+        '''
+        指定した日付もしくは期間に紐づけられている教材の情報を、1件ずつ取得して返すジェネレーター。
+        ダウンロードページを1ページ取得して解析する度に返すため、
+        全ての教材情報の取得を待たずに後続の処理を開始でき、教材情報をメモリに溜め込まない。
+
+        Parameters
+        ----------
+        start : datetime.datetime, datetime.date, list[int|str] or tuple[int|str], str
+            日付、もしくは期間の最初の日付。指定方法はget_handout_infos()のdateに準ずる。
+        end : datetime.datetime, datetime.date, list[int|str] or tuple[int|str], str, optional
+            期間の最後の日付(この日付を含む)。指定しない場合はstartの1日のみ。
+        faculty : str, optional
+            学部。指定する場合は学年の設定も必要。
+            指定しない場合は、ログインユーザーの学部が適用される。
+        grade : str, optional
+            学年。指定する場合は学部の設定も必要。
+            指定しない場合は、ログインユーザーの学年が適用される。
+
+        Yields
+        ------
+        tuple[datetime.date, dict]
+            (<時間割ページの日付>, <handout_info>)
+            handout_infoはget_handout_infos()の返り値と同じ形式。
+            日付順、時間割ページへの掲載順に返す。
+
+        Raises
+        ------
+        ValueError :
+            endがstartより前の日付である。
+        IncompleteArgumentException :
+            faculty引数もしくはgrade引数のみが指定されており、もう一方が不足している。
+        LoginRequiredException :
+            未ログイン状態でサイトにアクセスした。
+        UnexpextedContentException :
+            想定されていない形式のページを受け取った。
+        '''
+        dates = date_range(start, start if end is None else end)
+
+        try:
+            for date in dates:
+                dlpage_urls = self.get_dlpage_urls(date=date, faculty=faculty, grade=grade)
+                for dlpage_url in dlpage_urls:
+                    yield date, self.get_handoutinfo_from_dlpage(dlpage_url=dlpage_url)
+        finally:
+            self._flush_handout_cache()
+
+    def get_handout_infos_range(self, start: datetime.date | list[int | str] | tuple[int | str] | str,
+                                end: datetime.date | list[int | str] | tuple[int | str] | str,
+                                faculty: str | None = None, grade: str | None = None,
+                                max_workers: int | None = None
+                                ) -> dict[datetime.date, tuple[dict]]:
+        '''
+        指定した期間の各日付に紐づけられている教材の情報を取得する。
+        時間割ページの取得と、取得済みの時間割ページに掲載されたダウンロードページの取得を
+        並行して進める。複数の日付に掲載されている教材のダウンロードページは1度だけ取得する。
+
+        Parameters
+        ----------
+        start : datetime.datetime, datetime.date, list[int|str] or tuple[int|str], str
+            期間の最初の日付。指定方法はget_handout_infos()のdateに準ずる。
+        end : datetime.datetime, datetime.date, list[int|str] or tuple[int|str], str
+            期間の最後の日付(この日付を含む)。
+        faculty : str, optional
+            学部。指定する場合は学年の設定も必要。
+            指定しない場合は、ログインユーザーの学部が適用される。
+        grade : str, optional
+            学年。指定する場合は学部の設定も必要。
+            指定しない場合は、ログインユーザーの学年が適用される。
+        max_workers : int, optional
+            ページを並列に取得するスレッドの数。指定しない場合はRANGE_MAX_WORKERS。
+            1を指定した場合は1ページずつ順に取得する。
+            並列に取得する場合も、リクエストの間隔はlimiterの設定に従う。
+
+        Returns
+        -------
+        dict[datetime.date, tuple[dict]]
+            {<date>: (<handout_info>, ...), ...}
+            期間内の全ての日付をkeyとして日付順に格納する。
+            handout_infoはget_handout_infos()の返り値と同じ形式。
+
+        Raises
+        ------
+        ValueError :
+            endがstartより前の日付である。
+        IncompleteArgumentException :
+            faculty引数もしくはgrade引数のみが指定されており、もう一方が不足している。
+        LoginRequiredException :
+            未ログイン状態でサイトにアクセスした。
+        UnexpextedContentException :
+            想定されていない形式のページを受け取った。
+        '''
+        dates = date_range(start, end)
+        # 引数の検証のみ行う
+        _timetable_form(dates[0], faculty, grade)
+
+        max_workers = type_checked(max_workers, int, allow_none=True)
+        if (max_workers is not None) and (max_workers < 1):
+            raise ValueError(f'max_workersには1以上の値を指定してください。({max_workers})')
+
+        max_workers = RANGE_MAX_WORKERS if max_workers is None else max_workers
+
+        dlpage_urls = {}
+        info_futures = {}
+        remaining_dates = iter(dates)
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                # 時間割ページの取得はmax_workers件まで予約し、完了する度に
+                # 未取得のダウンロードページと次の日付の時間割ページの取得を予約する。
+                # 全ての時間割ページを先に予約すると、ダウンロードページの取得が後回しになる。
+                url_futures = {}
+                def submit_timetable() -> None:
+                    date = next(remaining_dates, None)
+                    if date is not None:
+                        future = executor.submit(self.get_dlpage_urls, date=date,
+                                                 faculty=faculty, grade=grade)
+                        url_futures[future] = date
+                        pending.add(future)
+
+                pending = set()
+                for _ in range(max_workers):
+                    submit_timetable()
+                try:
+                    while pending:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            if future in url_futures:
+                                urls = future.result()
+                                dlpage_urls[url_futures[future]] = urls
+                                for url in urls:
+                                    if url not in info_futures:
+                                        info_futures[url] = executor.submit(
+                                            self.get_handoutinfo_from_dlpage, url)
+                                        pending.add(info_futures[url])
+                                submit_timetable()
+                            else:
+                                future.result()
+                except BaseException:
+                    # 失敗した場合は、まだ開始していないリクエストを取り消す
+                    for future in pending:
+                        future.cancel()
+                    raise
+        finally:
+            # 実行中のリクエストの完了後に書き込むため、executorの終了を待ってから行う
+            self._flush_handout_cache()
+
+        infos = {url: future.result() for url, future in info_futures.items()}
+        return {
+            date: tuple(dict(infos[url]) for url in dlpage_urls[date])
+            for date in dates
+        }
 
     def download(self, url: str) -> bytes:
         '''
@@ -453,11 +1028,551 @@ class Scraper(object):
         -------
         bytes
             教材データか教材データを格納したリストを返す。
+
+        Raises
+        ------
+        DownloadFailedException :
+            教材の代わりにエラーのステータスコードやページを受け取った。
+        LoginRequiredException :
+            教材の代わりにログインページを受け取った。
+        '''
+        url = type_checked(url, str)
+        response = self.request(method='GET', url=url)
+        _validate_download(response)
+        return response.content
+
+    def download_to(self, url: str, file: str | os.PathLike | BinaryIO,
+                    chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+                    resume: bool = False) -> tuple[int, str]:
+        '''
+        教材をダウンロードし、ファイルに書き込む。
+        データはchunk_sizeごとに読み込みながら書き込むため、教材全体をメモリに保持しない。
+
+        Parameters
+        ----------
+        url : str
+            教材のダウンロードURL
+        file : str, os.PathLike or BinaryIO
+            保存先のパス、もしくはバイナリモードで開かれたファイルオブジェクト。
+            パスを指定した場合は'<パス>.part'に書き込み、完了後に保存先へ置き換える。
+        chunk_size : int, default DOWNLOAD_CHUNK_SIZE
+            一度に読み込むデータの大きさ(バイト)。
+        resume : bool, default False
+            Trueの場合、中断されたダウンロードを再開する。
+            受信した教材のETagもしくはLast-Modifiedを'<パス>.part.json'に記録し、
+            '<パス>.part'が存在すればIf-Rangeを付けたRangeリクエストでその続きから取得する。
+            失敗した場合も'<パス>.part'を削除せずに残す。
+            記録が無い場合、教材が変更されていた場合、もしくはサーバーが
+            Rangeリクエストに対応していない場合は最初から取得し直す。
+            fileにパスを指定した場合のみ有効。
+
+        Returns
+        -------
+        tuple[int, str]
+            (データの大きさ(バイト), SHA-256のハッシュ値(16進数))
+
+        Raises
+        ------
+        IncompleteDownloadException :
+            受信したデータの大きさがContent-Length、もしくは再開した場合に
+            Content-Rangeが示すデータ全体の大きさと一致しない。
+        DownloadFailedException :
+            教材の代わりにエラーのステータスコードやページを受け取った。
+        LoginRequiredException :
+            教材の代わりにログインページを受け取った。
         '''
         url = type_checked(url, str)
-        return self.request(method='GET', url=url).content
+        chunk_size = type_checked(chunk_size, int)
+        resume = type_checked(resume, bool)
+
+        if not isinstance(file, (str, os.PathLike)):
+            response = self.request(method='GET', url=url, stream=True)
+            _validate_download(response)
+            try:
+                return _write_stream(response, file, chunk_size,
+                                     expected_size=_content_length(response))
+            finally:
+                response.close()
+
+        part_path = f'{os.fspath(file)}.part'
+        validator_path = f'{part_path}.json'
+        offset = 0
+        total = None
+        if_range = None
+        if resume and os.path.exists(part_path):
+            # 受信済みのデータと同じ版の教材であることをIf-Rangeで確認できる場合のみ再開する
+            if_range = _if_range_value(read_json(validator_path))
+            if if_range is not None:
+                offset = os.path.getsize(part_path)
+
+        if offset > 0:
+            response = self.request(method='GET', url=url, stream=True,
+                                    headers={'Range': f'bytes={offset}-', 'If-Range': if_range})
+            start, total = _parse_content_range(response)
+            if response.status_code == 206 and start == offset:
+                pass
+            elif response.status_code == 416 and total == offset:
+                # '<パス>.part'の時点で全てのデータを受信済み
+                response.close()
+                sha256 = hashlib.sha256()
+                _update_hash(sha256, part_path, chunk_size)
+                os.replace(part_path, file)
+                _remove_if_exists(validator_path)
+                return offset, sha256.hexdigest()
+            elif response.status_code == 200:
+                # Rangeリクエストが無視されたか、教材が変更された
+                offset = 0
+            else:
+                response.close()
+                offset = 0
+                response = self.request(method='GET', url=url, stream=True)
+        else:
+            response = self.request(method='GET', url=url, stream=True)
+
+        # エラーのページを教材として保存しないよう、'<パス>.part'を開く前に検証する
+        _validate_download(response, (206,) if offset > 0 else (200,))
+        try:
+            if resume and (offset == 0):
+                validator = {'etag': response.headers.get('ETag'),
+                             'last_modified': response.headers.get('Last-Modified')}
+                if _if_range_value(validator) is not None:
+                    write_json(validator_path, validator)
+                else:
+                    _remove_if_exists(validator_path)
+            result = _save_stream(response, file, chunk_size, offset=offset,
+                                  keep_part=resume, expected_total=total if offset > 0 else None)
+        finally:
+            response.close()
+        _remove_if_exists(validator_path)
+        return result
+
+
+    def download_cached(self, url: str, cache: DownloadCache,
+                        chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> str:
+        '''
+        教材をDownloadCacheに保存し、そのパスを返す。
+        保存済みの場合はIf-None-Match/If-Modified-Sinceを付けてリクエストし、
+        304 Not Modifiedを受け取った場合は保存済みの教材をそのまま利用する。
+        サーバーがETagとLast-Modifiedのいずれも返さない場合は、HEADリクエストで
+        Content-Lengthを確認し、保存済みの教材と大きさが同じであれば取得しない。
+
+        Parameters
+        ----------
+        url : str
+            教材のダウンロードURL
+        cache : DownloadCache
+            教材の保存先。
+        chunk_size : int, default DOWNLOAD_CHUNK_SIZE
+            一度に読み込むデータの大きさ(バイト)。
+
+        Returns
+        -------
+        str
+            保存された教材のパス。
+
+        Raises
+        ------
+        IncompleteDownloadException :
+            受信したデータの大きさがContent-Lengthと一致しない。
+        DownloadFailedException :
+            教材の代わりにエラーのステータスコードやページを受け取った。保存済みの情報は更新しない。
+        LoginRequiredException :
+            教材の代わりにログインページを受け取った。
+        '''
+        url = type_checked(url, str)
+        cache = type_checked(cache, DownloadCache)
+        chunk_size = type_checked(chunk_size, int)
+
+        path = cache.path(url)
+        response = self._conditional_get(url, cache.get(url))
+        if response is None:
+            return path
+
+        try:
+            size, sha256 = _save_stream(response, path, chunk_size)
+        finally:
+            response.close()
+
+        cache.store(url, etag=response.headers.get('ETag'),
+                    last_modified=response.headers.get('Last-Modified'),
+                    size=size, sha256=sha256)
+        return path
+
+    def download_stored(self, url: str, store: BlobStore, view: str | os.PathLike | None = None,
+                        chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> str:
+        '''
+        教材をBlobStoreに保存し、そのパスを返す。
+        ハッシュ値はデータを受信しながら計算するため、保存後にファイルを読み直さない。
+        同じ内容の教材が保存済みの場合は、新たなファイルを作成しない。
+        URLに対応する教材が保存済みの場合の検証はdownload_cached()と同じ。
+
+        Parameters
+        ----------
+        url : str
+            教材のダウンロードURL
+        store : BlobStore
+            教材の保存先。
+        view : str or os.PathLike, optional
+            指定した場合、このパスに教材へのハードリンクを作成する。
+            (例:'<日付>/<ユニット名>/<ファイル名>')
+        chunk_size : int, default DOWNLOAD_CHUNK_SIZE
+            一度に読み込むデータの大きさ(バイト)。
+
+        Returns
+        -------
+        str
+            viewを指定した場合はview、指定しない場合はBlobStore内の教材のパス。
+
+        Raises
+        ------
+        IncompleteDownloadException :
+            受信したデータの大きさがContent-Lengthと一致しない。
+        DownloadFailedException :
+            教材の代わりにエラーのステータスコードやページを受け取った。BlobStoreには追加しない。
+        LoginRequiredException :
+            教材の代わりにログインページを受け取った。
+        '''
+        url = type_checked(url, str)
+        store = type_checked(store, BlobStore)
+        chunk_size = type_checked(chunk_size, int)
+
+        response = self._conditional_get(url, store.get(url))
+        if response is None:
+            path = store.path(url)
+        else:
+            temp_path = store.temp_path()
+            try:
+                size, sha256 = _save_stream(response, temp_path, chunk_size)
+            finally:
+                response.close()
+            path = store.add(url, temp_path, size=size, sha256=sha256,
+                             etag=response.headers.get('ETag'),
+                             last_modified=response.headers.get('Last-Modified'))
+
+        if view is None:
+            return path
+        return store.link(url, view)
+
+    def _conditional_get(self, url: str, entry: dict | None) -> rq.Response | None:
+        '''
+        保存済みの教材の検証用の情報(entry)を用いて、教材をstream=Trueでリクエストする。
+        教材が更新されていない場合はNoneを返す。
+
+        Notes
+        -----
+        - entryにETagかLast-Modifiedがある場合は、条件付きリクエストで304を受け取るとNone。
+        - いずれも無い場合は、HEADリクエストのContent-Lengthがentryの大きさと同じであればNone。
+        - 200以外のステータスコードやエラーのページを受け取った場合は例外を送出する。
+        '''
+        headers = {}
+        if entry is not None:
+            if entry['etag'] is not None:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified'] is not None:
+                headers['If-Modified-Since'] = entry['last_modified']
+
+            if len(headers) == 0:
+                # 検証用のヘッダーが無いため、大きさのみで判断する
+                head = self.request(method='HEAD', url=url)
+                if _content_length(head) == entry['size']:
+                    return None
+
+        response = self.request(method='GET', url=url, stream=True, headers=headers)
+        if response.status_code == 304:
+            response.close()
+            return None
+        # エラーのページを保存すると、以降は304を受け取り続けるため保存しない
+        _validate_download(response)
+        return response
+
+
+def _prepare_request_kwargs(kwargs: dict, verify: bool, enable_proxy: bool,
+                            proxies: dict, timeout: tuple[float, float]
+                            ) -> tuple[dict, str | None]:
+    '''
+    requests.Session.request()に渡す引数を整える。
+    引数で指定しない限り、proxies, verify, timeoutはインスタンス初期化時の設定に従う。
+
+    Returns
+    -------
+    tuple[dict, str | None]
+        (requests.Session.request()に渡す引数, Responseに設定するencoding)
+    '''
+    kwargs_keys = kwargs.keys()
+
+    encoding = None
+    if 'encoding' in kwargs_keys:
+        encoding = kwargs['encoding']
+        kwargs.pop('encoding')
+
+    if 'method' not in kwargs_keys:
+        kwargs['method'] = 'GET'
+    else:
+        pass
+
+    # 引数の設定を優先
+    if 'verify' in kwargs_keys:
+        if kwargs['verify'] == False:
+            if verify == True:
+                # 初期化時に警告を無視する操作を行っていないため
+                ignore_insecure_warning()
+        else:
+            pass
+    else:
+        kwargs['verify'] = verify
+
+    # 引数の設定を優先
+    if 'proxies' in kwargs_keys:
+        pass
+    elif enable_proxy:
+        kwargs['proxies'] = proxies
+    else:
+        pass
+
+    # 引数の設定を優先
+    if 'timeout' not in kwargs_keys:
+        kwargs['timeout'] = timeout
+
+    return kwargs, encoding
+
+
+def _parse_response(response: rq.Response) -> parser.ParsedPage:
+    '''
+    encodingを設定したResponseから、復号を後回しにしたParsedPageを作成する。
+    '''
+    return parser.ParsedPage.from_content(response.content, response.encoding or PAGE_CHARSET)
+
+
+def _timetable_form(date: datetime.date, faculty: str | None = None,
+                    grade: str | None = None) -> dict:
+    '''
+    時間割ページへ送信するフォームを作成する。
+
+    Raises
+    ------
+    IncompleteArgumentException :
+        faculty引数もしくはgrade引数のみが指定されており、もう一方が不足している。
+    '''
+    faculty = type_checked(faculty, str, allow_none=True)
+    grade = type_checked(grade, str, allow_none=True)
+    if (faculty is None) != (grade is None):
+        if faculty is None:
+            message = '学年を指定した場合は、学部も指定してください。'
+        else:
+            message = '学部を指定した場合は、学年も指定してください。'
+        raise IncompleteArgumentException(message)
+
+    form = {
+        'intSelectYear':date.strftime('%Y'),
+        'intSelectMonth':date.strftime('%m'),
+        'intSelectDay':date.strftime('%d'),
+    }
+    if faculty is not None:
+        form['strSelectGakubuNen'] = f'{faculty},{grade}'
+
+    return form
+
+
+def _timetable_cache_key(date: datetime.date, cohort: str) -> str:
+    '''
+    時間割ページをResponseCacheに保存する際のキーを返す。
+    '''
+    return ResponseCache.make_key(TIMETABLE_URL, 'POST',
+                                  {'date': date.strftime('%Y/%m/%d')}, cohort)
+
+
+def _content_length(response: rq.Response) -> int | None:
+    '''
+    Content-Lengthを返す。
+    ヘッダーが存在しないか、本文が圧縮されている場合はNoneを返す。
+    '''
+    if 'Content-Encoding' in response.headers:
+        return None
+    content_length = response.headers.get('Content-Length')
+    return int(content_length) if content_length is not None else None
+
+
+def _parse_content_range(response: rq.Response) -> tuple[int | None, int | None]:
+    '''
+    Content-Rangeを解析する。
+
+    Returns
+    -------
+    tuple[int | None, int | None]
+        (本文の開始位置, データ全体の大きさ)
+        ヘッダーが存在しない、もしくは値が不明な場合はNoneとなる。
+    '''
+    content_range = response.headers.get('Content-Range', '')
+    match = re.fullmatch(r'bytes\s+(?:(\d+)-\d+|\*)/(\d+|\*)', content_range.strip())
+    if match is None:
+        return None, None
+
+    start, total = match.groups()
+    return (int(start) if start is not None else None,
+            int(total) if total != '*' else None)
+
+
+def _if_range_value(validator: dict | None) -> str | None:
+    '''
+    '<パス>.part.json'に記録したETag, Last-ModifiedからIf-Rangeヘッダーの値を返す。
+    弱いETagはIf-Rangeに利用できないため、Last-Modifiedを利用する。
+    '''
+    if validator is None:
+        return None
+    etag = validator.get('etag')
+    if (etag is not None) and (not etag.startswith('W/')):
+        return etag
+    return validator.get('last_modified')
+
+
+def _remove_if_exists(path: str | os.PathLike) -> None:
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def _update_hash(sha256, path: str | os.PathLike, chunk_size: int) -> None:
+    '''
+    ファイルの内容をハッシュオブジェクトに追加する。
+    '''
+    with open(path, mode='rb') as f:
+        while chunk := f.read(chunk_size):
+            sha256.update(chunk)
+
+
+def _validate_download(response: rq.Response, status_codes: tuple[int] = (200,)) -> None:
+    '''
+    教材のレスポンスか検証する。教材でない場合はresponseを閉じて例外を送出する。
+
+    Raises
+    ------
+    DownloadFailedException :
+        ステータスコードがstatus_codesに含まれない、もしくはサイトのページを受け取った。
+    LoginRequiredException :
+        セッションが切れており、ログインページを受け取った。
+    '''
+    if response.status_code not in status_codes:
+        response.close()
+        raise DownloadFailedException(
+            f'教材を取得できませんでした。(status_code:{response.status_code} url:{response.url})')
+
+    # セッションが切れている場合などは、200でサイトのページが返される
+    if response.headers.get('Content-Type', '').startswith('text/html'):
+        page_type = parser.detect_page_type_from_content(response.content, PAGE_CHARSET)
+        if page_type == parser.LOGIN:
+            response.close()
+            raise LoginRequiredException('ログインしていません。')
+        elif page_type != parser.UNKNOWN:
+            response.close()
+            raise DownloadFailedException(
+                f'教材の代わりにページを受け取りました。(page type:{page_type} url:{response.url})')
+
+
+def _write_stream(response: rq.Response, file: BinaryIO, chunk_size: int,
+                  sha256=None, expected_size: int | None = None) -> tuple[int, str]:
+    '''
+    レスポンスの本文をchunk_sizeごとにファイルオブジェクトへ書き込む。
+
+    Parameters
+    ----------
+    sha256 : hashlib.sha256, optional
+        既に書き込まれているデータのハッシュオブジェクト。
+    expected_size : int, optional
+        本文の大きさ。受信したデータの大きさと一致しない場合は例外を送出する。
+
+    Returns
+    -------
+    tuple[int, str]
+        (書き込んだデータの大きさ(バイト), SHA-256のハッシュ値(16進数))
+
+    Raises
+    ------
+    IncompleteDownloadException :
+        受信したデータの大きさがexpected_sizeと一致しない。
+    '''
+    sha256 = hashlib.sha256() if sha256 is None else sha256
+    size = 0
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        if chunk:
+            file.write(chunk)
+            sha256.update(chunk)
+            size += len(chunk)
+
+    if (expected_size is not None) and (size != expected_size):
+        raise IncompleteDownloadException(
+            f'受信したデータの大きさが想定と異なります。({size}/{expected_size}バイト)')
+
+    return size, sha256.hexdigest()
+
+
+def _save_stream(response: rq.Response, path: str | os.PathLike, chunk_size: int,
+                 offset: int = 0, keep_part: bool = False,
+                 expected_total: int | None = None) -> tuple[int, str]:
+    '''
+    レスポンスの本文を'<path>.part'に書き込み、完了後にpathへ置き換える。
+
+    Parameters
+    ----------
+    offset : int, default 0
+        0より大きい場合は、'<path>.part'の先頭offsetバイトを残し、その後ろに追記する。
+    keep_part : bool, default False
+        Falseの場合、書き込みに失敗すると'<path>.part'を削除する。
+    expected_total : int, optional
+        ファイル全体の大きさ。一致しない場合はpathへ置き換えずに例外を送出する。
+
+    Returns
+    -------
+    tuple[int, str]
+        (ファイル全体の大きさ(バイト), ファイル全体のSHA-256のハッシュ値(16進数))
+
+    Raises
+    ------
+    IncompleteDownloadException :
+        受信したデータの大きさがContent-Lengthもしくはexpected_totalと一致しない。
+    '''
+    part_path = f'{os.fspath(path)}.part'
+    sha256 = hashlib.sha256()
+    try:
+        if offset > 0:
+            _update_hash(sha256, part_path, chunk_size)
+            mode = 'r+b'
+        else:
+            mode = 'wb'
+
+        with open(part_path, mode=mode) as f:
+            f.seek(offset)
+            f.truncate()
+            size, hexdigest = _write_stream(response, f, chunk_size, sha256=sha256,
+                                            expected_size=_content_length(response))
+        if (expected_total is not None) and (offset + size != expected_total):
+            raise IncompleteDownloadException(
+                f'受信したデータの大きさが想定と異なります。({offset + size}/{expected_total}バイト)')
+        os.replace(part_path, path)
+    except BaseException:
+        if (not keep_part) and os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+
+    return offset + size, hexdigest
+
+
+def _mount_adapter(session: rq.Session, pool_connections: int | None = None,
+                   pool_maxsize: int | None = None, pool_block: bool | None = None) -> None:
+    '''
+    接続プールの設定を反映したHTTPAdapterをSITE_URLに登録する。
+    Noneを指定した項目はrequestsの初期値に従う。
+    '''
+    pool_connections = type_checked(pool_connections, int, allow_none=True)
+    pool_maxsize = type_checked(pool_maxsize, int, allow_none=True)
+    pool_block = type_checked(pool_block, bool, allow_none=True)
+
+    adapter = HTTPAdapter(
+        pool_connections=DEFAULT_POOLSIZE if pool_connections is None else pool_connections,
+        pool_maxsize=DEFAULT_POOLSIZE if pool_maxsize is None else pool_maxsize,
+        pool_block=DEFAULT_POOLBLOCK if pool_block is None else pool_block,
+    )
+    session.mount(SITE_URL, adapter)
 
 
 def ignore_insecure_warning():
     import urllib3
-    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
\ No newline at end of file
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
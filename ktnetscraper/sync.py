@@ -0,0 +1,191 @@
+import datetime
+import os
+import re
+
+import requests as rq
+
+from .scraper import Scraper
+from .exceptions import DownloadFailedException, IncompleteDownloadException
+from .utils import type_checked, date_range, read_json, write_json
+from . import parser
+
+
+MANIFEST_FILE_NAME = '.ktnetscraper-manifest.json'
+
+# マニフェストに保存し、変更の有無を判定する教材情報の項目
+MANIFEST_INFO_KEYS = ('release_start_at', 'release_end_at', 'file_name', 'url')
+
+
+def sync(scraper: Scraper, directory: str | os.PathLike,
+         start: datetime.date | list[int | str] | tuple[int | str] | str,
+         end: datetime.date | list[int | str] | tuple[int | str] | str | None = None,
+         faculty: str | None = None, grade: str | None = None,
+         revalidate: bool = False) -> dict[str, tuple[str]]:
+    '''
+    指定した期間の教材をdirectoryに保存し、前回からの差分のみを取得する。
+    取得した教材はdirectory内のマニフェスト(MANIFEST_FILE_NAME)に記録され、
+    次回以降はマニフェストに記録された教材のダウンロードページと教材を取得しない。
+
+    Parameters
+    ----------
+    scraper : Scraper
+        ログイン済みのScraper。
+    directory : str or os.PathLike
+        教材の保存先。存在しない場合は作成する。
+        教材は'<日付>/<kn>-<kg>-<kz>/<ファイル名>'に保存される。
+    start : datetime.datetime, datetime.date, list[int|str] or tuple[int|str], str
+        期間の最初の日付。指定方法はScraper.get_handout_infos()のdateに準ずる。
+    end : datetime.datetime, datetime.date, list[int|str] or tuple[int|str], str, optional
+        期間の最後の日付(この日付を含む)。指定しない場合はstartの1日のみ。
+    faculty : str, optional
+        学部。指定する場合は学年の設定も必要。
+        指定しない場合は、ログインユーザーの学部が適用される。
+    grade : str, optional
+        学年。指定する場合は学部の設定も必要。
+        指定しない場合は、ログインユーザーの学年が適用される。
+    revalidate : bool, default False
+        Trueの場合、マニフェストに記録された教材もダウンロードページを取得し、
+        公開期間・ファイル名・ダウンロードURLのいずれかが変わっていれば取得し直す。
+
+    Returns
+    -------
+    dict[str, tuple[str]]
+        ダウンロードページのURLを結果ごとに格納する。\n
+        <key> : <type of value>\n
+        "added" : tuple[str]
+            新たに取得した教材
+        "updated" : tuple[str]
+            内容が変わったため取得し直した教材
+        "unchanged" : tuple[str]
+            取得済みのため取得しなかった教材
+        "skipped" : tuple[str]
+            公開期間外、もしくはダウンロードURLが無いため取得しなかった教材
+        "failed" : tuple[str]
+            エラーのステータスコードやページを受け取った、受信したデータが不完全だった、
+            もしくは通信に失敗したため保存しなかった教材。
+            マニフェストには記録せず、次回に改めて取得する。
+
+    Raises
+    ------
+    ValueError :
+        endがstartより前の日付である。
+    IncompleteArgumentException :
+        faculty引数もしくはgrade引数のみが指定されており、もう一方が不足している。
+    LoginRequiredException :
+        未ログイン状態でサイトにアクセスした。
+    UnexpextedContentException :
+        想定されていない形式のページを受け取った。
+    '''
+    scraper = type_checked(scraper, Scraper)
+    directory = os.fspath(type_checked(directory, (str, os.PathLike)))
+    revalidate = type_checked(revalidate, bool)
+    dates = date_range(start, start if end is None else end)
+
+    os.makedirs(directory, exist_ok=True)
+    manifest_path = os.path.join(directory, MANIFEST_FILE_NAME)
+    manifest = read_json(manifest_path, {})
+
+    result = {'added': [], 'updated': [], 'unchanged': [], 'skipped': [], 'failed': []}
+    seen = set()
+    for date in dates:
+        for dlpage_url in scraper.get_dlpage_urls(date=date, faculty=faculty, grade=grade):
+            # 複数の日付に掲載された教材は最初の日付でのみ扱う
+            if dlpage_url in seen:
+                continue
+            seen.add(dlpage_url)
+
+            entry = manifest.get(dlpage_url)
+            if (entry is not None) and (not revalidate) and _is_complete(directory, entry):
+                result['unchanged'].append(dlpage_url)
+                continue
+
+            info = scraper.get_handoutinfo_from_dlpage(dlpage_url)
+            fields = _manifest_fields(info)
+            if (entry is not None) and _is_complete(directory, entry) and \
+               all(entry[key] == value for key, value in fields.items()):
+                result['unchanged'].append(dlpage_url)
+                continue
+
+            if not _is_released(info):
+                result['skipped'].append(dlpage_url)
+                continue
+
+            if (entry is None) or (entry['file_name'] != fields['file_name']):
+                path = handout_path(date, dlpage_url, info)
+            else:
+                path = entry['path']
+            full_path = os.path.join(directory, path)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            try:
+                size, sha256 = scraper.download_to(info['url'], full_path)
+            except (DownloadFailedException, IncompleteDownloadException, rq.RequestException):
+                # 1件の失敗で同期全体を中断しない
+                result['failed'].append(dlpage_url)
+                continue
+
+            if (entry is not None) and (entry['path'] != path) and \
+               os.path.exists(os.path.join(directory, entry['path'])):
+                os.remove(os.path.join(directory, entry['path']))
+
+            manifest[dlpage_url] = {**fields, 'path': path, 'size': size, 'sha256': sha256}
+            # 中断された場合も取得済みの教材を記録しておく
+            write_json(manifest_path, manifest)
+            result['added' if entry is None else 'updated'].append(dlpage_url)
+
+    return {key: tuple(value) for key, value in result.items()}
+
+
+def handout_path(date: datetime.date, dlpage_url: str, info: dict) -> str:
+    '''
+    教材を保存するdirectoryからの相対パスを返す。
+    同じ日付の同名の教材を区別するため、(kn, kg, kz)をディレクトリ名に含める。
+
+    Returns
+    -------
+    str
+        '<YYYY-MM-DD>/<kn>-<kg>-<kz>/<ファイル名>'
+    '''
+    key = parser.get_handout_key(dlpage_url)
+    key = 'handout' if key is None else '-'.join(key)
+    file_name = info['file_name'] or 'handout'
+    return os.path.join(date.strftime('%Y-%m-%d'), _safe_name(key), _safe_name(file_name))
+
+
+def _safe_name(name: str) -> str:
+    name = re.sub(r'[\\/:*?"<>|]', '_', name)
+    # '.'や'..'は保存先のディレクトリやその親を指すため、同じ長さの'_'に置き換える
+    if name.strip('.') == '':
+        return '_' * max(len(name), 1)
+    return name
+
+
+def _manifest_fields(info: dict) -> dict:
+    '''
+    教材情報のうちマニフェストに保存する項目を、JSONで保存できる形式で返す。
+    '''
+    return {
+        key: value.isoformat() if isinstance(value, datetime.datetime) else value
+        for key, value in ((key, info[key]) for key in MANIFEST_INFO_KEYS)
+    }
+
+
+def _is_complete(directory: str, entry: dict) -> bool:
+    '''
+    マニフェストに記録された教材が、記録された大きさで保存されているか判定する。
+    '''
+    path = os.path.join(directory, entry['path'])
+    return os.path.exists(path) and (os.path.getsize(path) == entry['size'])
+
+
+def _is_released(info: dict) -> bool:
+    '''
+    教材を公開期間内でダウンロードできるか判定する。
+    '''
+    if info['url'] is None:
+        return False
+    now = datetime.datetime.now(datetime.timezone.utc)
+    if (info['release_start_at'] is not None) and (now < info['release_start_at']):
+        return False
+    if (info['release_end_at'] is not None) and (info['release_end_at'] < now):
+        return False
+    return True
@@ -1,4 +1,6 @@
 import datetime
+import json
+import os
 
 def type_checked(object, _type, allow_none=False):
     '''
@@ -84,4 +86,56 @@ def convert_str_to_datetime(date: str) -> datetime.datetime:
     tz_jst = datetime.timezone(offset=datetime.timedelta(hours=9), name='JST')
     return datetime.datetime(year=int(date[0][0]), month=int(date[0][1]),
                              day=int(date[0][2]), hour=int(date[1][0]),
-                             minute=int(date[1][1]), tzinfo=tz_jst)
\ No newline at end of file
+                             minute=int(date[1][1]), tzinfo=tz_jst)
+
+
+def date_range(start: datetime.datetime | datetime.date | list[int, str] | tuple[int, str] | str,
+               end: datetime.datetime | datetime.date | list[int, str] | tuple[int, str] | str,
+               ) -> tuple[datetime.date]:
+    '''
+    startからendまで(endを含む)の日付を返す。
+    日付の指定方法はconvert_to_date()に準ずる。
+
+    Returns
+    -------
+    tuple[datetime.date]
+
+    Raises
+    ------
+    ValueError :
+        endがstartより前の日付である。
+    '''
+    start = convert_to_date(start)
+    end = convert_to_date(end)
+    if end < start:
+        raise ValueError(f'endにはstart以降の日付を指定してください。(start:{start} end:{end})')
+
+    return tuple(start + datetime.timedelta(days=i) for i in range((end - start).days + 1))
+
+
+def write_json(path: str | os.PathLike, data, private: bool = False) -> None:
+    '''
+    dataをJSONとして'<path>.tmp'に書き込み、完了後にpathへ置き換える。
+    privateがTrueの場合は、所有者のみ読み書きできるファイルとして作成する。
+    '''
+    tmp_path = f'{os.fspath(path)}.tmp'
+    if private:
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        # 既存の一時ファイルが残っていた場合もパーミッションを揃える
+        os.chmod(tmp_path, 0o600)
+        f = os.fdopen(fd, mode='w', encoding='utf-8')
+    else:
+        f = open(tmp_path, mode='w', encoding='utf-8')
+    with f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def read_json(path: str | os.PathLike, default=None):
+    '''
+    JSONファイルを読み込む。ファイルが存在しない場合はdefaultを返す。
+    '''
+    if not os.path.exists(path):
+        return default
+    with open(path, mode='r', encoding='utf-8') as f:
+        return json.load(f)
\ No newline at end of file
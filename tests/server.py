@@ -0,0 +1,100 @@
+'''
+ダウンロードのテストに利用する、ローカルで動作するHTTPサーバー。
+'''
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import re
+import threading
+
+
+class HandoutServer(object):
+    '''
+    dataを配信するHTTPサーバー。
+
+    Attributes
+    ----------
+    data : bytes
+        配信するデータ。
+    support_range : bool
+        Falseの場合、Rangeヘッダーを無視して常に全体を返す。
+    truncate_at : int or None
+        指定した場合、Content-Lengthは変えずにtruncate_atバイト目で接続を切断する。
+    status : int or None
+        指定した場合、リクエストによらずこのステータスコードでdataを返す。
+    headers : dict
+        レスポンスに追加するヘッダー。
+        ETagかLast-Modifiedを指定すると、条件付きリクエストに304を返し、
+        一致しないIf-Rangeを受け取った場合はRangeを無視する。
+    requests : list[dict]
+        受信したリクエストのヘッダー。'method'にリクエストメソッドを格納する。
+    '''
+    def __init__(self, data: bytes, support_range: bool = True):
+        self.data = data
+        self.support_range = support_range
+        self.truncate_at = None
+        self.status = None
+        self.headers = {}
+        self.requests = []
+
+        server = self
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_HEAD(self):
+                self.do_GET(body=False)
+
+            def do_GET(self, body=True):
+                server.requests.append({'method': self.command, **self.headers})
+                status, headers, content = server.respond(self.headers)
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                if body:
+                    if server.truncate_at is not None:
+                        content = content[:server.truncate_at]
+                    self.wfile.write(content)
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.httpd.server_port}/Download.php'
+        self.thread = threading.Thread(target=self.httpd.serve_forever,
+                                       kwargs={'poll_interval': 0.05}, daemon=True)
+
+    def respond(self, request_headers) -> tuple[int, dict, bytes]:
+        total = len(self.data)
+        headers = dict(self.headers)
+        if self.status is not None:
+            headers['Content-Length'] = str(total)
+            return self.status, headers, self.data
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if ((etag is not None and request_headers.get('If-None-Match') == etag) or
+            (last_modified is not None and
+             request_headers.get('If-Modified-Since') == last_modified)):
+            return 304, headers, b''
+
+        match = re.fullmatch(r'bytes=(\d+)-', request_headers.get('Range', ''))
+        # If-Rangeが現在のETag, Last-Modifiedと一致しない場合はRangeを無視する
+        if_range = request_headers.get('If-Range')
+        if (if_range is not None) and (if_range not in (etag, last_modified)):
+            match = None
+        if self.support_range and (match is not None):
+            start = int(match.group(1))
+            if start >= total:
+                headers.update({'Content-Range': f'bytes */{total}',
+                                'Content-Length': '0'})
+                return 416, headers, b''
+            content = self.data[start:]
+            headers.update({'Content-Range': f'bytes {start}-{total - 1}/{total}',
+                            'Content-Length': str(len(content))})
+            return 206, headers, content
+        headers['Content-Length'] = str(total)
+        return 200, headers, self.data
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -100,7 +100,7 @@ def single_handout_class_infos(i: int = 1):
     )
 
 
-def get_faculty_and_grade_speed(num_runs: int = 17, scale: int = 1):
+def get_faculty_and_grade_speed(num_runs: int = 17, scale: int = 1, engine: str | None = None):
     num_runs *= scale
     total_time = 0.0
     
@@ -117,12 +117,12 @@ def get_faculty_and_grade_speed(num_runs: int = 17, scale: int = 1):
     total_runs = num_runs * page_num
     for i in range(total_runs):
         page = page_list[i%page_num]
-        total_time += parser_speed(parser.get_faculty_and_grade, page)
+        total_time += parser_speed(partial(parser.get_faculty_and_grade, engine=engine), page)
     
     return total_time / total_runs
 
 
-def get_dlpage_url_speed(num_runs: int = 200, scale: int = 1):
+def get_dlpage_url_speed(num_runs: int = 200, scale: int = 1, engine: str | None = None):
     num_runs *= scale
     total_time = 0.0
     class_infos = ''.join([single_handout_class_infos(i) for i in range(6)])
@@ -133,12 +133,12 @@ def get_dlpage_url_speed(num_runs: int = 200, scale: int = 1):
     )
     
     for _ in range(num_runs):
-        total_time += parser_speed(parser.get_dlpage_url, page)
+        total_time += parser_speed(partial(parser.get_dlpage_url, engine=engine), page)
     
     return total_time / num_runs
 
 
-def get_hadout_info_speed(num_runs: int = 200, scale: int = 1):
+def get_hadout_info_speed(num_runs: int = 200, scale: int = 1, engine: str | None = None):
     num_runs *= scale
     total_time = 0.0
     dl_url = r'./Download.php?year=0000&kn=0000X0000000&kg=00&kz=0'
@@ -160,11 +160,27 @@ def get_hadout_info_speed(num_runs: int = 200, scale: int = 1):
             course=course, teachers=teachers, name=name,
             comments=comments, file_name=file_name
         )
-        total_time += parser_speed(parser.get_handout_info, page)
+        total_time += parser_speed(partial(parser.get_handout_info, engine=engine), page)
     
     return total_time / num_runs
 
 
+def get_timetable_entries_speed(num_runs: int = 200, scale: int = 1, engine: str | None = None):
+    num_runs *= scale
+    total_time = 0.0
+    class_infos = ''.join([single_handout_class_infos(i) for i in range(6)])
+    page = template.timetable_template(
+        date='2000/01/01', days_of_week='土',
+        faculty='医', grade='1',
+        class_infos=class_infos
+    )
+
+    for _ in range(num_runs):
+        total_time += parser_speed(partial(parser.get_timetable_entries, engine=engine), page)
+
+    return total_time / num_runs
+
+
 def main():
     import datetime
     print(datetime.date.today().strftime('%Y/%m/%d'))
@@ -177,6 +193,14 @@ def main():
     print('get_dlpage_url       : ', get_dlpage_url_speed(scale=scale))
     print('get_hadout_info      : ', get_hadout_info_speed(scale=scale))
 
+    # 利用できるエンジンごとに比較する
+    for engine in parser.available_engines():
+        print(f'[engine:{engine}]')
+        print('get_faculty_and_grade: ', get_faculty_and_grade_speed(scale=scale, engine=engine))
+        print('get_dlpage_url       : ', get_dlpage_url_speed(scale=scale, engine=engine))
+        print('get_timetable_entries: ', get_timetable_entries_speed(scale=scale, engine=engine))
+        print('get_hadout_info      : ', get_hadout_info_speed(scale=scale, engine=engine))
+
 
 
 if __name__=='__main__':
@@ -197,4 +221,21 @@ if __name__=='__main__':
     # login_status         :  3.5449016094207814e-06
     # get_faculty_and_grade:  2.249866490270539e-05
     # get_dlpage_url       :  1.7417964339255963e-05
-    # get_hadout_info      :  6.075025677681106e-05
\ No newline at end of file
+    # get_hadout_info      :  6.075025677681106e-05
+    # 2026/10/17 get_handout_info()を1度の走査で項目を切り出す実装に変更
+    # scale:20
+    # 変更前 get_hadout_info      :  8.169265389442415e-05
+    # 変更後 get_hadout_info      :  7.521467208862321e-05
+    # 説明が長いページ(2000行)では 9.5e-03 -> 6.1e-03
+    # 2026/10/17 パーサーのエンジンを比較
+    # scale:5
+    # [engine:regex]
+    # get_faculty_and_grade:  3.640065006181311e-05
+    # get_dlpage_url       :  3.035585880279541e-05
+    # get_timetable_entries:  0.0001120728492736817
+    # get_hadout_info      :  8.781325817108151e-05
+    # [engine:lxml] (lxml 6.1.3)
+    # get_faculty_and_grade:  0.0005401651064554844
+    # get_dlpage_url       :  0.000499708008766174
+    # get_timetable_entries:  0.0007254445075988774
+    # get_hadout_info      :  0.00025025639533996554
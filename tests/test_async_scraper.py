@@ -0,0 +1,110 @@
+import asyncio
+import time
+
+import requests as rq
+import pytest
+
+from ktnetscraper import AsyncScraper, exceptions
+import template
+from server import HandoutServer
+from test_scraper import (
+    mock_session_request,
+    mock_session_request_fixture,
+    Response,
+    TIMETABLE_URL,
+    DLPAGE_URL_HEAD,
+    PAGE_ENCODING,
+)
+
+
+# AsyncScraper.request()
+# 返り値がScraper.request()と同じくResponseであることを確認
+def test_async_scraper_request_0(mock_session_request_fixture):
+    scraper = AsyncScraper(interval=0)
+    response = asyncio.run(scraper.request(url='test', encoding=PAGE_ENCODING))
+    assert type(response) == Response
+    assert 'url:test' in response.text
+
+# timeoutを指定しない場合は、Scraperと同じく(connect_timeout, read_timeout)を渡す
+def test_async_scraper_request_2(mock_session_request_fixture):
+    scraper = AsyncScraper(connect_timeout=3, read_timeout=7, interval=0)
+    response = asyncio.run(scraper.request(url='test', encoding=PAGE_ENCODING))
+    assert 'timeout:(3.0, 7.0)' in response.text
+
+
+# 並行して発行したリクエストの間隔がinterval以上空いていることを確認
+def test_async_scraper_request_1(monkeypatch):
+    sent_at = []
+    def mock_request(cls, **kwargs):
+        sent_at.append(time.monotonic())
+        return mock_session_request(cls, **kwargs)
+    monkeypatch.setattr(rq.Session, 'request', mock_request)
+
+    scraper = AsyncScraper(interval=0.05)
+    async def main():
+        await asyncio.gather(*(scraper.request(url='test') for _ in range(3)))
+    asyncio.run(main())
+
+    assert len(sent_at) == 3
+    assert max(sent_at) - min(sent_at) >= 0.05 * 2 * 0.9
+
+
+# AsyncScraper.login()
+def test_async_scraper_login_0(mock_session_request_fixture):
+    scraper = AsyncScraper(interval=0)
+    asyncio.run(scraper.login('correct_id', 'correct_password'))
+
+    assert asyncio.run(scraper.login_status()) == True
+
+
+# AsyncScraper.get_handout_infos()
+# ダウンロードページの順序が保たれることを確認
+def test_async_scraper_get_handout_infos_0(monkeypatch):
+    handout = template.handout_template(
+        urls=[template.dlpage_url(arg_3=i) for i in range(1, 4)],
+        handout_names=['a', 'b', 'c'],
+    )
+    timetable = template.timetable_template(
+        faculty='医', grade='1', date='2000/01/01', days_of_week='土',
+        class_infos=template.class_template(period='1', handout=handout),
+    )
+    def mock_request(cls, **kwargs):
+        url = kwargs['url']
+        if url == TIMETABLE_URL:
+            content = timetable
+        else:
+            kz = url[-1]
+            content = template.handout_info_template(
+                name=f'教材_{kz}', release_start_at='1999/12/31 23:59',
+                release_end_at='2000/01/01 00:00',
+            )
+        return Response(content=content.encode(PAGE_ENCODING), url=url)
+    monkeypatch.setattr(rq.Session, 'request', mock_request)
+
+    scraper = AsyncScraper(interval=0)
+    infos = asyncio.run(scraper.get_handout_infos('2000/01/01'))
+    assert [info['name'] for info in infos] == ['教材_1', '教材_2', '教材_3']
+
+
+# 学部のみ指定した場合はIncompleteArgumentException
+def test_async_scraper_get_dlpage_urls_0(mock_session_request_fixture):
+    scraper = AsyncScraper(interval=0)
+    with pytest.raises(exceptions.IncompleteArgumentException):
+        asyncio.run(scraper.get_dlpage_urls('2000/01/01', faculty='M'))
+
+
+# AsyncScraper.download()
+# Scraper.download()と同じく、ログインページやエラーのステータスコードを教材として返さない
+def test_async_scraper_download_0():
+    scraper = AsyncScraper(interval=0)
+    with HandoutServer(b'handout') as server:
+        assert asyncio.run(scraper.download(server.url)) == b'handout'
+
+        server.data = template.index_template().encode(PAGE_ENCODING)
+        server.headers['Content-Type'] = 'text/html; charset=Shift_JIS'
+        with pytest.raises(exceptions.LoginRequiredException):
+            asyncio.run(scraper.download(server.url))
+
+        server.status = 404
+        with pytest.raises(exceptions.DownloadFailedException):
+            asyncio.run(scraper.download(server.url))
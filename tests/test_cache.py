@@ -0,0 +1,409 @@
+import datetime
+import hashlib
+import os
+
+import requests as rq
+import pytest
+
+from ktnetscraper import Scraper
+from ktnetscraper.cache import (DownloadCache, BlobStore, ResponseCache,
+                                HandoutInfoCache, TZ_JST)
+from ktnetscraper.exceptions import LoginRequiredException, DownloadFailedException
+from server import HandoutServer
+from template import index_template, dlpage_url
+from test_scraper import (mock_session_request, mock_session_request_range,
+                          create_response, TIMETABLE_URL, DLPAGE_URL_HEAD)
+
+
+DATA = bytes(range(256)) * 16
+
+
+# DownloadCache
+# 保存した情報は再読み込み後も利用できる
+def test_download_cache_0(tmp_path):
+    cache = DownloadCache(tmp_path)
+    url = 'https://example.com/Download.php?kn=1'
+    with open(cache.path(url), mode='wb') as f:
+        f.write(DATA)
+    cache.store(url, etag='"a"', last_modified=None, size=len(DATA), sha256='x')
+    cache.flush()
+
+    entry = DownloadCache(tmp_path).get(url)
+    assert entry == {'etag': '"a"', 'last_modified': None,
+                     'size': len(DATA), 'sha256': 'x'}
+
+# ファイルが存在しない -> None
+def test_download_cache_1(tmp_path):
+    cache = DownloadCache(tmp_path)
+    url = 'https://example.com/Download.php?kn=1'
+    cache.store(url, etag='"a"', last_modified=None, size=1, sha256='x')
+    assert cache.get(url) is None
+
+# remove
+def test_download_cache_2(tmp_path):
+    cache = DownloadCache(tmp_path)
+    url = 'https://example.com/Download.php?kn=1'
+    with open(cache.path(url), mode='wb') as f:
+        f.write(DATA)
+    cache.store(url, etag=None, last_modified=None, size=len(DATA), sha256='x')
+    cache.remove(url)
+    assert cache.get(url) is None
+
+# 索引はstore()の度には書き込まず、withブロックの終了時に書き込む
+def test_download_cache_3(tmp_path):
+    url = 'https://example.com/Download.php?kn=1'
+    with DownloadCache(tmp_path) as cache:
+        with open(cache.path(url), mode='wb') as f:
+            f.write(DATA)
+        cache.store(url, etag=None, last_modified=None, size=len(DATA), sha256='x')
+        assert not os.path.exists(os.path.join(tmp_path, DownloadCache.INDEX_FILE_NAME))
+    assert DownloadCache(tmp_path).get(url) is not None
+
+
+# Scraper.download_cached()
+# ETag/Last-Modified -> 2回目は条件付きリクエストで304を受け取る
+@pytest.mark.parametrize(
+    'headers, request_header',
+    [
+        ({'ETag': '"v1"'}, 'If-None-Match'),
+        ({'Last-Modified': 'Sat, 01 Jan 2000 00:00:00 GMT'}, 'If-Modified-Since'),
+    ]
+)
+def test_scraper_download_cached_0(tmp_path, headers, request_header):
+    cache = DownloadCache(tmp_path)
+    scraper = Scraper(interval=0)
+    with HandoutServer(DATA) as server:
+        server.headers = headers
+        path_1 = scraper.download_cached(server.url, cache)
+        path_2 = scraper.download_cached(server.url, cache)
+
+    assert path_1 == path_2
+    assert open(path_2, mode='rb').read() == DATA
+    assert request_header not in server.requests[0]
+    assert request_header in server.requests[1]
+    assert cache.get(server.url)['sha256'] == hashlib.sha256(DATA).hexdigest()
+
+# ETagが変わった -> 取得し直す
+def test_scraper_download_cached_1(tmp_path):
+    cache = DownloadCache(tmp_path)
+    scraper = Scraper(interval=0)
+    with HandoutServer(DATA) as server:
+        server.headers = {'ETag': '"v1"'}
+        scraper.download_cached(server.url, cache)
+        server.data = DATA[::-1]
+        server.headers = {'ETag': '"v2"'}
+        path = scraper.download_cached(server.url, cache)
+
+    assert open(path, mode='rb').read() == DATA[::-1]
+    assert cache.get(server.url)['etag'] == '"v2"'
+
+# 検証用のヘッダーが無い -> HEADで大きさを確認する
+def test_scraper_download_cached_2(tmp_path):
+    cache = DownloadCache(tmp_path)
+    scraper = Scraper(interval=0)
+    with HandoutServer(DATA) as server:
+        scraper.download_cached(server.url, cache)
+        scraper.download_cached(server.url, cache)
+        server.data = DATA + b'new'
+        path = scraper.download_cached(server.url, cache)
+
+    methods = [request['method'] for request in server.requests]
+    assert methods == ['GET', 'HEAD', 'HEAD', 'GET']
+    assert open(path, mode='rb').read() == DATA + b'new'
+
+
+# エラーのステータスコード -> 保存せず、次回は改めて取得する
+def test_scraper_download_cached_e0(tmp_path):
+    cache = DownloadCache(tmp_path)
+    scraper = Scraper(interval=0)
+    with HandoutServer(DATA) as server:
+        server.headers = {'ETag': '"x"'}
+        server.status = 404
+        with pytest.raises(DownloadFailedException):
+            scraper.download_cached(server.url, cache)
+        assert cache.get(server.url) is None
+
+        server.status = None
+        path = scraper.download_cached(server.url, cache)
+
+    assert open(path, mode='rb').read() == DATA
+    assert 'If-None-Match' not in server.requests[1]
+
+# BlobStore, Scraper.download_stored()
+# 同じ内容の教材は1つのファイルとして保存する
+def test_scraper_download_stored_0(tmp_path):
+    store = BlobStore(tmp_path / 'store')
+    scraper = Scraper(interval=0)
+    with HandoutServer(DATA) as server:
+        path_1 = scraper.download_stored(server.url + '?kz=1', store)
+        path_2 = scraper.download_stored(server.url + '?kz=2', store)
+
+    assert path_1 == path_2 == store.blob_path(hashlib.sha256(DATA).hexdigest())
+    assert open(path_1, mode='rb').read() == DATA
+    assert os.listdir(tmp_path / 'store' / 'tmp') == []
+
+# view -> ハードリンクを作成する, 2回目は条件付きリクエスト
+def test_scraper_download_stored_1(tmp_path):
+    store = BlobStore(tmp_path / 'store')
+    scraper = Scraper(interval=0)
+    view = tmp_path / 'view' / '2000-01-01' / 'ユニット_1' / 'file.pdf'
+    with HandoutServer(DATA) as server:
+        server.headers = {'ETag': '"v1"'}
+        scraper.download_stored(server.url, store)
+        store.flush()
+        path = scraper.download_stored(server.url, BlobStore(tmp_path / 'store'), view=view)
+
+    assert path == os.fspath(view)
+    assert open(view, mode='rb').read() == DATA
+    assert os.path.samefile(view, store.path(server.url))
+    assert 'If-None-Match' in server.requests[1]
+
+# ログインページ -> BlobStoreに追加しない
+def test_scraper_download_stored_e0(tmp_path):
+    store = BlobStore(tmp_path / 'store')
+    scraper = Scraper(interval=0)
+    with HandoutServer(index_template().encode('cp932')) as server:
+        server.headers = {'ETag': '"x"', 'Content-Type': 'text/html; charset=Shift_JIS'}
+        with pytest.raises(LoginRequiredException):
+            scraper.download_stored(server.url, store)
+        server.status = 500
+        with pytest.raises(DownloadFailedException):
+            scraper.download_stored(server.url, store)
+
+    assert store.get(server.url) is None
+    assert store.gc() == 0
+
+# gc -> どのURLとも対応していない教材のみ削除する
+def test_blob_store_gc_0(tmp_path):
+    store = BlobStore(tmp_path / 'store')
+    scraper = Scraper(interval=0)
+    with HandoutServer(DATA) as server:
+        scraper.download_stored(server.url + '?kz=1', store)
+        scraper.download_stored(server.url + '?kz=2', store)
+        server.data = DATA[::-1]
+        scraper.download_stored(server.url + '?kz=3', store)
+
+    store.remove(server.url + '?kz=1')
+    assert store.gc() == 0
+    store.remove(server.url + '?kz=2')
+    assert store.gc() == 1
+    assert store.get(server.url + '?kz=2') is None
+    assert open(store.path(server.url + '?kz=3'), mode='rb').read() == DATA[::-1]
+
+# 保存されていない教材のlink() -> KeyError
+def test_blob_store_link_e0(tmp_path):
+    store = BlobStore(tmp_path / 'store')
+    with pytest.raises(KeyError):
+        store.link('https://example.com/Download.php?kn=1', tmp_path / 'view')
+
+
+# ResponseCache
+@pytest.fixture
+def response_cache(tmp_path):
+    return ResponseCache(tmp_path / 'responses', past_ttl=None, present_ttl=60)
+
+# 保存したページを取得できる
+def test_response_cache_0(response_cache):
+    key = ResponseCache.make_key('url', 'post', {'a': '1'}, 'M,1')
+    assert response_cache.get(key) is None
+    response_cache.set(key, 'テキスト', ttl=60)
+    assert response_cache.get(key) == 'テキスト'
+
+# キーはリクエストの内容ごとに異なる
+def test_response_cache_1():
+    keys = {
+        ResponseCache.make_key('url', 'POST', {'a': '1'}, 'M,1'),
+        ResponseCache.make_key('url', 'POST', {'a': '2'}, 'M,1'),
+        ResponseCache.make_key('url', 'POST', {'a': '1'}, 'M,2'),
+        ResponseCache.make_key('url', 'GET', {'a': '1'}, 'M,1'),
+    }
+    assert len(keys) == 4
+    assert ResponseCache.make_key('url', 'post', {'a': '1'}, 'M,1') in keys
+
+# 有効期限切れ, ttl=0
+def test_response_cache_2(response_cache):
+    response_cache.set('expired', 'text', ttl=-1)
+    response_cache.set('zero', 'text', ttl=0)
+    assert response_cache.get('expired') is None
+    assert response_cache.get('zero') is None
+
+# 過去の日付とそれ以外で有効期間が異なる
+def test_response_cache_3(response_cache):
+    today = datetime.datetime.now(TZ_JST).date()
+    assert response_cache.ttl_for_date(today - datetime.timedelta(days=1)) is None
+    assert response_cache.ttl_for_date(today) == 60
+    assert response_cache.ttl_for_date(today + datetime.timedelta(days=1)) == 60
+
+# invalidate, invalidate_tag, clear
+def test_response_cache_4(response_cache):
+    response_cache.set('a', 'text', tags=('2000/01/01',))
+    response_cache.set('b', 'text', tags=('2000/01/02',))
+    response_cache.set('c', 'text')
+    response_cache.invalidate_tag('2000/01/01')
+    assert response_cache.get('a') is None
+    assert response_cache.get('b') == 'text'
+    response_cache.invalidate('b')
+    assert response_cache.get('b') is None
+    response_cache.clear()
+    assert response_cache.get('c') is None
+
+
+# Scraper(response_cache=...)
+@pytest.fixture
+def count_request_fixture(monkeypatch):
+    requested_urls = []
+    def mock_request(cls, **kwargs):
+        requested_urls.append(kwargs['url'])
+        return mock_session_request(cls, **kwargs)
+    monkeypatch.setattr(rq.Session, 'request', mock_request)
+    return requested_urls
+
+# 学部・学年を指定した時間割ページは2回目以降リクエストしない
+def test_scraper_response_cache_0(count_request_fixture, response_cache):
+    scraper = Scraper(interval=0, response_cache=response_cache)
+    scraper.get_dlpage_urls('2000/01/01', faculty='M', grade='1')
+    scraper.get_dlpage_urls('2000/01/01', faculty='M', grade='1')
+    assert count_request_fixture.count(TIMETABLE_URL) == 1
+    # 学部・学年や日付が異なる
+    scraper.get_dlpage_urls('2000/01/01', faculty='M', grade='2')
+    scraper.get_dlpage_urls('2000/01/02', faculty='M', grade='1')
+    assert count_request_fixture.count(TIMETABLE_URL) == 3
+
+# 学部・学年を指定しない -> ログインユーザーの学部・学年として保存する
+def test_scraper_response_cache_1(count_request_fixture, response_cache):
+    scraper = Scraper(interval=0, response_cache=response_cache)
+    scraper.login('correct_id', 'correct_password')
+    scraper.get_dlpage_urls('2000/01/01')
+    scraper.get_dlpage_urls('2000/01/01')
+    scraper.get_dlpage_urls('2000/01/01', faculty='M', grade='6')
+    assert count_request_fixture.count(TIMETABLE_URL) == 1
+
+# 日付を指定して削除 -> 再度リクエストする
+def test_scraper_response_cache_2(count_request_fixture, response_cache):
+    scraper = Scraper(interval=0, response_cache=response_cache)
+    scraper.get_dlpage_urls('2000/01/01', faculty='M', grade='1')
+    response_cache.invalidate_tag('2000/01/01')
+    scraper.get_dlpage_urls('2000/01/01', faculty='M', grade='1')
+    assert count_request_fixture.count(TIMETABLE_URL) == 2
+
+# ログインページは保存しない
+def test_scraper_response_cache_3(monkeypatch, response_cache):
+    def mock_request(cls, **kwargs):
+        return create_response(content=index_template(), url=kwargs['url'])
+    monkeypatch.setattr(rq.Session, 'request', mock_request)
+    scraper = Scraper(interval=0, response_cache=response_cache)
+    with pytest.raises(LoginRequiredException):
+        scraper.get_dlpage_urls('2000/01/01', faculty='M', grade='1')
+    assert os.listdir(response_cache.directory) == []
+
+
+# HandoutInfoCache
+DLPAGE_URL = 'https://kt.kanazawa-med.ac.jp/timetable/View_Kyozai.php?kn=2000M0000000&kg=50&kz=1'
+HANDOUT_INFO = {
+    'unit': 'ユニット_1',
+    'teachers': ('教員_1', '教員_2'),
+    'release_start_at': datetime.datetime(1999, 12, 31, 23, 59, tzinfo=TZ_JST),
+    'release_end_at': None,
+    'url': 'https://kt.kanazawa-med.ac.jp/timetable/Download.php?kz=1',
+}
+
+# 保存した教材情報を、ファイルから読み込んだ場合も同じ値で取得できる
+def test_handout_info_cache_0(tmp_path):
+    handout_cache = HandoutInfoCache(tmp_path / 'handouts.json')
+    assert handout_cache.get(DLPAGE_URL) is None
+    handout_cache.set(DLPAGE_URL, HANDOUT_INFO)
+    assert handout_cache.get(DLPAGE_URL) == HANDOUT_INFO
+    handout_cache.flush()
+
+    info = HandoutInfoCache(tmp_path / 'handouts.json').get(DLPAGE_URL)
+    assert info == HANDOUT_INFO
+    assert isinstance(info['teachers'], tuple)
+
+# 時間割ページ上のURLが変わった場合, max_ageを過ぎた場合は取得しない
+def test_handout_info_cache_1(tmp_path):
+    handout_cache = HandoutInfoCache(tmp_path / 'handouts.json')
+    handout_cache.set(DLPAGE_URL, HANDOUT_INFO)
+    assert handout_cache.get(DLPAGE_URL + '&rev=2') is None
+
+    handout_cache.max_age = 0
+    assert handout_cache.get(DLPAGE_URL) is None
+
+# (kn, kg, kz)を含まないURLは保存しない, remove, clear
+def test_handout_info_cache_2(tmp_path):
+    handout_cache = HandoutInfoCache(tmp_path / 'handouts.json')
+    handout_cache.set('https://example.com/View_Kyozai.php?kn=1', HANDOUT_INFO)
+    assert handout_cache.get('https://example.com/View_Kyozai.php?kn=1') is None
+
+    handout_cache.set(DLPAGE_URL, HANDOUT_INFO)
+    handout_cache.remove(DLPAGE_URL)
+    assert handout_cache.get(DLPAGE_URL) is None
+    handout_cache.set(DLPAGE_URL, HANDOUT_INFO)
+    handout_cache.clear()
+    assert HandoutInfoCache(tmp_path / 'handouts.json').get(DLPAGE_URL) is None
+
+# flush_every回の変更ごと、もしくはwithブロックの終了時にまとめて書き込む
+def test_handout_info_cache_3(tmp_path):
+    path = tmp_path / 'handouts.json'
+    urls = [f'{DLPAGE_URL[:-1]}{i}' for i in range(1, 6)]
+    with HandoutInfoCache(path, flush_every=3) as handout_cache:
+        for url in urls[:2]:
+            handout_cache.set(url, HANDOUT_INFO)
+        assert not path.exists()
+        handout_cache.set(urls[2], HANDOUT_INFO)
+        assert HandoutInfoCache(path).get(urls[2]) == HANDOUT_INFO
+
+        handout_cache.set(urls[3], HANDOUT_INFO)
+        assert HandoutInfoCache(path).get(urls[3]) is None
+    assert HandoutInfoCache(path).get(urls[3]) == HANDOUT_INFO
+
+# prune -> max_ageを過ぎた教材情報と、URLに含まれない(kn, kg, kz)の教材情報を削除する
+def test_handout_info_cache_4(tmp_path):
+    path = tmp_path / 'handouts.json'
+    urls = [f'{DLPAGE_URL[:-1]}{i}' for i in range(1, 4)]
+    handout_cache = HandoutInfoCache(path)
+    for url in urls:
+        handout_cache.set(url, HANDOUT_INFO)
+
+    # URLの他のパラメーターが変わっても(kn, kg, kz)が同じなら削除しない
+    assert handout_cache.prune([urls[0] + '&rev=2', urls[1]]) == 1
+    assert handout_cache.get(urls[2]) is None
+    assert HandoutInfoCache(path).get(urls[0]) == HANDOUT_INFO
+
+    handout_cache.max_age = 0
+    assert handout_cache.prune() == 2
+    handout_cache.max_age = None
+    assert HandoutInfoCache(path).get(urls[0]) is None
+
+
+# Scraper(handout_cache=...)
+# 2回目の取得では、時間割ページのみリクエストする
+def test_scraper_handout_cache_0(monkeypatch, tmp_path):
+    requested_urls = []
+    def mock_request(cls, **kwargs):
+        requested_urls.append(kwargs['url'])
+        return mock_session_request_range(cls, **kwargs)
+    monkeypatch.setattr(rq.Session, 'request', mock_request)
+
+    scraper = Scraper(interval=0, handout_cache=HandoutInfoCache(tmp_path / 'handouts.json'))
+    infos = scraper.get_handout_infos_range('2000/01/01', '2000/01/03')
+    assert len(requested_urls) == 3 + 3
+
+    requested_urls.clear()
+    scraper = Scraper(interval=0, handout_cache=HandoutInfoCache(tmp_path / 'handouts.json'))
+    assert scraper.get_handout_infos_range('2000/01/01', '2000/01/03') == infos
+    assert requested_urls == [TIMETABLE_URL] * 3
+
+# 途中で失敗した場合も、取得済みの教材情報はファイルへ書き込む
+def test_scraper_handout_cache_1(monkeypatch, tmp_path):
+    def mock_request(cls, **kwargs):
+        if (kwargs['url'] == TIMETABLE_URL) and (kwargs['data']['intSelectDay'] == '03'):
+            raise rq.ConnectionError('test')
+        return mock_session_request_range(cls, **kwargs)
+    monkeypatch.setattr(rq.Session, 'request', mock_request)
+
+    scraper = Scraper(interval=0, handout_cache=HandoutInfoCache(tmp_path / 'handouts.json'))
+    with pytest.raises(rq.ConnectionError):
+        scraper.get_handout_infos_range('2000/01/01', '2000/01/03', max_workers=1)
+    handout_cache = HandoutInfoCache(tmp_path / 'handouts.json')
+    urls = [DLPAGE_URL_HEAD + dlpage_url(arg_3=kz)[1:] for kz in (1, 2, 3)]
+    assert all(handout_cache.get(url) is not None for url in urls)
@@ -0,0 +1,128 @@
+import datetime
+
+import pytest
+
+from ktnetscraper.cache import TZ_JST
+from ktnetscraper.index import HandoutIndex
+
+
+def create_info(kz, unit='ユニット_1', course='コース_1', teachers=('教員_1',),
+                release_start_at=datetime.datetime(2000, 1, 1, 9, 0, tzinfo=TZ_JST),
+                period='1'):
+    return {
+        'unit': unit,
+        'unit_num': '1',
+        'period': period,
+        'lesson_type': '講義',
+        'thema': f'テーマ_{kz}',
+        'course': course,
+        'teachers': teachers,
+        'release_start_at': release_start_at,
+        'release_end_at': datetime.datetime(2000, 12, 31, 23, 59, tzinfo=TZ_JST),
+        'name': f'教材_{kz}',
+        'comments': None,
+        'file_name': f'file_{kz}.pdf',
+        'url': f'https://kt.kanazawa-med.ac.jp/timetable/Download.php?kz={kz}',
+    }
+
+@pytest.fixture
+def index():
+    index = HandoutIndex()
+    index.upsert([
+        (datetime.date(2000, 1, 1), create_info(1)),
+        (datetime.date(2000, 1, 1), create_info(2, unit='ユニット_2', period='2',
+                                                teachers=('教員_1', '教員_2'))),
+        (datetime.date(2000, 1, 8), create_info(
+            3, course='コース_2', teachers=('教員_2',),
+            release_start_at=datetime.datetime(2000, 1, 8, 9, 0, tzinfo=TZ_JST))),
+    ])
+    yield index
+    index.close()
+
+
+# 保存した教材情報を同じ形式で取得できる
+def test_handout_index_0(index):
+    info = index.get(create_info(2)['url'])
+    assert info == {**create_info(2, unit='ユニット_2', period='2',
+                                  teachers=('教員_1', '教員_2')),
+                    'date': datetime.date(2000, 1, 1)}
+    assert index.get('https://example.com') is None
+    assert len(index) == 3
+
+# 条件を指定して検索する
+@pytest.mark.parametrize(
+        'kwargs, kz_list',
+        [
+            ({}, [1, 2, 3]),
+            ({'unit': 'ユニット_1'}, [1, 3]),
+            ({'course': 'コース_2'}, [3]),
+            ({'teacher': '教員_2'}, [2, 3]),
+            ({'date_from': '2000/01/02'}, [3]),
+            ({'date_to': (2000, 1, 7)}, [1, 2]),
+            ({'released_from': datetime.datetime(2000, 1, 8)}, [3]),
+            ({'released_to': datetime.datetime(2000, 1, 1, 0, 0, tzinfo=datetime.timezone.utc)},
+             [1, 2]),
+            ({'unit': 'ユニット_1', 'teacher': '教員_1'}, [1]),
+        ]
+)
+def test_handout_index_find_0(index, kwargs, kz_list):
+    infos = index.find(**kwargs)
+    assert [info['name'] for info in infos] == [f'教材_{kz}' for kz in kz_list]
+
+# 同じURLの教材情報は上書きする, URLが無い教材情報は保存しない
+def test_handout_index_upsert_0(index):
+    count = index.upsert([
+        (datetime.date(2000, 1, 1), create_info(1, teachers=('教員_3',))),
+        {**create_info(4), 'url': None},
+    ])
+    assert count == 1
+    assert len(index) == 3
+    assert index.get(create_info(1)['url'])['teachers'] == ('教員_3',)
+    assert [info['name'] for info in index.find(teacher='教員_1')] == ['教材_2']
+
+# 途中で失敗した場合は何も保存しない
+def test_handout_index_upsert_1(index):
+    with pytest.raises(ValueError):
+        index.upsert([
+            (datetime.date(2000, 1, 9), create_info(5)),
+            ('2000/13/01', create_info(6)),
+        ])
+    assert len(index) == 3
+
+# 複数の日付に掲載された教材 -> 1つだけ保存し、全ての日付で検索できる
+def test_handout_index_upsert_2(index):
+    count = index.upsert([
+        (datetime.date(2000, 1, 16), create_info(5, teachers=('教員_1', '教員_2'))),
+        (datetime.date(2000, 1, 15), create_info(5, teachers=('教員_1', '教員_2'))),
+    ])
+    assert count == 1
+    assert len(index) == 4
+    url = create_info(5)['url']
+    assert index.get(url)['date'] == datetime.date(2000, 1, 15)
+    assert index.get(url)['teachers'] == ('教員_1', '教員_2')
+    assert index.dates(url) == (datetime.date(2000, 1, 15), datetime.date(2000, 1, 16))
+
+    # 別の呼び出しで保存した日付も残る
+    index.upsert([(datetime.date(2000, 1, 1), create_info(5))])
+    for day in (1, 15, 16):
+        infos = index.find(date_from=(2000, 1, day), date_to=(2000, 1, day))
+        assert [info['date'] for info in infos if info['url'] == url] == \
+               [datetime.date(2000, 1, day)]
+    assert [info['date'] for info in index.find(teacher='教員_1') if info['url'] == url] == \
+           [datetime.date(2000, 1, 1), datetime.date(2000, 1, 15), datetime.date(2000, 1, 16)]
+
+# dictのみの場合は引数dateを日付とし、日付が分からない場合はValueError
+def test_handout_index_upsert_3(index):
+    index.upsert([create_info(5)], date='2000/01/15')
+    assert [info['name'] for info in index.find(date_from='2000/01/15')] == ['教材_5']
+    with pytest.raises(ValueError):
+        index.upsert([create_info(6)])
+    assert index.get(create_info(6)['url']) is None
+
+# ファイルに保存した教材情報は再度開いても利用できる
+def test_handout_index_1(tmp_path):
+    with HandoutIndex(tmp_path / 'handouts.db') as index:
+        index.upsert([create_info(1)], date='2000/01/01')
+    with HandoutIndex(tmp_path / 'handouts.db') as index:
+        assert index.get(create_info(1)['url'])['date'] == datetime.date(2000, 1, 1)
+        assert len(index) == 1
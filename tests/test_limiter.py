@@ -0,0 +1,91 @@
+import asyncio
+import time
+
+import pytest
+
+from ktnetscraper import RateLimiter, Scraper
+
+
+# RateLimiter()
+# 不正な値
+@pytest.mark.parametrize(
+    'interval, burst',
+    [
+        (-1.0, 1),
+        (1.0, 0),
+    ]
+)
+def test_rate_limiter_init_0(interval, burst):
+    with pytest.raises(ValueError):
+        RateLimiter(interval, burst)
+
+
+# RateLimiter.reserve()
+# 初回は待機せず、burstを超えると不足分の時間だけ待機する
+def test_rate_limiter_reserve_0():
+    limiter = RateLimiter(interval=10.0, burst=2)
+    assert limiter.reserve() == 0.0
+    assert limiter.reserve() == 0.0
+    assert limiter.reserve() == pytest.approx(10.0, abs=0.1)
+    # 先の予約分だけ待機時間が延びる
+    assert limiter.reserve() == pytest.approx(20.0, abs=0.1)
+
+# 前回のリクエストから時間が経過している場合は、その分だけ待機時間が短くなる
+def test_rate_limiter_reserve_1():
+    limiter = RateLimiter(interval=10.0)
+    limiter.reserve()
+    time.sleep(0.2)
+    assert 9.0 < limiter.reserve() <= 9.8
+
+# interval=0 -> 待機しない
+def test_rate_limiter_reserve_2():
+    limiter = RateLimiter(interval=0)
+    assert all(limiter.reserve() == 0.0 for _ in range(5))
+
+
+# RateLimiter.acquire(), acquire_async()
+def test_rate_limiter_acquire_0():
+    limiter = RateLimiter(interval=0.05)
+    start = time.monotonic()
+    for _ in range(3):
+        limiter.acquire()
+    assert time.monotonic() - start >= 0.09
+
+def test_rate_limiter_acquire_async_0():
+    limiter = RateLimiter(interval=0.05)
+    async def main():
+        await asyncio.gather(*(limiter.acquire_async() for _ in range(3)))
+    start = time.monotonic()
+    asyncio.run(main())
+    assert time.monotonic() - start >= 0.09
+
+
+# Scraper(limiter=...)
+# 複数のScraperで共有できる
+def test_scraper_limiter_0():
+    limiter = RateLimiter(interval=3.0)
+    scraper_1 = Scraper(limiter=limiter)
+    scraper_2 = Scraper(limiter=limiter)
+    assert scraper_1.limiter is scraper_2.limiter
+    assert scraper_1.interval == 3.0
+
+# limiterを指定しない場合はintervalからRateLimiterを作成する
+def test_scraper_limiter_1():
+    scraper = Scraper(interval=1)
+    assert type(scraper.limiter) == RateLimiter
+    assert scraper.limiter.interval == 1.0
+    assert scraper.limiter.burst == 1
+
+# Scraper.intervalを変更するとlimiterに反映され、待機しなくなる
+def test_scraper_limiter_2():
+    limiter = RateLimiter(interval=10.0)
+    scraper_1 = Scraper(limiter=limiter)
+    scraper_2 = Scraper(limiter=limiter)
+    scraper_1.interval = 0
+    assert limiter.interval == 0.0
+    assert scraper_2.interval == 0.0
+    assert [limiter.acquire() for _ in range(3)] == [0.0] * 3
+
+    with pytest.raises(ValueError):
+        scraper_1.interval = -1
+    assert scraper_1.interval == 0.0
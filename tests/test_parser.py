@@ -93,6 +93,11 @@ def test_login_status_e1():
     with pytest.raises(exceptions.UnexpextedContentException):
         parser.login_status(page)
 
+# メッセージにページの種類を含む
+def test_login_status_e2():
+    with pytest.raises(exceptions.UnexpextedContentException, match=r'\(page type:unknown\)'):
+        parser.login_status('')
+
 
 # get_faculty_and_grade
 # 引数
@@ -138,6 +143,14 @@ def test_get_faculty_and_grade_e1():
     with pytest.raises(exceptions.UnexpextedContentException):
         parser.get_faculty_and_grade(page)
 
+# 学部・学年の表記が見つからない -> UnexpextedContentException
+def test_get_faculty_and_grade_e2():
+    timetable_page = timetable_no_class_template(
+        faculty='', grade='', date='2000/01/02', days_of_week='日'
+    )
+    with pytest.raises(exceptions.UnexpextedContentException):
+        parser.get_faculty_and_grade(timetable_page)
+
 # メニュー, 教材情報 -> UnexpextedContentException
 @pytest.mark.parametrize(
         'page',
@@ -246,6 +259,55 @@ def test_get_dlpage_url_e1(page):
     with pytest.raises(exceptions.UnexpextedContentException):
         parser.get_dlpage_url(page)
 
+# get_timetable_entries
+# 授業ごとの情報と教材へのリンクを返す
+def test_get_timetable_entries_0():
+    class_text = class_template(
+        period='1', unit_name='ユニット1', thema='テーマ1', room='C11',
+        teachers='教員1, 教員2',
+        handout=handout_template(urls=[dlpage_url(arg_3='1'), dlpage_url(arg_3='2')],
+                                 handout_names=['教材1', '教材2']),
+    ) + simple_class
+    entries = parser.get_timetable_entries(m1_timetable_template(class_infos=class_text))
+    assert entries == (
+        {'period': '1', 'unit': 'ユニット1', 'thema': 'テーマ1', 'room': 'C11',
+         'teachers': ('教員1', '教員2'),
+         'handouts': (
+             {'name': '教材1', 'url': parser.DLPAGE_URL_HEAD + dlpage_url(arg_3='1')[1:]},
+             {'name': '教材2', 'url': parser.DLPAGE_URL_HEAD + dlpage_url(arg_3='2')[1:]},
+         )},
+        {'period': '1', 'unit': 'ユニット', 'thema': 'テーマ', 'room': 'C11',
+         'teachers': ('教員',), 'handouts': ()},
+    )
+
+# 授業の無い日 -> 空のtuple, 空欄の項目 -> None
+def test_get_timetable_entries_1():
+    assert parser.get_timetable_entries(timetable_no_class_template()) == ()
+    entries = parser.get_timetable_entries(m1_timetable_template(class_infos=class_template()))
+    assert entries == ({'period': None, 'unit': None, 'thema': None, 'room': None,
+                        'teachers': None, 'handouts': ()},)
+
+# 時間割ページ以外 -> LoginRequiredException, UnexpextedContentException
+def test_get_timetable_entries_e0():
+    with pytest.raises(exceptions.LoginRequiredException):
+        parser.get_timetable_entries(index_template())
+    with pytest.raises(exceptions.UnexpextedContentException):
+        parser.get_timetable_entries(menu_template())
+
+# get_handout_key
+@pytest.mark.parametrize(
+        'url, out',
+        [
+            ('https://kt.kanazawa-med.ac.jp/timetable/View_Kyozai.php?kn=2023M5200780&kg=49&kz=5',
+             ('2023M5200780', '49', '5')),
+            ('https://kt.kanazawa-med.ac.jp/timetable/View_Kyozai.php?kz=5&kg=49&kn=2023M5200780',
+             ('2023M5200780', '49', '5')),
+            ('https://kt.kanazawa-med.ac.jp/timetable/View_Kyozai.php?kn=2023M5200780&kg=49', None),
+        ]
+)
+def test_get_handout_key_0(url, out):
+    assert parser.get_handout_key(url) == out
+
 # get_handout_info
 
 # 正常動作
@@ -346,4 +408,80 @@ def test_get_handout_info_e0():
 )
 def test_get_handout_info_e1(page):
     with pytest.raises(exceptions.UnexpextedContentException):
-        parser.get_handout_info(page)
\ No newline at end of file
+        parser.get_handout_info(page)
+
+# ParsedPage
+# 関数と同じ結果を返す
+def test_parsed_page_0():
+    page_text = timetable_template(
+        faculty='看護', grade='2', date='2000/01/01', days_of_week='土',
+        class_infos=class_template(handout=handout_template(
+            urls=[dlpage_url(arg_3=i) for i in range(3)],
+            handout_names=[f'教材_{i}' for i in range(3)],
+        )),
+    )
+    page = parser.ParsedPage(page_text)
+    assert '\n' not in page.text
+    assert page.page_type == parser.TIMETABLE
+    assert page.login_status == True
+    assert page.faculty_and_grade == parser.get_faculty_and_grade(page_text) == ('N', '2')
+    assert page.dlpage_urls == parser.get_dlpage_url(page_text)
+    assert len(page.dlpage_urls) == 3
+    # 解析結果は保持される
+    assert page.dlpage_urls is page.dlpage_urls
+
+# 各関数はParsedPageを受け取れる
+def test_parsed_page_1():
+    page_text = handout_info_template(release_start_at='2000/01/01 03:34',
+                                      release_end_at='2001/12/23 19:03')
+    page = parser.ParsedPage(page_text)
+    assert parser.detect_page_type(page) == parser.HANDOUT
+    assert parser.validate_page_type(page, parser.HANDOUT) == parser.HANDOUT
+    assert parser.login_status(page) == True
+    assert parser.get_handout_info(page) == parser.get_handout_info(page_text)
+
+# ページの種類が異なる
+def test_parsed_page_e0():
+    with pytest.raises(exceptions.LoginRequiredException):
+        parser.ParsedPage(index_template()).dlpage_urls
+    with pytest.raises(exceptions.UnexpextedContentException):
+        parser.ParsedPage(menu_template()).handout_info
+
+# ParsedPage.from_content(), detect_page_type_from_content()
+# 復号した場合と同じ種類を返す
+def test_detect_page_type_from_content_0():
+    pages = (index_template(), login_failed_template(), menu_template(),
+             timetable_no_class_template(), handout_info_template(), '', '■\n時')
+    for page in pages:
+        content = page.encode('cp932')
+        assert parser.detect_page_type_from_content(content, 'cp932') == \
+               parser.detect_page_type(page)
+
+# 2バイト文字の2バイト目から'■'と一致する -> ページ全体を復号して判定する
+def test_detect_page_type_from_content_1():
+    page = '＝｡' + menu_template()
+    content = page.encode('cp932')
+    assert content.find('■'.encode('cp932')) < content.find('■メ'.encode('cp932'))
+    assert parser.detect_page_type_from_content(content, 'cp932') == parser.MENU
+
+# 解析する際に復号し、結果はParsedPage()と同じ
+def test_parsed_page_from_content_0():
+    page_text = timetable_template(
+        faculty='医', grade='1', date='2000/01/01', days_of_week='土',
+        class_infos=class_template(handout=handout_template(
+            urls=[dlpage_url(arg_3=i) for i in range(2)],
+            handout_names=[f'教材_{i}' for i in range(2)],
+        )),
+    )
+    page = parser.ParsedPage.from_content(page_text.encode('cp932'), 'cp932')
+    assert page.page_type == parser.TIMETABLE
+    assert 'text' not in vars(page)
+    assert page.dlpage_urls == parser.get_dlpage_url(page_text)
+    assert page.text == parser.ParsedPage(page_text).text
+
+    page = parser.ParsedPage.from_content(timetable_no_class_template().encode('cp932'), 'cp932')
+    assert page.dlpage_urls == ()
+    assert 'text' not in vars(page)
+    with pytest.raises(exceptions.LoginRequiredException):
+        parser.ParsedPage.from_content(index_template().encode('cp932'), 'cp932').validate(
+            parser.TIMETABLE)
@@ -0,0 +1,133 @@
+import pytest
+
+from ktnetscraper import parser, exceptions
+from template import (
+    menu_template,
+    login_failed_template,
+    index_template,
+    timetable_no_class_template,
+    handout_info_template,
+    timetable_template,
+    class_template,
+    handout_template,
+    dlpage_url,
+)
+
+
+# 全てのエンジンを対象とし、必要なライブラリが無いものはスキップする
+ENGINES = ('regex', 'lxml')
+# ParserEngineが実装する処理
+EXTRACTORS = (
+    parser.get_faculty_and_grade,
+    parser.get_dlpage_url,
+    parser.get_timetable_entries,
+    parser.get_handout_info,
+)
+
+def fixture_pages() -> list[str]:
+    '''
+    page_templateの全てのテンプレートから作成したページ
+    '''
+    handout = handout_template(
+        urls=[dlpage_url(arg_3=i) for i in range(3)],
+        handout_names=['教材1', ' 教材2 ', ''],
+    )
+    classes = (
+        class_template(period='1', unit_name='ユニット1', thema='テーマ1', room='C11',
+                       teachers='教員1, 教員2', handout=handout)
+        + class_template(period='2', unit_name='ユニット2', teachers='教員3、教員4')
+        + class_template()
+    )
+    return [
+        index_template(),
+        login_failed_template(),
+        menu_template(),
+        timetable_no_class_template(faculty='医', grade='1', date='2000/01/01',
+                                    days_of_week='土'),
+        timetable_template(faculty='医', grade='1', date='2000/01/01', days_of_week='土',
+                           class_infos=classes),
+        timetable_template(faculty='看護', grade='2', date='2000/01/01', days_of_week='土',
+                           class_infos=class_template(period='3')),
+        timetable_template(class_infos=classes),
+        handout_info_template(
+            faculty='医', grade='1', unit='ユニット', unit_num='12', date_month='4',
+            date_days='1', days_of_week='土', period='3', lesson_type='講義',
+            thema='テーマ', course='講座', teachers='教員1，教員2',
+            release_start_at='2000/01/01 03:34', release_end_at='2001/12/23 19:03',
+            name='教材', comments='説明', url='./Download.php?kz=1', file_name='教材.pdf',
+        ),
+        handout_info_template(unit='ユニット', unit_num='1', period='1', teachers='教員',
+                              release_start_at='2000/01/01 00:00',
+                              release_end_at='2000/01/02 00:00'),
+    ]
+
+def extract(extractor, page: str, engine: str):
+    '''
+    返り値、もしくは送出した例外の型を返す。
+    '''
+    try:
+        return extractor(page, engine=engine)
+    except Exception as e:
+        return type(e)
+
+@pytest.fixture(params=ENGINES)
+def engine(request):
+    if request.param not in parser.available_engines():
+        pytest.skip(f'{request.param}エンジンを利用できません。')
+    return request.param
+
+
+# 適合性
+# 全てのページで、デフォルトのエンジンと同じ結果・例外を返す
+@pytest.mark.parametrize('page', fixture_pages())
+@pytest.mark.parametrize('extractor', EXTRACTORS, ids=lambda extractor: extractor.__name__)
+def test_engine_conformance_0(engine, extractor, page):
+    assert extract(extractor, page, engine) == extract(extractor, page, 'regex')
+
+# ParsedPageでも同じ結果を返し、ページの種類の検証はエンジンによらない
+def test_engine_conformance_1(engine):
+    page = fixture_pages()[4]
+    parsed_page = parser.ParsedPage.from_content(page.encode('cp932'), 'cp932', engine=engine)
+    assert parsed_page.engine.name == engine
+    assert parsed_page.timetable_entries == parser.get_timetable_entries(page)
+    with pytest.raises(exceptions.LoginRequiredException):
+        parser.get_dlpage_url(index_template(), engine=engine)
+
+
+# get_engine, register_engine, set_default_engine
+def test_get_engine_0():
+    assert parser.get_engine().name == 'regex'
+    assert parser.get_engine('regex') is parser.get_engine()
+    assert 'regex' in parser.available_engines()
+    with pytest.raises(ValueError):
+        parser.get_engine('unknown')
+
+# 必要なライブラリが無い -> ImportError
+def test_get_engine_1():
+    if 'lxml' in parser.available_engines():
+        pytest.skip('lxmlがインストールされています。')
+    with pytest.raises(ImportError):
+        parser.get_engine('lxml')
+    with pytest.raises(ImportError):
+        parser.ParsedPage(menu_template(), engine='lxml')
+
+# 登録したエンジンをデフォルトに設定する
+def test_register_engine_0(monkeypatch):
+    class UpperEngine(parser.RegexEngine):
+        name = 'upper'
+        def dlpage_urls(self, page):
+            return tuple(url.upper() for url in super().dlpage_urls(page))
+
+    monkeypatch.setattr(parser, '_engines', dict(parser._engines))
+    monkeypatch.setattr(parser, '_default_engine_name', parser._default_engine_name)
+    parser.register_engine(UpperEngine())
+    assert 'upper' in parser.available_engines()
+
+    page = fixture_pages()[4]
+    parser.set_default_engine('upper')
+    assert parser.get_dlpage_url(page) == \
+           tuple(url.upper() for url in parser.get_dlpage_url(page, engine='regex'))
+    # 作成済みのParsedPageのエンジンは変わらない
+    parsed_page = parser.ParsedPage(page)
+    parser.set_default_engine('regex')
+    assert parsed_page.engine.name == 'upper'
@@ -0,0 +1,83 @@
+import time
+
+import requests as rq
+import pytest
+
+from ktnetscraper import Scraper, ScraperPool, RateLimiter
+from ktnetscraper.exceptions import NoEligibleScraperException
+from test_scraper import mock_session_request, TIMETABLE_URL
+
+
+# 時間割ページの取得に利用したアカウントを記録するモック
+# アカウントはSessionのheadersに設定した'X-Account'で区別する
+@pytest.fixture
+def mock_accounts_fixture(monkeypatch):
+    used = []
+    def mock_request(cls, **kwargs):
+        if kwargs['url'] == TIMETABLE_URL:
+            used.append((cls.headers.get('X-Account'),
+                         kwargs.get('data', {}).get('strSelectGakubuNen')))
+            time.sleep(0.01)
+        return mock_session_request(cls, **kwargs)
+    monkeypatch.setattr(rq.Session, 'request', mock_request)
+    return used
+
+def account(name):
+    scraper = Scraper(interval=0)
+    scraper.session.headers['X-Account'] = name
+    return scraper
+
+
+# ScraperPool.add()
+# プールのRateLimiterを共有する
+def test_scraper_pool_add_0(mock_accounts_fixture):
+    limiter = RateLimiter(interval=0)
+    pool = ScraperPool(limiter=limiter)
+    pool.add(account('a'), cohorts=[('M', '1')])
+    pool.add(account('b'), cohorts=[('M', '2')])
+    assert all(scraper.limiter is limiter for scraper in pool.scrapers)
+
+# cohortsを指定しない -> ログインユーザーの学部・学年
+def test_scraper_pool_add_1(mock_accounts_fixture):
+    pool = ScraperPool(limiter=RateLimiter(interval=0))
+    scraper = account('a')
+    scraper.login('correct_id', 'correct_password')
+    pool.add(scraper)
+    pool.get_handout_infos('2000/01/01', 'M', '6')
+    assert mock_accounts_fixture[-1] == ('a', 'M,6')
+
+
+# ScraperPool.get_handout_infos(), map_handout_infos()
+# 閲覧可能なアカウントに割り振る
+def test_scraper_pool_get_handout_infos_0(mock_accounts_fixture):
+    pool = ScraperPool(limiter=RateLimiter(interval=0))
+    pool.add(account('m1'), cohorts=[('M', '1')])
+    pool.add(account('n2'), cohorts=[('N', '2')])
+
+    pool.get_handout_infos('2000/01/01', 'M', '1')
+    pool.get_handout_infos('2000/01/01', 'N', '2')
+    assert mock_accounts_fixture == [('m1', 'M,1'), ('n2', 'N,2')]
+
+# 閲覧可能なアカウントが無い
+def test_scraper_pool_get_handout_infos_1(mock_accounts_fixture):
+    pool = ScraperPool(limiter=RateLimiter(interval=0))
+    pool.add(account('m1'), cohorts=[('M', '1')])
+    with pytest.raises(NoEligibleScraperException):
+        pool.get_handout_infos('2000/01/01', 'M', '2')
+    with pytest.raises(NoEligibleScraperException):
+        pool.map_handout_infos([('2000/01/01', 'M', '1'), ('2000/01/01', 'M', '2')])
+    assert mock_accounts_fixture == []
+
+# 同じ学部・学年を閲覧可能なアカウントが複数ある -> 偏りなく割り振る
+@pytest.mark.parametrize('max_workers', [1, 3])
+def test_scraper_pool_map_handout_infos_0(mock_accounts_fixture, max_workers):
+    pool = ScraperPool(limiter=RateLimiter(interval=0))
+    for name in ('a', 'b', 'c'):
+        pool.add(account(name), cohorts=[('M', '1'), ('M', '2')])
+
+    jobs = [(f'2000/01/0{i}', 'M', str(i % 2 + 1)) for i in range(1, 7)]
+    results = pool.map_handout_infos(jobs, max_workers=max_workers)
+
+    assert len(results) == 6
+    names = [name for name, _ in mock_accounts_fixture]
+    assert sorted(names.count(name) for name in ('a', 'b', 'c')) == [2, 2, 2]
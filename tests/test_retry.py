@@ -0,0 +1,130 @@
+import datetime
+import email.utils
+
+import requests as rq
+import pytest
+
+from ktnetscraper import Scraper, RetryPolicy
+from ktnetscraper import scraper as scraper_module
+from ktnetscraper.retry import parse_retry_after
+from test_scraper import Response
+
+
+# RetryPolicy.backoff()
+# 待機時間は2倍ずつ増え、backoff_capで頭打ちになる
+def test_retry_policy_backoff_0():
+    policy = RetryPolicy(backoff_base=1.0, backoff_cap=5.0, jitter=False)
+    assert [policy.backoff(i) for i in range(1, 5)] == [1.0, 2.0, 4.0, 5.0]
+
+# jitter -> 0から計算した値までの範囲
+def test_retry_policy_backoff_1():
+    policy = RetryPolicy(backoff_base=1.0, backoff_cap=5.0, jitter=True)
+    assert all(0.0 <= policy.backoff(3) <= 4.0 for _ in range(50))
+
+# max_attemptsが不正
+def test_retry_policy_init_0():
+    with pytest.raises(ValueError):
+        RetryPolicy(max_attempts=0)
+
+
+# parse_retry_after()
+def test_parse_retry_after_0():
+    assert parse_retry_after('120') == 120.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('invalid') is None
+
+def test_parse_retry_after_1():
+    retry_at = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=60)
+    value = email.utils.format_datetime(retry_at, usegmt=True)
+    assert parse_retry_after(value) == pytest.approx(60.0, abs=2.0)
+
+
+# Scraper.request(), retry
+# responsesの内容を順に返すモック。Exceptionの場合は送出する。
+@pytest.fixture
+def mock_sequence(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(scraper_module.time, 'sleep', sleeps.append)
+
+    def set_responses(responses):
+        responses = list(responses)
+        def mock_request(cls, **kwargs):
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+        monkeypatch.setattr(rq.Session, 'request', mock_request)
+        return sleeps
+    return set_responses
+
+def ok_response():
+    return Response(content=b'ok', url='test')
+
+def error_response(status_code, headers=None):
+    response = Response(content=b'error', url='test', status_code=status_code)
+    response.headers = headers if headers is not None else {}
+    return response
+
+# 5xxと接続エラーの後に成功
+def test_scraper_request_retry_0(mock_sequence):
+    sleeps = mock_sequence([error_response(503), rq.ConnectionError(), ok_response()])
+    scraper = Scraper(interval=0, retry=RetryPolicy(max_attempts=3, jitter=False))
+    response = scraper.request(url='test')
+
+    assert response.status_code == 200
+    assert scraper.retry_count == 2
+    assert sleeps == [1.0, 2.0]
+
+# Retry-Afterの値を優先
+def test_scraper_request_retry_1(mock_sequence):
+    sleeps = mock_sequence([error_response(429, {'Retry-After': '7'}), ok_response()])
+    scraper = Scraper(interval=0, retry=RetryPolicy(jitter=False))
+    scraper.request(url='test')
+    assert sleeps == [7.0]
+
+# Retry-Afterがmax_retry_after(既定ではbackoff_cap)を超える -> 待機せずにResponseを返す
+@pytest.mark.parametrize(
+    'max_retry_after, retry_after, sleeps_out',
+    [
+        (None, '3600', []),
+        (None, '30', [30.0]),
+        (5, '7', []),
+        (7, '7', [7.0]),
+    ]
+)
+def test_scraper_request_retry_6(mock_sequence, max_retry_after, retry_after, sleeps_out):
+    sleeps = mock_sequence([error_response(429, {'Retry-After': retry_after}), ok_response()])
+    scraper = Scraper(interval=0, retry=RetryPolicy(jitter=False, max_retry_after=max_retry_after))
+    response = scraper.request(url='test')
+    assert sleeps == sleeps_out
+    assert response.status_code == (429 if sleeps_out == [] else 200)
+
+# 試行回数の上限 -> 最後のResponseを返す
+def test_scraper_request_retry_2(mock_sequence):
+    mock_sequence([error_response(500), error_response(502)])
+    scraper = Scraper(interval=0, retry=RetryPolicy(max_attempts=2, jitter=False))
+    assert scraper.request(url='test').status_code == 502
+    assert scraper.retry_count == 1
+
+# 試行回数の上限 -> 最後の例外を送出する
+def test_scraper_request_retry_3(mock_sequence):
+    mock_sequence([rq.Timeout(), rq.Timeout()])
+    scraper = Scraper(interval=0, retry=RetryPolicy(max_attempts=2, jitter=False))
+    with pytest.raises(rq.Timeout):
+        scraper.request(url='test')
+
+# 対象外のステータスコードや例外は再試行しない
+def test_scraper_request_retry_4(mock_sequence):
+    mock_sequence([error_response(404), ValueError()])
+    scraper = Scraper(interval=0, retry=RetryPolicy(jitter=False))
+    assert scraper.request(url='test').status_code == 404
+    with pytest.raises(ValueError):
+        scraper.request(url='test')
+    assert scraper.retry_count == 0
+
+# retryを指定しない -> 再試行しない
+def test_scraper_request_retry_5(mock_sequence):
+    mock_sequence([rq.ConnectionError()])
+    scraper = Scraper(interval=0)
+    with pytest.raises(rq.ConnectionError):
+        scraper.request(url='test')
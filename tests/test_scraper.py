@@ -1,8 +1,25 @@
+import datetime
+import hashlib
+import io
+import json
+import os
+import stat
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests as rq
 import pytest
 
 from ktnetscraper import Scraper
+from ktnetscraper.exceptions import (
+    IncompleteDownloadException,
+    WrongIdPasswordException,
+    LoginRequiredException,
+    DownloadFailedException,
+)
 import template
+from server import HandoutServer
 
 
 INDEX_URL = 'https://kt.kanazawa-med.ac.jp/index.php'
@@ -26,10 +43,22 @@ class Response():
                  url=None, status_code:int = 200):
         self.content = content
         self.encoding = encoding
-        self.text = content.decode(encoding)
         self.url = url
         self.status_code = status_code
 
+        self.headers = {}
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding)
+
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def close(self):
+        pass
+
 
 def create_response(content: str | bytes, url: str,
                      status_code: int = 200, binary=False):
@@ -115,6 +144,23 @@ def test_scraper_init_1(
     assert type(scraper.read_timeout) == float
     assert scraper.read_timeout == attrs_read_timeout
 
+# 接続プールの設定
+# 指定した設定のHTTPAdapterがサイトのURLに登録される
+def test_scraper_init_2():
+    scraper = Scraper(interval=0, pool_connections=2, pool_maxsize=8,
+                      pool_block=True)
+    adapter = scraper.session.get_adapter(INDEX_URL)
+    assert adapter._pool_connections == 2
+    assert adapter._pool_maxsize == 8
+    assert adapter._pool_block == True
+
+# sessionを指定し、接続プールの設定をしない -> sessionの設定を変更しない
+def test_scraper_init_3():
+    session = rq.Session()
+    adapter = session.get_adapter(INDEX_URL)
+    scraper = Scraper(session=session, interval=0)
+    assert scraper.session.get_adapter(INDEX_URL) is adapter
+
 # Scraper.request()
 # 初期化時にSessionオブジェクトのモックを渡す
 
@@ -139,7 +185,7 @@ def mock_session_request(cls, **kwargs):
         return create_response(content=template.login_failed_template(),
                                url=url)
     elif url == MENU_URL:
-        return create_response(content=template.menu_template())
+        return create_response(content=template.menu_template(), url=url)
     elif url == TIMETABLE_URL:
         faculty = '医'
         grade = '6'
@@ -201,6 +247,9 @@ def mock_session_request(cls, **kwargs):
         if 'verify' in kwargs_keys:
             content_list.append(f'verify:{kwargs["verify"]}')
 
+        if 'timeout' in kwargs_keys:
+            content_list.append(f'timeout:{kwargs["timeout"]}')
+
         return create_response(content=','.join(content_list),
                                url=url)
     
@@ -279,6 +328,652 @@ def test_scraper_request_2(mock_session_request_fixture,
     response.encoding = PAGE_ENCODING
     assert f'verify:{out_verify}' in response.text
 
+# timeout引数が指定されていない場合は、(connect_timeout, read_timeout)を渡す。
+@pytest.mark.parametrize(
+    'arg_timeout, out_timeout',
+    [
+        (None, (3.0, 7.0)),
+        (1.5, 1.5),
+        ((1, 2), (1, 2)),
+    ]
+)
+def test_scraper_request_3(mock_session_request_fixture, arg_timeout, out_timeout):
+    scraper = Scraper(connect_timeout=3, read_timeout=7, interval=0)
+    if arg_timeout is None:
+        response = scraper.request(url='text')
+    else:
+        response = scraper.request(url='text', timeout=arg_timeout)
+    response.encoding = PAGE_ENCODING
+    assert f'timeout:{out_timeout},' in response.text + ','
+
+
+# Scraper.login()
+def test_scraper_login_0(mock_session_request_fixture):
+    scraper = Scraper(interval=0)
+    scraper.login('correct_id', 'correct_password')
+
+# 学籍番号もしくはパスワードが誤っている
+def test_scraper_login_1(mock_session_request_fixture):
+    scraper = Scraper(interval=0)
+    with pytest.raises(WrongIdPasswordException):
+        scraper.login('correct_id', 'wrong_password')
+
+
+# Scraper.login_status()
+# ページを受け取る度にログイン状態を記録し、max_age以内であればリクエストを行わない
+def test_scraper_login_status_0(monkeypatch):
+    requested_urls = []
+    def mock_request(cls, **kwargs):
+        requested_urls.append(kwargs['url'])
+        return mock_session_request(cls, **kwargs)
+    monkeypatch.setattr(rq.Session, 'request', mock_request)
+
+    scraper = Scraper(interval=0)
+    assert scraper.login_state is None
+    scraper.login('correct_id', 'correct_password')
+    assert scraper.last_page_type == 'menu'
+    assert scraper.login_state[0] == True
+
+    assert scraper.login_status(max_age=60) == True
+    assert requested_urls == [LOGIN_URL]
+
+    # max_ageを指定しない -> メニューページを取得する
+    assert scraper.login_status() == True
+    assert requested_urls == [LOGIN_URL, MENU_URL]
+
+# 確認してからmax_ageを超えている -> メニューページを取得する
+def test_scraper_login_status_1(mock_session_request_fixture):
+    scraper = Scraper(interval=0)
+    scraper.login('correct_id', 'correct_password')
+    checked_at = scraper.login_state[1]
+    scraper.login_state = (True, checked_at - 120)
+    assert scraper.login_status(max_age=60) == True
+    assert scraper.login_state[1] > checked_at - 120
+
+# ログインページを受け取った -> 未ログインとして記録する
+def test_scraper_login_status_2(mock_session_timeout_fixture):
+    scraper = Scraper(interval=0)
+    with pytest.raises(LoginRequiredException):
+        scraper.get_dlpage_urls('2000/01/01')
+    assert scraper.last_page_type == 'login'
+    assert scraper.login_status(max_age=60) == False
+
+
+# Scraper.get_faculty_and_grade()
+@pytest.fixture
+def count_timetable_fixture(monkeypatch):
+    requested_urls = []
+    def mock_request(cls, **kwargs):
+        requested_urls.append(kwargs['url'])
+        return mock_session_request(cls, **kwargs)
+    monkeypatch.setattr(rq.Session, 'request', mock_request)
+    return requested_urls
+
+# 2回目以降はリクエストを行わない
+def test_scraper_get_faculty_and_grade_0(count_timetable_fixture):
+    scraper = Scraper(interval=0)
+    scraper.login('correct_id', 'correct_password')
+    assert scraper.get_faculty_and_grade() == ('M', '6')
+    assert scraper.get_faculty_and_grade() == ('M', '6')
+    assert count_timetable_fixture.count(TIMETABLE_URL) == 1
+
+# get_dlpage_urls()で取得した時間割ページから記録する
+# 学部・学年を指定した時間割ページからは記録しない
+def test_scraper_get_faculty_and_grade_1(count_timetable_fixture):
+    scraper = Scraper(interval=0)
+    scraper.login('correct_id', 'correct_password')
+    scraper.get_dlpage_urls('2000/01/01', faculty='N', grade='2')
+    scraper.get_dlpage_urls('2000/01/01')
+    assert scraper.get_faculty_and_grade() == ('M', '6')
+    assert count_timetable_fixture.count(TIMETABLE_URL) == 2
+
+# ログインし直す、もしくはログアウトすると破棄する
+def test_scraper_get_faculty_and_grade_2(count_timetable_fixture):
+    scraper = Scraper(interval=0)
+    scraper.login('correct_id', 'correct_password')
+    scraper.get_faculty_and_grade()
+    scraper.login('correct_id', 'correct_password')
+    scraper.get_faculty_and_grade()
+    requested_count = len(count_timetable_fixture)
+    scraper.logout()
+    assert len(count_timetable_fixture) == requested_count
+    assert scraper.login_status(max_age=60) == False
+    assert len(scraper.session.cookies) == 0
+    scraper.login('correct_id', 'correct_password')
+    scraper.get_faculty_and_grade()
+    assert count_timetable_fixture.count(TIMETABLE_URL) == 3
+
+
+# Scraper.save_session(), load_session()
+@pytest.fixture
+def count_login_fixture(monkeypatch):
+    login_count = []
+    def mock_request(cls, **kwargs):
+        if kwargs['url'] == LOGIN_URL:
+            login_count.append(1)
+            cls.cookies.set('PHPSESSID', 'session_1', domain='kt.kanazawa-med.ac.jp')
+        return mock_session_request(cls, **kwargs)
+    monkeypatch.setattr(rq.Session, 'request', mock_request)
+    return login_count
+
+# 保存したセッションを読み込む -> ログインのリクエストを省略する
+def test_scraper_session_0(count_login_fixture, tmp_path):
+    path = tmp_path / 'session.json'
+    Scraper(interval=0).login('correct_id', 'correct_password', session_path=path)
+    assert len(count_login_fixture) == 1
+
+    scraper = Scraper(interval=0)
+    scraper.login('correct_id', 'correct_password', session_path=path)
+    assert len(count_login_fixture) == 1
+    assert scraper.session.cookies.get('PHPSESSID') == 'session_1'
+
+# 有効期限切れ、もしくは学籍番号が異なる -> ログインし直す
+@pytest.mark.parametrize(
+    'max_age, id',
+    [
+        (-1, 'correct_id'),
+        (60, 'other_id'),
+    ]
+)
+def test_scraper_session_1(count_login_fixture, tmp_path, max_age, id):
+    path = tmp_path / 'session.json'
+    saved = Scraper(interval=0)
+    saved.session.cookies.set('PHPSESSID', 'session_0', domain='kt.kanazawa-med.ac.jp')
+    saved.save_session(path, id=id, max_age=max_age)
+
+    scraper = Scraper(interval=0)
+    assert scraper.load_session(path, id='correct_id') == False
+    scraper.login('correct_id', 'correct_password', session_path=path)
+    assert len(count_login_fixture) == 1
+    assert scraper.session.cookies.get('PHPSESSID') == 'session_1'
+
+# ログインに失敗した場合はセッションを保存しない
+def test_scraper_session_2(count_login_fixture, tmp_path):
+    path = tmp_path / 'session.json'
+    with pytest.raises(WrongIdPasswordException):
+        Scraper(interval=0).login('correct_id', 'wrong_password', session_path=path)
+    assert not path.exists()
+
+# セッションのファイルは所有者のみ読み書きできる
+@pytest.mark.skipif(os.name != 'posix', reason='POSIXのパーミッションのみ確認する')
+def test_scraper_session_3(count_login_fixture, tmp_path):
+    path = tmp_path / 'session.json'
+    Scraper(interval=0).login('correct_id', 'correct_password', session_path=path)
+    assert stat.S_IMODE(path.stat().st_mode) == 0o600
+
+
+# 自動での再ログイン
+# PHPSESSIDが'valid'でない場合はindexページを返すモック
+@pytest.fixture
+def mock_session_timeout_fixture(monkeypatch):
+    login_count = []
+    def mock_request(cls, **kwargs):
+        url = kwargs['url']
+        if url == LOGIN_URL:
+            response = mock_session_request(cls, **kwargs)
+            if kwargs['data']['strPassWord'] == 'correct_password':
+                login_count.append(1)
+                cls.cookies.set('PHPSESSID', 'valid')
+            return response
+        elif cls.cookies.get('PHPSESSID') != 'valid':
+            return create_response(content=template.index_template(), url=url)
+        else:
+            return mock_session_request_handouts(cls, **kwargs)
+    monkeypatch.setattr(rq.Session, 'request', mock_request)
+    return login_count
+
+# セッションが切れた -> 1度だけ再ログインし、同じリクエストを行う
+@pytest.mark.parametrize(
+    'credentials',
+    [
+        ('correct_id', 'correct_password'),
+        lambda: ('correct_id', 'correct_password'),
+    ]
+)
+def test_scraper_relogin_0(mock_session_timeout_fixture, credentials):
+    scraper = Scraper(interval=0, credentials=credentials)
+    scraper.login('correct_id', 'correct_password')
+    scraper.session.cookies.set('PHPSESSID', 'expired')
+
+    infos = scraper.get_handout_infos('2000/01/01', max_workers=4)
+    assert [info['name'] for info in infos] == [f'教材_{i}' for i in range(1, 5)]
+    assert len(mock_session_timeout_fixture) == 2
+
+# 複数のスレッドがログインページを受け取った場合も、再ログインは1度のみ
+def test_scraper_relogin_1(mock_session_timeout_fixture, monkeypatch):
+    scraper = Scraper(interval=0, credentials=('correct_id', 'correct_password'))
+    scraper.login('correct_id', 'correct_password')
+    urls = scraper.get_dlpage_urls('2000/01/01')
+    scraper.session.cookies.set('PHPSESSID', 'expired')
+
+    barrier = threading.Barrier(len(urls))
+    original_request_page = Scraper._request_page
+    def request_page(self, **kwargs):
+        # 全てのスレッドがログインページを受け取るよう、同時にリクエストを開始する
+        barrier.wait()
+        return original_request_page(self, **kwargs)
+    monkeypatch.setattr(Scraper, '_request_page', request_page)
+    with ThreadPoolExecutor(max_workers=len(urls)) as executor:
+        infos = list(executor.map(scraper.get_handoutinfo_from_dlpage, urls))
+
+    assert len(infos) == len(urls)
+    assert len(mock_session_timeout_fixture) == 2
+
+# credentialsを指定しない -> LoginRequiredException
+def test_scraper_relogin_2(mock_session_timeout_fixture):
+    scraper = Scraper(interval=0)
+    with pytest.raises(LoginRequiredException):
+        scraper.get_dlpage_urls('2000/01/01')
+
+# 読み込んだセッションがサーバー側で切れていた -> login()の学籍番号とパスワードで1度だけ再ログインする
+def test_scraper_relogin_3(mock_session_timeout_fixture, tmp_path):
+    path = tmp_path / 'session.json'
+    saved = Scraper(interval=0)
+    saved.session.cookies.set('PHPSESSID', 'expired')
+    saved.save_session(path, id='correct_id')
+
+    scraper = Scraper(interval=0)
+    # 読み込んだ時点でセッションが切れていれば、login()の中でログインする
+    scraper.login('correct_id', 'correct_password', session_path=path)
+    assert len(mock_session_timeout_fixture) == 1
+    assert scraper.login_status(max_age=60) == True
+    assert scraper.download(DLPAGE_URL_HEAD + template.dlpage_url(arg_3=1)[1:])
+    assert len(scraper.get_dlpage_urls('2000/01/01')) == 4
+    assert len(mock_session_timeout_fixture) == 1
+    assert Scraper.load_session(Scraper(interval=0), path, id='correct_id')
+
+    # 再ログイン後は、credentialsを指定していなければ再度ログインしない
+    scraper.session.cookies.set('PHPSESSID', 'expired')
+    with pytest.raises(LoginRequiredException):
+        scraper.get_dlpage_urls('2000/01/01')
+    assert len(mock_session_timeout_fixture) == 1
+
+
+# Scraper.get_handout_infos()
+# 複数の教材が掲載された時間割ページを返すモック
+# ダウンロードページは教材名に'kz'の値を含み、応答の遅延はkzが小さいほど長い
+def mock_session_request_handouts(cls, **kwargs):
+    url = kwargs['url']
+    if url == TIMETABLE_URL:
+        handout = template.handout_template(
+            urls=[template.dlpage_url(arg_3=i) for i in range(1, 5)],
+            handout_names=[f'教材_{i}' for i in range(1, 5)],
+        )
+        content = template.timetable_template(
+            faculty='医', grade='1', date='2000/01/01', days_of_week='土',
+            class_infos=template.class_template(period='1', handout=handout),
+        )
+    elif DLPAGE_URL_HEAD in url:
+        kz = int(url.split('kz=')[-1])
+        time.sleep(0.01 * (5 - kz))
+        content = template.handout_info_template(
+            name=f'教材_{kz}', release_start_at='1999/12/31 23:59',
+            release_end_at='2000/01/01 00:00',
+        )
+    return create_response(content=content, url=url)
+
+@pytest.fixture
+def mock_session_request_handouts_fixture(monkeypatch):
+    monkeypatch.setattr(rq.Session, 'request', mock_session_request_handouts)
+
+
+# 並列に取得した場合もURLの順序が保たれる
+@pytest.mark.parametrize('max_workers', [None, 1, 4])
+def test_scraper_get_handout_infos_0(mock_session_request_handouts_fixture,
+                                     max_workers):
+    scraper = Scraper(interval=0)
+    infos = scraper.get_handout_infos('2000/01/01', max_workers=max_workers)
+    assert [info['name'] for info in infos] == [f'教材_{i}' for i in range(1, 5)]
+
+# 並列に取得した場合もlimiterの間隔が守られる
+def test_scraper_get_handout_infos_1(monkeypatch):
+    sent_at = []
+    def mock_request(cls, **kwargs):
+        sent_at.append(time.monotonic())
+        return mock_session_request_handouts(cls, **kwargs)
+    monkeypatch.setattr(rq.Session, 'request', mock_request)
+
+    scraper = Scraper(interval=0.03)
+    scraper.get_handout_infos('2000/01/01', max_workers=4)
+    # 各スレッドが時刻を記録するまでの遅れがあるため、全体の所要時間で確認する
+    assert len(sent_at) == 5
+    assert max(sent_at) - min(sent_at) >= 0.03 * 4 * 0.9
+
+# max_workersが不正
+def test_scraper_get_handout_infos_2(mock_session_request_handouts_fixture):
+    scraper = Scraper(interval=0)
+    with pytest.raises(ValueError):
+        scraper.get_handout_infos('2000/01/01', max_workers=0)
+
+
+# Scraper.get_timetable()
+# 時間割ページのみを取得し、ダウンロードページにはアクセスしない
+def test_scraper_get_timetable_0(monkeypatch):
+    requested_urls = []
+    def mock_request(cls, **kwargs):
+        requested_urls.append(kwargs['url'])
+        return mock_session_request_handouts(cls, **kwargs)
+    monkeypatch.setattr(rq.Session, 'request', mock_request)
+
+    scraper = Scraper(interval=0)
+    entries = scraper.get_timetable('2000/01/01')
+    assert requested_urls == [TIMETABLE_URL]
+    assert len(entries) == 1
+    assert entries[0]['date'] == datetime.date(2000, 1, 1)
+    assert entries[0]['period'] == '1'
+    assert [handout['name'] for handout in entries[0]['handouts']] == \
+           [f'教材_{i}' for i in range(1, 5)]
+    assert tuple(handout['url'] for handout in entries[0]['handouts']) == \
+           scraper.get_dlpage_urls('2000/01/01')
+
+
+# Scraper.get_handout_infos_range()
+# 2000/01/01 -> kz=1, 2
+# 2000/01/02 -> kz=2, 3
+# 2000/01/03 -> 講義なし
+RANGE_KZ = {'01': (1, 2), '02': (2, 3), '03': ()}
+
+def mock_session_request_range(cls, **kwargs):
+    url = kwargs['url']
+    if url == TIMETABLE_URL:
+        kz_list = RANGE_KZ[kwargs['data']['intSelectDay']]
+        if len(kz_list) == 0:
+            content = template.timetable_no_class_template(faculty='医', grade='1')
+        else:
+            handout = template.handout_template(
+                urls=[template.dlpage_url(arg_3=i) for i in kz_list],
+                handout_names=[f'教材_{i}' for i in kz_list],
+            )
+            content = template.timetable_template(
+                faculty='医', grade='1', days_of_week='土',
+                class_infos=template.class_template(period='1', handout=handout),
+            )
+        return create_response(content=content, url=url)
+    else:
+        return mock_session_request_handouts(cls, **kwargs)
+
+@pytest.mark.parametrize('max_workers', [None, 3])
+def test_scraper_get_handout_infos_range_0(monkeypatch, max_workers):
+    requested_urls = []
+    def mock_request(cls, **kwargs):
+        requested_urls.append(kwargs['url'])
+        return mock_session_request_range(cls, **kwargs)
+    monkeypatch.setattr(rq.Session, 'request', mock_request)
+
+    scraper = Scraper(interval=0)
+    infos = scraper.get_handout_infos_range('2000/01/01', '2000/01/03',
+                                            max_workers=max_workers)
+
+    assert list(infos.keys()) == [datetime.date(2000, 1, i) for i in range(1, 4)]
+    assert [info['name'] for info in infos[datetime.date(2000, 1, 1)]] == ['教材_1', '教材_2']
+    assert [info['name'] for info in infos[datetime.date(2000, 1, 2)]] == ['教材_2', '教材_3']
+    assert infos[datetime.date(2000, 1, 3)] == ()
+    # 複数の日付に掲載された教材は1度だけ取得する
+    assert requested_urls.count(TIMETABLE_URL) == 3
+    assert len(requested_urls) == 3 + 3
+
+# 時間割ページを全て取得する前に、取得済みの日付のダウンロードページを取得する
+def test_scraper_get_handout_infos_range_2(monkeypatch):
+    requested = []
+    def mock_request(cls, **kwargs):
+        if kwargs['url'] == TIMETABLE_URL:
+            requested.append(kwargs['data']['intSelectDay'])
+        else:
+            requested.append(kwargs['url'][-1])
+        return mock_session_request_range(cls, **kwargs)
+    monkeypatch.setattr(rq.Session, 'request', mock_request)
+
+    scraper = Scraper(interval=0)
+    scraper.get_handout_infos_range('2000/01/01', '2000/01/03', max_workers=1)
+    # 時間割ページの日付とダウンロードページのkzの順
+    assert requested == ['01', '1', '2', '02', '3', '03']
+
+# endがstartより前
+def test_scraper_get_handout_infos_range_1(monkeypatch):
+    monkeypatch.setattr(rq.Session, 'request', mock_session_request_range)
+    scraper = Scraper(interval=0)
+    with pytest.raises(ValueError):
+        scraper.get_handout_infos_range('2000/01/02', '2000/01/01')
+
+
+# Scraper.iter_handout_infos()
+# 教材情報を1件取得する度に返す
+def test_scraper_iter_handout_infos_0(monkeypatch):
+    requested_urls = []
+    def mock_request(cls, **kwargs):
+        requested_urls.append(kwargs['url'])
+        return mock_session_request_range(cls, **kwargs)
+    monkeypatch.setattr(rq.Session, 'request', mock_request)
+
+    scraper = Scraper(interval=0)
+    infos = scraper.iter_handout_infos('2000/01/01', '2000/01/03')
+
+    date, info = next(infos)
+    assert date == datetime.date(2000, 1, 1)
+    assert info['name'] == '教材_1'
+    # 時間割ページと1件目のダウンロードページのみ取得済み
+    assert len(requested_urls) == 2
+
+    rest = [(date.day, info['name']) for date, info in infos]
+    assert rest == [(1, '教材_2'), (2, '教材_2'), (2, '教材_3')]
+
+# endを指定しない -> startの1日のみ
+def test_scraper_iter_handout_infos_1(monkeypatch):
+    monkeypatch.setattr(rq.Session, 'request', mock_session_request_range)
+    scraper = Scraper(interval=0)
+    infos = list(scraper.iter_handout_infos('2000/01/02'))
+    assert [info['name'] for _, info in infos] == ['教材_2', '教材_3']
+
+
+# Scraper.download_to()
+def mock_session_request_download(cls, **kwargs):
+    return create_response(content=HANDOUT_DATA * 100, url=kwargs['url'],
+                           binary=True)
+
+@pytest.fixture
+def mock_session_request_download_fixture(monkeypatch):
+    monkeypatch.setattr(rq.Session, 'request', mock_session_request_download)
+
+# パスを指定 -> ファイルが作成され、一時ファイルは残らない
+def test_scraper_download_to_0(mock_session_request_download_fixture, tmp_path):
+    scraper = Scraper(interval=0)
+    path = tmp_path / 'handout.pdf'
+    size, sha256 = scraper.download_to(f'{DL_URL_HEAD}/Download.php?test',
+                                       path, chunk_size=7)
+
+    data = HANDOUT_DATA * 100
+    assert path.read_bytes() == data
+    assert size == len(data)
+    assert sha256 == hashlib.sha256(data).hexdigest()
+    assert not (tmp_path / 'handout.pdf.part').exists()
+
+# ファイルオブジェクトを指定
+def test_scraper_download_to_1(mock_session_request_download_fixture):
+    scraper = Scraper(interval=0)
+    file = io.BytesIO()
+    size, _ = scraper.download_to(f'{DL_URL_HEAD}/Download.php?test', file)
+    assert file.getvalue() == HANDOUT_DATA * 100
+    assert size == len(HANDOUT_DATA) * 100
+
+# 書き込み中に失敗 -> 既存のファイルは変更されず、一時ファイルは削除される
+def test_scraper_download_to_2(monkeypatch, tmp_path):
+    def broken_iter_content(self, chunk_size=1):
+        yield self.content[:chunk_size]
+        raise rq.ConnectionError('test')
+    monkeypatch.setattr(rq.Session, 'request', mock_session_request_download)
+    monkeypatch.setattr(Response, 'iter_content', broken_iter_content)
+
+    path = tmp_path / 'handout.pdf'
+    path.write_bytes(b'old')
+    scraper = Scraper(interval=0)
+    with pytest.raises(rq.ConnectionError):
+        scraper.download_to(f'{DL_URL_HEAD}/Download.php?test', path)
+
+    assert path.read_bytes() == b'old'
+    assert not (tmp_path / 'handout.pdf.part').exists()
+
+
+# Scraper.download_to(resume=True)
+# ローカルのHTTPサーバーを利用する
+RESUME_DATA = bytes(range(256)) * 64
+
+def write_part(tmp_path, data, etag='"v1"', last_modified=None):
+    (tmp_path / 'handout.pdf.part').write_bytes(data)
+    (tmp_path / 'handout.pdf.part.json').write_text(
+        json.dumps({'etag': etag, 'last_modified': last_modified}))
+
+# 途中まで受信したファイルがある -> If-Rangeを付けて続きから取得する
+def test_scraper_download_to_resume_0(tmp_path):
+    path = tmp_path / 'handout.pdf'
+    write_part(tmp_path, RESUME_DATA[:1000])
+
+    scraper = Scraper(interval=0)
+    with HandoutServer(RESUME_DATA) as server:
+        server.headers = {'ETag': '"v1"'}
+        size, sha256 = scraper.download_to(server.url, path, resume=True)
+
+    assert server.requests[0]['Range'] == 'bytes=1000-'
+    assert server.requests[0]['If-Range'] == '"v1"'
+    assert path.read_bytes() == RESUME_DATA
+    assert size == len(RESUME_DATA)
+    assert sha256 == hashlib.sha256(RESUME_DATA).hexdigest()
+    assert not (tmp_path / 'handout.pdf.part').exists()
+    assert not (tmp_path / 'handout.pdf.part.json').exists()
+
+# サーバーがRangeに対応していない -> 最初から取得し直す
+def test_scraper_download_to_resume_1(tmp_path):
+    path = tmp_path / 'handout.pdf'
+    write_part(tmp_path, b'x' * 1000)
+
+    scraper = Scraper(interval=0)
+    with HandoutServer(RESUME_DATA, support_range=False) as server:
+        size, sha256 = scraper.download_to(server.url, path, resume=True)
+
+    assert path.read_bytes() == RESUME_DATA
+    assert sha256 == hashlib.sha256(RESUME_DATA).hexdigest()
+
+# 受信済みのファイルが完全 -> 416を受け取り、そのまま保存先へ置き換える
+def test_scraper_download_to_resume_2(tmp_path):
+    path = tmp_path / 'handout.pdf'
+    write_part(tmp_path, RESUME_DATA)
+
+    scraper = Scraper(interval=0)
+    with HandoutServer(RESUME_DATA) as server:
+        server.headers = {'ETag': '"v1"'}
+        size, sha256 = scraper.download_to(server.url, path, resume=True)
+
+    assert len(server.requests) == 1
+    assert path.read_bytes() == RESUME_DATA
+    assert size == len(RESUME_DATA)
+
+# 受信中に切断 -> '.part'が残り、再実行で続きから取得する
+def test_scraper_download_to_resume_3(tmp_path):
+    path = tmp_path / 'handout.pdf'
+    scraper = Scraper(interval=0)
+    with HandoutServer(RESUME_DATA) as server:
+        server.headers = {'Last-Modified': 'Sat, 01 Jan 2000 00:00:00 GMT'}
+        server.truncate_at = 5000
+        with pytest.raises((rq.RequestException, IncompleteDownloadException)):
+            scraper.download_to(server.url, path, chunk_size=100, resume=True)
+        assert not path.exists()
+        assert (tmp_path / 'handout.pdf.part').stat().st_size == 5000
+
+        server.truncate_at = None
+        size, sha256 = scraper.download_to(server.url, path, resume=True)
+
+    assert server.requests[-1]['Range'] == 'bytes=5000-'
+    assert server.requests[-1]['If-Range'] == 'Sat, 01 Jan 2000 00:00:00 GMT'
+    assert path.read_bytes() == RESUME_DATA
+
+# resume=False -> '.part'は削除される
+def test_scraper_download_to_resume_4(tmp_path):
+    path = tmp_path / 'handout.pdf'
+    scraper = Scraper(interval=0)
+    with HandoutServer(RESUME_DATA) as server:
+        server.truncate_at = 5000
+        with pytest.raises((rq.RequestException, IncompleteDownloadException)):
+            scraper.download_to(server.url, path, chunk_size=100)
+
+    assert not (tmp_path / 'handout.pdf.part').exists()
+
+# 中断後に教材が変更された -> If-Rangeが一致せず、最初から取得し直す
+def test_scraper_download_to_resume_5(tmp_path):
+    path = tmp_path / 'handout.pdf'
+    write_part(tmp_path, b'x' * 1000, etag='"v1"')
+
+    scraper = Scraper(interval=0)
+    with HandoutServer(RESUME_DATA) as server:
+        server.headers = {'ETag': '"v2"'}
+        size, sha256 = scraper.download_to(server.url, path, resume=True)
+
+    assert len(server.requests) == 1
+    assert path.read_bytes() == RESUME_DATA
+    assert sha256 == hashlib.sha256(RESUME_DATA).hexdigest()
+
+# ETag, Last-Modifiedの記録が無い, 弱いETagのみ -> Rangeリクエストを行わない
+@pytest.mark.parametrize('record', [False, True])
+def test_scraper_download_to_resume_6(tmp_path, record):
+    path = tmp_path / 'handout.pdf'
+    if record:
+        write_part(tmp_path, b'x' * 1000, etag='W/"v1"')
+    else:
+        (tmp_path / 'handout.pdf.part').write_bytes(b'x' * 1000)
+
+    scraper = Scraper(interval=0)
+    with HandoutServer(RESUME_DATA) as server:
+        scraper.download_to(server.url, path, resume=True)
+
+    assert 'Range' not in server.requests[0]
+    assert path.read_bytes() == RESUME_DATA
+
+# 受信済みのデータと受信したデータの合計がContent-Rangeの全体の大きさと異なる
+# -> IncompleteDownloadException, 保存先へ置き換えない
+def test_scraper_download_to_resume_7(monkeypatch, tmp_path):
+    def mock_request(cls, **kwargs):
+        response = create_response(content=RESUME_DATA[1000:2000], url=kwargs['url'],
+                                   status_code=206, binary=True)
+        response.headers = {'Content-Range': f'bytes 1000-1999/{len(RESUME_DATA)}',
+                            'Content-Length': '1000'}
+        return response
+    monkeypatch.setattr(rq.Session, 'request', mock_request)
+
+    path = tmp_path / 'handout.pdf'
+    write_part(tmp_path, RESUME_DATA[:1000])
+    scraper = Scraper(interval=0)
+    with pytest.raises(IncompleteDownloadException):
+        scraper.download_to(f'{DL_URL_HEAD}/Download.php?test', path, resume=True)
+    assert not path.exists()
+
+
+# エラーのステータスコード -> DownloadFailedException, ファイルを作成しない
+@pytest.mark.parametrize('resume', [False, True])
+def test_scraper_download_to_e0(tmp_path, resume):
+    path = tmp_path / 'handout.pdf'
+    if resume:
+        (tmp_path / 'handout.pdf.part').write_bytes(RESUME_DATA[:1000])
+
+    scraper = Scraper(interval=0)
+    with HandoutServer(b'404 Not Found') as server:
+        server.status = 404
+        with pytest.raises(DownloadFailedException):
+            scraper.download_to(server.url, path, resume=resume)
+        with pytest.raises(DownloadFailedException):
+            scraper.download(server.url)
+
+    assert not path.exists()
+    if resume:
+        assert (tmp_path / 'handout.pdf.part').read_bytes() == RESUME_DATA[:1000]
+
+# セッションが切れており、ログインページを受け取った -> LoginRequiredException
+def test_scraper_download_to_e1(tmp_path):
+    path = tmp_path / 'handout.pdf'
+    scraper = Scraper(interval=0)
+    with HandoutServer(template.index_template().encode(PAGE_ENCODING)) as server:
+        server.headers['Content-Type'] = 'text/html; charset=Shift_JIS'
+        with pytest.raises(LoginRequiredException):
+            scraper.download_to(server.url, path)
+    assert not path.exists()
+    assert not (tmp_path / 'handout.pdf.part').exists()
 
 # 実際のサーバーを利用したテストを行います。
 skip_test = True
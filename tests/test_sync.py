@@ -0,0 +1,149 @@
+import os
+
+import requests as rq
+import pytest
+
+from ktnetscraper import Scraper
+from ktnetscraper.sync import sync, MANIFEST_FILE_NAME
+import template
+from test_scraper import create_response, TIMETABLE_URL, DL_URL_HEAD
+
+
+# 2000/01/01 -> kz=1, 2
+# 2000/01/02 -> kz=2, 3
+SYNC_KZ = {'01': (1, 2), '02': (2, 3)}
+
+@pytest.fixture
+def site(monkeypatch):
+    '''
+    サイトのモック。handoutsの内容を変更すると、ダウンロードページと教材が変わる。
+    '''
+    site = {
+        'handouts': {
+            kz: {'file_name': f'file_{kz}.pdf', 'data': f'data_{kz}'.encode(),
+                 'release_end_at': '2999/12/31 23:59'}
+            for kz in (1, 2, 3)
+        },
+        'requested_urls': [],
+    }
+    def mock_request(cls, **kwargs):
+        url = kwargs['url']
+        site['requested_urls'].append(url)
+        if url == TIMETABLE_URL:
+            kz_list = SYNC_KZ[kwargs['data']['intSelectDay']]
+            handout = template.handout_template(
+                urls=[template.dlpage_url(arg_3=i) for i in kz_list],
+                handout_names=[f'教材_{i}' for i in kz_list],
+            )
+            content = template.timetable_template(
+                faculty='医', grade='1', days_of_week='土',
+                class_infos=template.class_template(period='1', handout=handout),
+            )
+            return create_response(content=content, url=url)
+        elif 'View_Kyozai' in url:
+            kz = int(url.split('kz=')[-1])
+            handout = site['handouts'][kz]
+            content = template.handout_info_template(
+                name=f'教材_{kz}', release_start_at='2000/01/01 00:00',
+                release_end_at=handout['release_end_at'],
+                url=f'./Download.php?kz={kz}', file_name=handout['file_name'],
+            )
+            return create_response(content=content, url=url)
+        else:
+            kz = int(url.split('kz=')[-1])
+            if 'error' in site['handouts'][kz]:
+                raise site['handouts'][kz]['error']
+            return create_response(content=site['handouts'][kz]['data'], url=url,
+                                   status_code=site['handouts'][kz].get('status', 200),
+                                   binary=True)
+    monkeypatch.setattr(rq.Session, 'request', mock_request)
+    return site
+
+
+def count_downloads(requested_urls):
+    return sum(url.startswith(f'{DL_URL_HEAD}/Download.php') for url in requested_urls)
+
+
+# 初回は全て取得し、2回目は時間割ページのみ取得する
+def test_sync_0(site, tmp_path):
+    scraper = Scraper(interval=0)
+    result = sync(scraper, tmp_path, '2000/01/01', '2000/01/02')
+    assert len(result['added']) == 3
+    assert count_downloads(site['requested_urls']) == 3
+    assert os.path.exists(tmp_path / MANIFEST_FILE_NAME)
+    path = tmp_path / '2000-01-01' / '2000M1000000-50-1' / 'file_1.pdf'
+    assert open(path, mode='rb').read() == b'data_1'
+
+    site['requested_urls'].clear()
+    result = sync(scraper, tmp_path, '2000/01/01', '2000/01/02')
+    assert len(result['unchanged']) == 3
+    assert result['added'] == result['updated'] == ()
+    assert site['requested_urls'] == [TIMETABLE_URL] * 2
+
+# 保存した教材が削除された -> 取得し直す
+def test_sync_1(site, tmp_path):
+    scraper = Scraper(interval=0)
+    sync(scraper, tmp_path, '2000/01/01')
+    os.remove(tmp_path / '2000-01-01' / '2000M1000000-50-1' / 'file_1.pdf')
+
+    site['requested_urls'].clear()
+    result = sync(scraper, tmp_path, '2000/01/01')
+    assert len(result['updated']) == 1
+    assert len(result['unchanged']) == 1
+    assert count_downloads(site['requested_urls']) == 1
+
+# revalidate=True -> ファイル名が変わった教材のみ取得し直す
+def test_sync_2(site, tmp_path):
+    scraper = Scraper(interval=0)
+    sync(scraper, tmp_path, '2000/01/01')
+    site['handouts'][2].update({'file_name': 'file_2_v2.pdf', 'data': b'data_2_v2'})
+
+    site['requested_urls'].clear()
+    result = sync(scraper, tmp_path, '2000/01/01', revalidate=True)
+    assert len(result['updated']) == 1
+    assert count_downloads(site['requested_urls']) == 1
+    directory = tmp_path / '2000-01-01' / '2000M1000000-50-2'
+    assert os.listdir(directory) == ['file_2_v2.pdf']
+    assert open(directory / 'file_2_v2.pdf', mode='rb').read() == b'data_2_v2'
+
+# 公開期間外の教材は取得しない
+def test_sync_3(site, tmp_path):
+    site['handouts'][1]['release_end_at'] = '2000/01/02 00:00'
+    scraper = Scraper(interval=0)
+    result = sync(scraper, tmp_path, '2000/01/01')
+    assert len(result['skipped']) == 1
+    assert len(result['added']) == 1
+
+# エラーのステータスコード -> マニフェストに記録せず、次回に取得し直す
+def test_sync_4(site, tmp_path):
+    site['handouts'][1]['status'] = 404
+    scraper = Scraper(interval=0)
+    result = sync(scraper, tmp_path, '2000/01/01')
+    assert len(result['failed']) == 1
+    assert len(result['added']) == 1
+    assert not os.path.exists(tmp_path / '2000-01-01' / '2000M1000000-50-1' / 'file_1.pdf')
+
+    site['handouts'][1]['status'] = 200
+    result = sync(scraper, tmp_path, '2000/01/01')
+    assert len(result['added']) == 1
+    assert len(result['unchanged']) == 1
+    path = tmp_path / '2000-01-01' / '2000M1000000-50-1' / 'file_1.pdf'
+    assert open(path, mode='rb').read() == b'data_1'
+
+# 通信に失敗した教材があっても、残りの教材の取得を続ける
+def test_sync_5(site, tmp_path):
+    site['handouts'][1]['error'] = rq.ConnectionError('test')
+    scraper = Scraper(interval=0)
+    result = sync(scraper, tmp_path, '2000/01/01', '2000/01/02')
+    assert len(result['failed']) == 1
+    assert len(result['added']) == 2
+
+# ファイル名が'.'や'..' -> 保存先のディレクトリの外を指さないよう置き換える
+@pytest.mark.parametrize('file_name, saved_name', [('.', '_'), ('..', '__')])
+def test_sync_6(site, tmp_path, file_name, saved_name):
+    site['handouts'][1]['file_name'] = file_name
+    scraper = Scraper(interval=0)
+    result = sync(scraper, tmp_path, '2000/01/01')
+    assert len(result['added']) == 2
+    path = tmp_path / '2000-01-01' / '2000M1000000-50-1' / saved_name
+    assert open(path, mode='rb').read() == b'data_1'
@@ -192,4 +192,33 @@ def test_convert_str_to_datetime_0(datetime_str):
     tz_jst = datetime.timezone(datetime.timedelta(hours=9), 'jst')
     correct_date = datetime.datetime(2019, 4, 6, 5, 4, tzinfo=tz_jst)
     
-    assert convert_str_to_datetime(datetime_str) == correct_date
\ No newline at end of file
+    assert convert_str_to_datetime(datetime_str) == correct_date
+
+
+# date_range()
+
+# 引数
+# start, end : convert_to_date()に準ずる
+
+from ktnetscraper.utils import date_range
+
+
+# 正しい入力
+@pytest.mark.parametrize(
+    "start, end, length",
+    [
+        ('2019/04/06', '2019/04/06', 1),
+        ('2019/04/06', (2019, 4, 8), 3),
+        (datetime.date(2019, 12, 31), '2020/01/01', 2),
+    ]
+)
+def test_date_range_0(start, end, length):
+    dates = date_range(start, end)
+    assert len(dates) == length
+    assert dates[0] == convert_to_date(start)
+    assert dates[-1] == convert_to_date(end)
+
+# endがstartより前
+def test_date_range_1():
+    with pytest.raises(ValueError):
+        date_range('2019/04/06', '2019/04/05')